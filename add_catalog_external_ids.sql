@@ -0,0 +1,34 @@
+-- Migration: stable external IDs for catalog records
+-- Used by catalog import/export to match records across locations and environments
+-- Usage: Get-Content add_catalog_external_ids.sql | docker exec -i social_db psql -U social_user -d social_db
+
+ALTER TABLE categories ADD COLUMN IF NOT EXISTS external_id VARCHAR(64);
+ALTER TABLE products ADD COLUMN IF NOT EXISTS external_id VARCHAR(64);
+ALTER TABLE option_groups ADD COLUMN IF NOT EXISTS external_id VARCHAR(64);
+ALTER TABLE options ADD COLUMN IF NOT EXISTS external_id VARCHAR(64);
+
+-- Existing records get IDs derived from their primary keys
+UPDATE categories SET external_id = 'category-' || id WHERE external_id IS NULL;
+UPDATE products SET external_id = 'product-' || id WHERE external_id IS NULL;
+UPDATE option_groups SET external_id = 'option-group-' || id WHERE external_id IS NULL;
+UPDATE options SET external_id = 'option-' || id WHERE external_id IS NULL;
+
+ALTER TABLE categories ALTER COLUMN external_id SET NOT NULL;
+ALTER TABLE products ALTER COLUMN external_id SET NOT NULL;
+ALTER TABLE option_groups ALTER COLUMN external_id SET NOT NULL;
+ALTER TABLE options ALTER COLUMN external_id SET NOT NULL;
+
+-- Import upserts are keyed on these
+CREATE UNIQUE INDEX IF NOT EXISTS categories_external_id_key ON categories (external_id);
+CREATE UNIQUE INDEX IF NOT EXISTS products_external_id_key ON products (external_id);
+CREATE UNIQUE INDEX IF NOT EXISTS option_groups_external_id_key ON option_groups (external_id);
+CREATE UNIQUE INDEX IF NOT EXISTS options_external_id_key ON options (external_id);
+
+-- Import replaces an imported product's links; avoid duplicate pairs
+DELETE FROM product_option_groups a
+    USING product_option_groups b
+    WHERE a.ctid < b.ctid
+      AND a.product_id = b.product_id
+      AND a.option_group_id = b.option_group_id;
+CREATE UNIQUE INDEX IF NOT EXISTS product_option_groups_pair_key
+    ON product_option_groups (product_id, option_group_id);
@@ -0,0 +1,17 @@
+-- Migration: index orders by status and creation time
+-- Used by the pending order sweeper and the admin order lists
+-- Usage: Get-Content add_order_indexes.sql | docker exec -i social_db psql -U social_user -d social_db
+
+-- Keyset pagination over closed orders is ordered by (created_at, id);
+-- each filter column leads its own index
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_orders_status_created_at_id
+    ON orders (status, created_at, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_orders_delivery_type_created_at_id
+    ON orders (delivery_type, created_at, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_orders_user_id_created_at_id
+    ON orders (user_id, created_at, id);
+
+-- Superseded by ix_orders_status_created_at_id
+DROP INDEX CONCURRENTLY IF EXISTS ix_orders_status_created_at;
@@ -0,0 +1,67 @@
+-- Migration: canonical phone number column for single-key auth lookups
+-- Usage: Get-Content add_user_phone_normalized.sql | docker exec -i social_db psql -U social_user -d social_db
+--
+-- Login only looks at phone_normalized, so every account needs its own valid
+-- number. If one number is stored in several legacy formats (several accounts)
+-- or a number has no digits, the conflicting rows are listed and the migration
+-- stops without changing anything. Fix those accounts (merge them, correct
+-- phone_number, or delete the unused ones) and run it again.
+
+\set ON_ERROR_STOP on
+
+BEGIN;
+
+ALTER TABLE users
+    ADD COLUMN IF NOT EXISTS phone_normalized VARCHAR(20);
+
+-- Rebuilt at the end. Dropping it lets the script run again over databases
+-- where an earlier version parked conflicting accounts under placeholders
+DROP INDEX IF EXISTS ix_users_phone_normalized;
+
+-- Same rules as app.core.phone.normalize_phone: digits only,
+-- 8XXXXXXXXXX and 10-digit local numbers get the 7 country code
+WITH digits AS (
+    SELECT id, regexp_replace(coalesce(phone_number, ''), '\D', '', 'g') AS d
+    FROM users
+)
+UPDATE users
+SET phone_normalized = CASE
+        WHEN length(digits.d) = 11 AND digits.d LIKE '8%' THEN '7' || substr(digits.d, 2)
+        WHEN length(digits.d) = 10 THEN '7' || digits.d
+        ELSE digits.d
+    END
+FROM digits
+WHERE digits.id = users.id;
+
+-- Accounts that need attention before the unique index can be built
+CREATE TEMPORARY TABLE phone_conflicts ON COMMIT DROP AS
+SELECT id, phone_number, phone_normalized, created_at,
+    CASE WHEN phone_normalized = '' THEN 'invalid' ELSE 'duplicate' END AS problem
+FROM users
+WHERE phone_normalized = ''
+    OR phone_normalized IN (
+        SELECT phone_normalized FROM users GROUP BY phone_normalized HAVING count(*) > 1
+    );
+
+SELECT problem, phone_normalized, id, phone_number, created_at
+FROM phone_conflicts
+ORDER BY problem, phone_normalized, id;
+
+DO $$
+DECLARE
+    conflicts integer;
+BEGIN
+    SELECT count(*) INTO conflicts FROM phone_conflicts;
+    IF conflicts > 0 THEN
+        RAISE EXCEPTION '% user(s) share a phone number or have an invalid one (listed above); nothing was changed', conflicts
+            USING HINT = 'Merge or correct these accounts, then run the migration again.';
+    END IF;
+END $$;
+
+ALTER TABLE users
+    ALTER COLUMN phone_normalized SET NOT NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ix_users_phone_normalized
+    ON users (phone_normalized);
+
+COMMIT;
@@ -1,41 +1,37 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from typing import Optional
-from app.db.session import get_db
+from app.db.session import get_db, SessionLocal
+from app.core.principals import Principal, principal_cache
 from app.core.security import decode_access_token
 from app.models.models import User, UserRole
 
 security = HTTPBearer(auto_error=False)
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user."""
-    if not credentials:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Authentication required"
-        )
-    
-    token = credentials.credentials
+def _token_user_id(token: str) -> Optional[int]:
+    """Return the user ID of a valid token, or None."""
     payload = decode_access_token(token)
-    
     if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials"
-        )
+        return None
     
     user_id = payload.get("sub")
     if not user_id:
+        return None
+    return int(user_id)
+
+def _authenticated_user_id(token: str) -> int:
+    user_id = _token_user_id(token)
+    if user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials"
         )
-    
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    return user_id
+
+def _load_active_user(user_id: int, db: Session) -> User:
+    """Load an active user or raise 401/403."""
+    user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -50,43 +46,130 @@ async def get_current_user(
     
     return user
 
-async def get_current_admin(
-    current_user: User = Depends(get_current_user)
-) -> User:
-    """Verify that current user is an admin."""
-    if current_user.role != UserRole.ADMIN:
+def _authenticate(token: str, db: Session) -> User:
+    """Resolve a bearer token to an active user or raise 401/403."""
+    return _load_active_user(_authenticated_user_id(token), db)
+
+async def _resolve_principal(token: str, db: Session) -> Principal:
+    """Like _authenticate, but served from the principal cache when possible."""
+    user_id = _authenticated_user_id(token)
+    principal = await principal_cache.get(user_id)
+    if principal is None:
+        user = _load_active_user(user_id, db)
+        principal = Principal(id=user.id, role=user.role)
+        await principal_cache.put(principal)
+    return principal
+
+def _require_admin(role: UserRole):
+    if role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin access required"
         )
+
+async def _resolve_admin_briefly(token: str) -> Principal:
+    """Resolve an admin in a session closed before the response starts."""
+    with SessionLocal() as db:
+        principal = await _resolve_principal(token, db)
+    _require_admin(principal.role)
+    return principal
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    """Get current authenticated user."""
+    if not credentials:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required"
+        )
+    
+    return _authenticate(credentials.credentials, db)
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> Principal:
+    """
+    Get the authenticated caller without loading the user row. Use
+    get_current_user when the handler needs the user itself.
+    """
+    if not credentials:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required"
+        )
+    
+    return await _resolve_principal(credentials.credentials, db)
+
+async def get_current_admin(
+    principal: Principal = Depends(get_current_principal)
+) -> Principal:
+    """Verify that current user is an admin."""
+    _require_admin(principal.role)
+    return principal
+
+async def get_current_admin_user(
+    current_user: User = Depends(get_current_user)
+) -> User:
+    """Verify that current user is an admin and return the user."""
+    _require_admin(current_user.role)
     return current_user
 
+async def get_stream_admin(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    token: Optional[str] = Query(None)
+) -> int:
+    """
+    Verify an admin for the server-sent events feed and return the user ID.
+    Browsers' EventSource cannot send headers, so the token may also come
+    as a `token` query parameter; use it for nothing else, since URLs end
+    up in access logs and browser history. On a principal cache miss it
+    uses its own short session so no DB connection is held while the
+    stream is open.
+    """
+    if credentials:
+        token = credentials.credentials
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required"
+        )
+    
+    return (await _resolve_admin_briefly(token)).id
+
+async def get_download_admin(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+) -> Principal:
+    """
+    Verify an admin for streamed downloads. Takes the token from the header
+    only and, like get_stream_admin, resolves it in its own short session:
+    a get_db dependency would keep its connection until the download ends.
+    """
+    if not credentials:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required"
+        )
+    
+    return await _resolve_admin_briefly(credentials.credentials)
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
     """Get current active user (optional for some endpoints)."""
     return current_user
 
-async def get_optional_current_user(
+async def get_optional_principal(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     db: Session = Depends(get_db)
-) -> Optional[User]:
-    """Get current user if authenticated, otherwise return None."""
+) -> Optional[Principal]:
+    """Get the caller if authenticated as an active user, otherwise None."""
     if not credentials:
         return None
     
-    token = credentials.credentials
-    payload = decode_access_token(token)
-    
-    if not payload:
-        return None
-    
-    user_id = payload.get("sub")
-    if not user_id:
-        return None
-    
-    user = db.query(User).filter(User.id == int(user_id)).first()
-    if not user or not user.is_active:
+    try:
+        return await _resolve_principal(credentials.credentials, db)
+    except HTTPException:
         return None
-    
-    return user
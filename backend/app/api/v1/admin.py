@@ -1,78 +1,150 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from datetime import datetime, timedelta
-from typing import List
-from app.db.session import get_db
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import or_, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, defer
+from datetime import date, datetime, timedelta
+from typing import List, Literal, Optional
+from app.db.session import get_db, SessionLocal
 from app.schemas.schemas import (
-    DashboardStats, OrderResponse, OrderItemResponse, OrderItemOptionCreate,
+    DashboardStats, DailySalesResponse, OrderResponse,
     CategoryCreate, CategoryUpdate, CategoryResponse,
     ProductCreate, ProductUpdate, ProductResponse,
-    OptionGroupCreate, OptionGroupWithOptions, OptionCreate, OptionResponse
+    OptionGroupCreate, OptionGroupWithOptions, OptionCreate, OptionResponse,
+    CatalogBatchRequest, CatalogBatchResponse, CatalogOperationResult,
+    CatalogDocument, CatalogImportResponse,
+    TopProduct, OptionAttachRate, OrderHeatmap
 )
 from app.models.models import (
     Order, OrderStatus, Category, Product, OptionGroup, Option, 
-    ProductStatus, OrderItem
+    ProductStatus, OrderItem, DailySales
 )
-from app.api.dependencies import get_current_admin
+from app.api.dependencies import get_current_admin, get_download_admin, get_stream_admin
 from app.core.cache import cache
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.responses import json_response, schema_response
+from app.core.pagination import encode_cursor, decode_cursor, InvalidCursor
+from app.core.principals import Principal
+from app.services.dashboard import shop_now
+from app.services.dashboard_counters import dashboard_counters
+from app.services.analytics import (
+    cached_report, top_products, option_attach_rates, order_heatmap, TOP_PRODUCTS, ATTACH_RATES
+)
+from app.services.order_state import transition_order, InvalidOrderTransition
+from app.services import catalog
+from app.services.catalog import CatalogNotFound
+from app.services.catalog_transfer import (
+    export_catalog_json, export_catalog_csv, parse_catalog_csv, import_catalog, CatalogImportError
+)
+from app.services.serializers import (
+    ORDER_WITH_ITEMS, PRODUCT_WITH_OPTIONS, order_to_response, product_to_response
+)
+from app.services.order_feed import order_feed, format_sse
+from app.services.order_export import (
+    export_orders_query, iter_order_batches, orders_to_csv, orders_to_jsonl
+)
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
+ORDER_LIST = TypeAdapter(List[OrderResponse])
+PRODUCT_LIST = TypeAdapter(List[ProductResponse])
+OPTION_GROUP_LIST = TypeAdapter(List[OptionGroupWithOptions])
+
 # Dashboard endpoints
 @router.get("/dashboard", response_model=DashboardStats)
 async def get_dashboard_stats(
-    db: Session = Depends(get_db),
     admin: bool = Depends(get_current_admin)
 ):
-    """Get dashboard statistics."""
+    """Get dashboard statistics from the Redis counters."""
+    return await dashboard_counters.read()
+
+@router.get("/reports/daily-sales", response_model=List[DailySalesResponse])
+async def get_daily_sales(
+    db: Session = Depends(get_db),
+    admin: bool = Depends(get_current_admin),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
+    """Get daily sales by delivery type from the rollup table."""
     
-    today = datetime.now().date()
-    month_start = datetime(today.year, today.month, 1)
+    query = db.query(DailySales)
+    if date_from:
+        query = query.filter(DailySales.day >= date_from)
+    if date_to:
+        query = query.filter(DailySales.day <= date_to)
     
-    # Today's sales
-    today_sales = db.query(func.sum(Order.total_amount)).filter(
-        and_(
-            func.date(Order.created_at) == today,
-            Order.status.in_([OrderStatus.PAID, OrderStatus.COMPLETED])
+    return query.order_by(DailySales.day.desc(), DailySales.delivery_type).all()
+
+def _analytics_range(date_from: Optional[date], date_to: Optional[date]):
+    """Default to the last 30 shop-local days and bound the range length."""
+    date_to = date_to or shop_now().date()
+    date_from = date_from or date_to - timedelta(days=29)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    if (date_to - date_from).days >= settings.ANALYTICS_MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Date range is limited to {settings.ANALYTICS_MAX_RANGE_DAYS} days"
         )
-    ).scalar() or 0
+    return date_from, date_to
+
+@router.get("/analytics/top-products", response_model=List[TopProduct])
+async def get_top_products(
+    admin: bool = Depends(get_current_admin),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    order_by: Literal["revenue", "quantity"] = "revenue",
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Best-selling products over a shop-local day range (inclusive)."""
     
-    # Monthly sales
-    monthly_sales = db.query(func.sum(Order.total_amount)).filter(
-        and_(
-            Order.created_at >= month_start,
-            Order.status.in_([OrderStatus.PAID, OrderStatus.COMPLETED])
-        )
-    ).scalar() or 0
+    date_from, date_to = _analytics_range(date_from, date_to)
+    payload = await cached_report(
+        "top_products",
+        {"date_from": date_from, "date_to": date_to, "order_by": order_by, "limit": limit},
+        date_to, top_products, TOP_PRODUCTS
+    )
+    return json_response(payload)
+
+@router.get("/analytics/option-attach-rates", response_model=List[OptionAttachRate])
+async def get_option_attach_rates(
+    admin: bool = Depends(get_current_admin),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
+    """How often sold items carry options of each option group."""
     
-    # Orders count
-    total_orders_today = db.query(func.count(Order.id)).filter(
-        and_(
-            func.date(Order.created_at) == today,
-            Order.status.in_([OrderStatus.PAID, OrderStatus.COMPLETED])
-        )
-    ).scalar() or 0
+    date_from, date_to = _analytics_range(date_from, date_to)
+    payload = await cached_report(
+        "option_attach_rates",
+        {"date_from": date_from, "date_to": date_to},
+        date_to, option_attach_rates, ATTACH_RATES
+    )
+    return json_response(payload)
+
+@router.get("/analytics/heatmap", response_model=OrderHeatmap)
+async def get_order_heatmap(
+    admin: bool = Depends(get_current_admin),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
+    """Orders and revenue by weekday (Monday first) and hour, shop-local time."""
     
-    total_orders_month = db.query(func.count(Order.id)).filter(
-        and_(
-            Order.created_at >= month_start,
-            Order.status.in_([OrderStatus.PAID, OrderStatus.COMPLETED])
-        )
-    ).scalar() or 0
-    
-    # Active orders
-    active_orders = db.query(func.count(Order.id)).filter(
-        Order.status == OrderStatus.PAID
-    ).scalar() or 0
-    
-    return DashboardStats(
-        today_sales=float(today_sales),
-        monthly_sales=float(monthly_sales),
-        total_orders_today=total_orders_today,
-        total_orders_month=total_orders_month,
-        active_orders=active_orders
+    date_from, date_to = _analytics_range(date_from, date_to)
+    payload = await cached_report(
+        "heatmap",
+        {"date_from": date_from, "date_to": date_to},
+        date_to, order_heatmap
     )
+    return json_response(payload)
+
+@router.get("/metrics")
+async def get_metrics(admin: bool = Depends(get_current_admin)):
+    """Get counters and latency timings of the worker serving this request."""
+    return metrics.snapshot()
 
 # Orders management
 @router.get("/orders/active", response_model=List[OrderResponse])
@@ -82,91 +154,179 @@ async def get_active_orders(
 ):
     """Get all active (paid but not completed) orders."""
     
-    orders = db.query(Order).filter(Order.status == OrderStatus.PAID).order_by(Order.created_at.desc()).all()
+    return schema_response(_load_active_orders(db), ORDER_LIST)
+
+def _load_active_orders(db: Session) -> List[OrderResponse]:
+    orders = (
+        db.query(Order)
+        .options(ORDER_WITH_ITEMS)
+        .filter(Order.status == OrderStatus.PAID)
+        .order_by(Order.created_at.desc())
+        .all()
+    )
     
-    result = []
-    for order in orders:
-        items = []
-        for item in order.items:
-            options = [
-                OrderItemOptionCreate(
-                    option_group_name=opt.option_group_name,
-                    option_name=opt.option_name,
-                    option_price=opt.option_price
-                )
-                for opt in item.selected_options
-            ]
-            
-            items.append(OrderItemResponse(
-                id=item.id,
-                product_name=item.product_name,
-                base_price=item.base_price,
-                quantity=item.quantity,
-                total_price=item.total_price,
-                selected_options=options
-            ))
+    return [order_to_response(order) for order in orders]
+
+def _active_orders_snapshot() -> str:
+    with SessionLocal() as db:
+        return ORDER_LIST.dump_json(_load_active_orders(db)).decode("utf-8")
+
+@router.get("/orders/feed")
+async def stream_active_orders(
+    request: Request,
+    admin_id: int = Depends(get_stream_admin),
+    last_event_id: Optional[str] = Header(None)
+):
+    """
+    Server-sent events for the kitchen screen.
+    Starts with a `snapshot` of active orders, then sends `order_paid`,
+    `order_completed` and `order_cancelled` events. Reconnecting clients
+    send Last-Event-ID and resume from there; if that point is no longer
+    in the feed a fresh snapshot is sent instead.
+    """
+    
+    async def events():
+        resume_from = None
+        if last_event_id and await order_feed.can_resume(last_event_id):
+            resume_from = last_event_id
         
-        result.append(OrderResponse(
-            id=order.id,
-            user_id=order.user_id,
-            total_amount=order.total_amount,
-            bonus_earned=order.bonus_earned,
-            status=order.status,
-            payment_token=order.payment_token,
-            payment_url=order.payment_url,
-            created_at=order.created_at,
-            items=items
-        ))
-    
-    return result
+        if resume_from is None:
+            # Take the position before loading so no event falls in between
+            resume_from = await order_feed.last_id()
+            snapshot = await run_in_threadpool(_active_orders_snapshot)
+            yield format_sse("snapshot", snapshot, resume_from)
+        
+        async for entry in order_feed.listen(resume_from):
+            if await request.is_disconnected():
+                break
+            if entry is None:
+                yield ": keep-alive\n\n"
+                continue
+            event_id, event, data = entry
+            yield format_sse(event, data, event_id)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/orders/closed", response_model=List[OrderResponse])
 async def get_closed_orders(
     db: Session = Depends(get_db),
     admin: bool = Depends(get_current_admin),
-    limit: int = 100
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    order_status: Optional[OrderStatus] = Query(None, alias="status"),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    delivery_type: Optional[str] = None,
+    user_id: Optional[int] = None
 ):
-    """Get all closed (completed or cancelled) orders."""
+    """
+    Get closed (completed or cancelled) orders, newest first.
+    Pages are keyed on (created_at, id): pass the X-Next-Cursor header of a
+    response as `cursor` to get the next page.
+    """
+    
+    closed_statuses = [OrderStatus.COMPLETED, OrderStatus.CANCELLED]
+    if order_status is not None and order_status not in closed_statuses:
+        raise HTTPException(status_code=400, detail="Status must be completed or cancelled")
+    
+    try:
+        position = decode_cursor(cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    query = db.query(Order).options(ORDER_WITH_ITEMS)
+    if order_status is not None:
+        query = query.filter(Order.status == order_status)
+    else:
+        query = query.filter(Order.status.in_(closed_statuses))
+    if date_from:
+        query = query.filter(Order.created_at >= date_from)
+    if date_to:
+        query = query.filter(Order.created_at < date_to)
+    if delivery_type:
+        query = query.filter(Order.delivery_type == delivery_type)
+    if user_id is not None:
+        query = query.filter(Order.user_id == user_id)
+    if position:
+        query = query.filter(tuple_(Order.created_at, Order.id) < position)
+    
+    orders = (
+        query
+        .order_by(Order.created_at.desc(), Order.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
     
-    orders = db.query(Order).filter(
-        Order.status.in_([OrderStatus.COMPLETED, OrderStatus.CANCELLED])
-    ).order_by(Order.created_at.desc()).limit(limit).all()
+    # One extra row tells whether another page exists
+    headers = {}
+    if len(orders) > limit:
+        orders = orders[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(orders[-1].created_at, orders[-1].id)
     
-    result = []
-    for order in orders:
-        items = []
-        for item in order.items:
-            options = [
-                OrderItemOptionCreate(
-                    option_group_name=opt.option_group_name,
-                    option_name=opt.option_name,
-                    option_price=opt.option_price
-                )
-                for opt in item.selected_options
-            ]
-            
-            items.append(OrderItemResponse(
-                id=item.id,
-                product_name=item.product_name,
-                base_price=item.base_price,
-                quantity=item.quantity,
-                total_price=item.total_price,
-                selected_options=options
-            ))
+    return schema_response([order_to_response(order) for order in orders], ORDER_LIST, headers)
+
+@router.get("/orders/export")
+async def export_orders(
+    request: Request,
+    admin: Principal = Depends(get_download_admin),
+    export_format: Literal["csv", "jsonl"] = Query("csv", alias="format"),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    order_status: Optional[OrderStatus] = Query(None, alias="status"),
+    delivery_type: Optional[str] = None
+):
+    """
+    Stream orders with items and options for accounting, oldest first.
+    CSV has one row per order item; JSONL has one order per line in the
+    OrderResponse shape. Orders are read from a server-side cursor in
+    batches, and the export stops when the client disconnects.
+    """
+    
+    query = export_orders_query(date_from, date_to, order_status, delivery_type)
+    
+    async def rows():
+        # Own session: the cursor stays open for the whole download
+        db = SessionLocal()
+        batches = iter_order_batches(db, query)
         
-        result.append(OrderResponse(
-            id=order.id,
-            user_id=order.user_id,
-            total_amount=order.total_amount,
-            bonus_earned=order.bonus_earned,
-            status=order.status,
-            payment_token=order.payment_token,
-            payment_url=order.payment_url,
-            created_at=order.created_at,
-            items=items
-        ))
-    
-    return result
+        def next_chunk(header: bool) -> Optional[str]:
+            batch = next(batches, None)
+            if batch is None:
+                return None
+            if export_format == "csv":
+                return orders_to_csv(batch, header=header)
+            return orders_to_jsonl(batch)
+        
+        first = True
+        try:
+            while True:
+                chunk = await run_in_threadpool(next_chunk, first)
+                if chunk is None:
+                    break
+                yield chunk
+                first = False
+                if await request.is_disconnected():
+                    break
+            if first and export_format == "csv":
+                # No orders: still send the header row
+                yield orders_to_csv([], header=True)
+        finally:
+            batches.close()
+            db.close()
+    
+    filename = f"orders-{datetime.now():%Y%m%d-%H%M%S}.{export_format}"
+    return StreamingResponse(
+        rows(),
+        media_type="text/csv" if export_format == "csv" else "application/x-ndjson",
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Accel-Buffering": "no"
+        }
+    )
 
 @router.patch("/orders/{order_id}/complete")
 async def complete_order(
@@ -180,9 +340,16 @@ async def complete_order(
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
-    order.status = OrderStatus.COMPLETED
-    order.completed_at = datetime.now()
-    db.commit()
+    try:
+        completed = await transition_order(db, order, OrderStatus.COMPLETED)
+    except InvalidOrderTransition as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    
+    if not completed:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Order status changed to {order.status.value}"
+        )
     
     return {"message": "Order completed successfully"}
 
@@ -203,8 +370,7 @@ async def create_category(
 ):
     """Create a new category."""
     
-    new_category = Category(**category_data.model_dump())
-    db.add(new_category)
+    new_category = catalog.create_category(db, category_data)
     db.commit()
     db.refresh(new_category)
     
@@ -222,13 +388,10 @@ async def update_category(
 ):
     """Update a category."""
     
-    category = db.query(Category).filter(Category.id == category_id).first()
-    if not category:
-        raise HTTPException(status_code=404, detail="Category not found")
-    
-    update_data = category_data.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(category, key, value)
+    try:
+        category = catalog.update_category(db, category_id, category_data)
+    except CatalogNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
     
     db.commit()
     db.refresh(category)
@@ -246,11 +409,11 @@ async def delete_category(
 ):
     """Delete a category."""
     
-    category = db.query(Category).filter(Category.id == category_id).first()
-    if not category:
-        raise HTTPException(status_code=404, detail="Category not found")
+    try:
+        catalog.delete_category(db, category_id)
+    except CatalogNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
     
-    db.delete(category)
     db.commit()
     
     # Invalidate menu cache
@@ -259,48 +422,80 @@ async def delete_category(
     return {"message": "Category deleted successfully"}
 
 # Product management
+PRODUCT_SORT_COLUMNS = {
+    "id": Product.id,
+    "name": Product.name_rus,
+    "price": Product.base_price,
+    "created_at": Product.created_at,
+}
+
 @router.get("/products", response_model=List[ProductResponse])
 async def get_products(
     db: Session = Depends(get_db),
     admin: bool = Depends(get_current_admin),
-    category_id: int = None
+    category_id: Optional[int] = None,
+    product_status: Optional[ProductStatus] = Query(None, alias="status"),
+    search: Optional[str] = Query(None, max_length=100),
+    sort: Literal["id", "name", "price", "created_at"] = "id",
+    order: Literal["asc", "desc"] = "asc",
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    include_images: bool = True
 ):
-    """Get all products, optionally filtered by category."""
+    """
+    Get a page of products, optionally filtered by category, status and a
+    search term over names and descriptions. The total number of matching
+    products is returned in the X-Total-Count header. Option groups and
+    options are loaded in bulk; `include_images=false` leaves out image_url.
+    """
     
     query = db.query(Product)
     if category_id:
         query = query.filter(Product.category_id == category_id)
+    if product_status is not None:
+        query = query.filter(Product.status == product_status)
+    if search and search.strip():
+        term = search.strip()
+        query = query.filter(or_(
+            Product.name_rus.icontains(term, autoescape=True),
+            Product.name_kaz.icontains(term, autoescape=True),
+            Product.description_rus.icontains(term, autoescape=True),
+            Product.description_kaz.icontains(term, autoescape=True)
+        ))
     
-    products = query.all()
+    total = query.count()
+    
+    column = PRODUCT_SORT_COLUMNS[sort]
+    query = query.options(PRODUCT_WITH_OPTIONS)
+    if not include_images:
+        query = query.options(defer(Product.image_url))
+    products = (
+        query
+        .order_by(column.desc() if order == "desc" else column.asc(), Product.id)
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
     
-    result = []
-    for product in products:
-        option_groups = []
-        for group in product.option_groups:
-            option_groups.append(OptionGroupWithOptions(
-                id=group.id,
-                name_rus=group.name_rus,
-                name_kaz=group.name_kaz,
-                is_required=group.is_required,
-                is_multiple=group.is_multiple,
-                options=[opt for opt in group.options]
-            ))
-        
-        result.append(ProductResponse(
-            id=product.id,
-            category_id=product.category_id,
-            name_rus=product.name_rus,
-            name_kaz=product.name_kaz,
-            description_rus=product.description_rus,
-            description_kaz=product.description_kaz,
-            base_price=product.base_price,
-            image_url=product.image_url,
-            status=product.status,
-            created_at=product.created_at,
-            option_groups=option_groups
-        ))
+    return schema_response(
+        [product_to_response(product, include_image=include_images) for product in products],
+        PRODUCT_LIST,
+        {"X-Total-Count": str(total)}
+    )
+
+@router.get("/products/{product_id}", response_model=ProductResponse)
+async def get_product(
+    product_id: int,
+    db: Session = Depends(get_db),
+    admin: bool = Depends(get_current_admin)
+):
+    """Get a single product."""
     
-    return result
+    product = db.query(Product).options(PRODUCT_WITH_OPTIONS).filter(Product.id == product_id).first()
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    
+    return product_to_response(product)
 
 @router.post("/products", response_model=ProductResponse)
 async def create_product(
@@ -310,49 +505,14 @@ async def create_product(
 ):
     """Create a new product."""
     
-    # Extract option group IDs
-    option_group_ids = product_data.option_group_ids
-    product_dict = product_data.model_dump(exclude={"option_group_ids"})
-    
-    new_product = Product(**product_dict)
-    
-    # Add option groups
-    if option_group_ids:
-        option_groups = db.query(OptionGroup).filter(OptionGroup.id.in_(option_group_ids)).all()
-        new_product.option_groups = option_groups
-    
-    db.add(new_product)
+    new_product = catalog.create_product(db, product_data)
     db.commit()
     db.refresh(new_product)
     
     # Invalidate menu cache
     await cache.invalidate_menu_cache()
     
-    # Build response
-    option_groups_response = []
-    for group in new_product.option_groups:
-        option_groups_response.append(OptionGroupWithOptions(
-            id=group.id,
-            name_rus=group.name_rus,
-            name_kaz=group.name_kaz,
-            is_required=group.is_required,
-            is_multiple=group.is_multiple,
-            options=[opt for opt in group.options]
-        ))
-    
-    return ProductResponse(
-        id=new_product.id,
-        category_id=new_product.category_id,
-        name_rus=new_product.name_rus,
-        name_kaz=new_product.name_kaz,
-        description_rus=new_product.description_rus,
-        description_kaz=new_product.description_kaz,
-        base_price=new_product.base_price,
-        image_url=new_product.image_url,
-        status=new_product.status,
-        created_at=new_product.created_at,
-        option_groups=option_groups_response
-    )
+    return product_to_response(new_product)
 
 @router.put("/products/{product_id}", response_model=ProductResponse)
 async def update_product(
@@ -363,20 +523,10 @@ async def update_product(
 ):
     """Update a product."""
     
-    product = db.query(Product).filter(Product.id == product_id).first()
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-    
-    update_data = product_data.model_dump(exclude_unset=True, exclude={"option_group_ids"})
-    for key, value in update_data.items():
-        setattr(product, key, value)
-    
-    # Update option groups if provided
-    if product_data.option_group_ids is not None:
-        option_groups = db.query(OptionGroup).filter(
-            OptionGroup.id.in_(product_data.option_group_ids)
-        ).all()
-        product.option_groups = option_groups
+    try:
+        product = catalog.update_product(db, product_id, product_data)
+    except CatalogNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
     
     db.commit()
     db.refresh(product)
@@ -384,31 +534,7 @@ async def update_product(
     # Invalidate menu cache
     await cache.invalidate_menu_cache()
     
-    # Build response
-    option_groups_response = []
-    for group in product.option_groups:
-        option_groups_response.append(OptionGroupWithOptions(
-            id=group.id,
-            name_rus=group.name_rus,
-            name_kaz=group.name_kaz,
-            is_required=group.is_required,
-            is_multiple=group.is_multiple,
-            options=[opt for opt in group.options]
-        ))
-    
-    return ProductResponse(
-        id=product.id,
-        category_id=product.category_id,
-        name_rus=product.name_rus,
-        name_kaz=product.name_kaz,
-        description_rus=product.description_rus,
-        description_kaz=product.description_kaz,
-        base_price=product.base_price,
-        image_url=product.image_url,
-        status=product.status,
-        created_at=product.created_at,
-        option_groups=option_groups_response
-    )
+    return product_to_response(product)
 
 @router.delete("/products/{product_id}")
 async def delete_product(
@@ -418,11 +544,11 @@ async def delete_product(
 ):
     """Delete a product."""
     
-    product = db.query(Product).filter(Product.id == product_id).first()
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
+    try:
+        catalog.delete_product(db, product_id)
+    except CatalogNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
     
-    db.delete(product)
     db.commit()
     
     # Invalidate menu cache
@@ -451,7 +577,7 @@ async def get_option_groups(
             options=[opt for opt in group.options]
         ))
     
-    return result
+    return schema_response(result, OPTION_GROUP_LIST)
 
 @router.post("/option-groups", response_model=OptionGroupWithOptions)
 async def create_option_group(
@@ -461,8 +587,7 @@ async def create_option_group(
 ):
     """Create a new option group."""
     
-    new_group = OptionGroup(**group_data.model_dump())
-    db.add(new_group)
+    new_group = catalog.create_option_group(db, group_data)
     db.commit()
     db.refresh(new_group)
     
@@ -487,8 +612,7 @@ async def create_option(
 ):
     """Create a new option."""
     
-    new_option = Option(**option_data.model_dump())
-    db.add(new_option)
+    new_option = catalog.create_option(db, option_data)
     db.commit()
     db.refresh(new_option)
     
@@ -505,14 +629,182 @@ async def delete_option(
 ):
     """Delete an option."""
     
-    option = db.query(Option).filter(Option.id == option_id).first()
-    if not option:
-        raise HTTPException(status_code=404, detail="Option not found")
+    try:
+        catalog.delete_option(db, option_id)
+    except CatalogNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
     
-    db.delete(option)
     db.commit()
     
     # Invalidate menu cache
     await cache.invalidate_menu_cache()
     
     return {"message": "Option deleted successfully"}
+
+# Bulk catalog changes
+# op -> (payload schema, catalog function, takes a record id)
+CATALOG_OPERATIONS = {
+    "create_category": (CategoryCreate, catalog.create_category, False),
+    "update_category": (CategoryUpdate, catalog.update_category, True),
+    "delete_category": (None, catalog.delete_category, True),
+    "create_product": (ProductCreate, catalog.create_product, False),
+    "update_product": (ProductUpdate, catalog.update_product, True),
+    "delete_product": (None, catalog.delete_product, True),
+    "create_option_group": (OptionGroupCreate, catalog.create_option_group, False),
+    "create_option": (OptionCreate, catalog.create_option, False),
+    "delete_option": (None, catalog.delete_option, True),
+}
+
+# Payload fields that hold catalog IDs and so may name an earlier operation's ref
+CATALOG_REF_FIELDS = ("category_id", "group_id", "option_group_ids")
+
+def _resolve_ref(value, refs: dict):
+    """Replace a "$name" string with the ID created by the operation with ref "name"."""
+    if isinstance(value, str) and value.startswith("$"):
+        if value[1:] not in refs:
+            raise ValueError(f"Unknown reference {value}")
+        return refs[value[1:]]
+    if isinstance(value, list):
+        return [_resolve_ref(item, refs) for item in value]
+    return value
+
+def _resolve_data_refs(data: dict, refs: dict) -> dict:
+    """Resolve refs in the ID fields only; names and descriptions may start with "$"."""
+    return {
+        key: _resolve_ref(value, refs) if key in CATALOG_REF_FIELDS else value
+        for key, value in data.items()
+    }
+
+@router.post("/catalog/batch", response_model=CatalogBatchResponse)
+async def apply_catalog_batch(
+    batch: CatalogBatchRequest,
+    db: Session = Depends(get_db),
+    admin: bool = Depends(get_current_admin)
+):
+    """
+    Apply many catalog operations in one transaction and invalidate the
+    menu cache once. Each operation runs in a savepoint and gets its own
+    result. Operations may set `ref` and later ones refer to the created
+    ID as "$ref" in `id` or in the ID fields of `data` (category_id,
+    group_id, option_group_ids). With `atomic` (default) any failure
+    rolls back the whole batch; otherwise only failed operations are undone.
+    """
+    
+    refs = {}
+    results = []
+    
+    for index, operation in enumerate(batch.operations):
+        schema, apply, takes_id = CATALOG_OPERATIONS[operation.op]
+        result = CatalogOperationResult(index=index, op=operation.op, success=False)
+        
+        try:
+            record_id = _resolve_ref(operation.id, refs)
+            data = _resolve_data_refs(operation.data or {}, refs)
+            if takes_id and record_id is None:
+                raise ValueError("id is required")
+            
+            args = [record_id] if takes_id else []
+            if schema is not None:
+                args.append(schema.model_validate(data))
+            
+            with db.begin_nested():
+                record = apply(db, *args)
+            
+            result.success = True
+            result.id = record.id if record is not None else record_id
+            if operation.ref and result.id is not None:
+                refs[operation.ref] = result.id
+        except (CatalogNotFound, ValueError, SQLAlchemyError) as e:
+            # pydantic ValidationError is a ValueError
+            result.error = str(e)
+        
+        results.append(result)
+    
+    failed = any(not result.success for result in results)
+    if batch.atomic and failed:
+        db.rollback()
+        for result in results:
+            if result.success:
+                result.success = False
+                result.id = None
+                result.error = "Rolled back"
+        return CatalogBatchResponse(committed=False, results=results)
+    
+    db.commit()
+    
+    # One invalidation for the whole batch
+    await cache.invalidate_menu_cache()
+    
+    return CatalogBatchResponse(committed=True, results=results)
+
+# Catalog import/export
+@router.get("/catalog/export")
+async def export_catalog(
+    admin: Principal = Depends(get_download_admin),
+    export_format: Literal["json", "csv"] = Query("json", alias="format")
+):
+    """
+    Stream the whole catalog (categories, option groups, options, products
+    and their option group links) keyed on external IDs, for import into
+    another location or environment.
+    """
+    
+    def chunks():
+        # Own session: the cursor stays open for the whole download
+        with SessionLocal() as db:
+            if export_format == "csv":
+                yield from export_catalog_csv(db)
+            else:
+                yield from export_catalog_json(db)
+    
+    filename = f"catalog-{datetime.now():%Y%m%d-%H%M%S}.{export_format}"
+    return StreamingResponse(
+        chunks(),
+        media_type="text/csv" if export_format == "csv" else "application/json",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.post("/catalog/import", response_model=CatalogImportResponse)
+async def import_catalog_document(
+    request: Request,
+    db: Session = Depends(get_db),
+    admin: bool = Depends(get_current_admin),
+    import_format: Literal["json", "csv"] = Query("json", alias="format"),
+    dry_run: bool = False
+):
+    """
+    Import a catalog export (the request body) with bulk upserts keyed on
+    external IDs. The whole document is validated first and written in one
+    transaction; any error leaves the catalog unchanged. With `dry_run`
+    the import is rolled back after the writes succeed.
+    """
+    
+    body = await request.body()
+    try:
+        if import_format == "csv":
+            document = CatalogDocument.model_validate(parse_catalog_csv(body.decode("utf-8-sig")))
+        else:
+            document = CatalogDocument.model_validate_json(body)
+        counts = await run_in_threadpool(import_catalog, db, document)
+    except ValidationError as e:
+        # Inputs are left out: they can be whole base64 images
+        raise HTTPException(
+            status_code=422,
+            detail=e.errors(include_url=False, include_input=False, include_context=False)
+        )
+    except CatalogImportError as e:
+        db.rollback()
+        raise HTTPException(status_code=422, detail=e.errors)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Catalog CSV must be UTF-8")
+    
+    if dry_run:
+        db.rollback()
+        return counts
+    
+    db.commit()
+    
+    # Invalidate menu cache once for the whole import
+    await cache.invalidate_menu_cache()
+    
+    return counts
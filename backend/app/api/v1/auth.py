@@ -1,80 +1,85 @@
-from typing import Set
-
-from fastapi import APIRouter, Depends, HTTPException, status
+import uuid
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.schemas.schemas import UserCreate, UserLogin, Token, UserResponse
 from app.models.models import User, UserRole
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.config import settings
+from app.core.phone import normalize_phone
+from app.core.rate_limit import RateLimit, rate_limiter
+from app.core.security import verify_password_async, get_password_hash_async, create_access_token
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
-def _normalize_phone_number(raw_phone: str) -> str:
-    """Format phone number as digits only with Kazakhstan country code."""
-    digits = ''.join(filter(str.isdigit, raw_phone or ""))
-
-    if not digits:
-        return ""
-
-    if len(digits) == 11 and digits.startswith('8'):
-        digits = '7' + digits[1:]
-
-    if len(digits) == 10:
-        digits = '7' + digits
-
-    return digits
-
-
-def _possible_phone_variants(raw_phone: str) -> Set[str]:
-    """Return possible stored representations to cover legacy formats."""
-    normalized = _normalize_phone_number(raw_phone)
-    variants: Set[str] = set()
-
-    if not normalized:
-        return variants
-
-    variants.add(normalized)
-    variants.add(f"+{normalized}")
-
-    if normalized.startswith('7') and len(normalized) == 11:
-        legacy = f"8{normalized[1:]}"
-        variants.add(legacy)
-        variants.add(f"+{legacy}")
-
-    return variants
+def _rate_limit_rules(
+    request: Request, phone: str, per_phone: int, per_ip: int, window: int
+) -> List[Tuple[Optional[str], RateLimit]]:
+    """Limits per phone number and per client IP."""
+    client_ip = request.client.host if request.client else None
+    return [
+        (f"phone:{phone}" if phone else None, RateLimit(per_phone, window)),
+        (f"ip:{client_ip}" if client_ip else None, RateLimit(per_ip, window)),
+    ]
+
+async def _enforce_rate_limit(scope: str, rules: list, attempt_id: Optional[str] = None):
+    """
+    Count an attempt against the rules; 429 once any of them is over its
+    limit. Runs before any password hashing.
+    """
+    retry_after = await rate_limiter.acquire(scope, rules, attempt_id)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many attempts, try again later",
+            headers={"Retry-After": str(retry_after)}
+        )
 
 @router.post("/register", response_model=Token)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, request: Request, db: Session = Depends(get_db)):
     """Register a new user."""
-    normalized_phone = _normalize_phone_number(user_data.phone_number)
+    normalized_phone = normalize_phone(user_data.phone_number)
+    await _enforce_rate_limit("register", _rate_limit_rules(
+        request, normalized_phone,
+        settings.REGISTER_RATE_LIMIT_PER_PHONE,
+        settings.REGISTER_RATE_LIMIT_PER_IP,
+        settings.REGISTER_RATE_LIMIT_WINDOW
+    ))
     if not normalized_phone:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid phone number format"
         )
 
+    already_exists = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="User with this phone number already exists"
+    )
     existing_user = (
         db.query(User)
-        .filter(User.phone_number.in_(_possible_phone_variants(normalized_phone)))
+        .filter(User.phone_normalized == normalized_phone)
         .first()
     )
     if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="User with this phone number already exists"
-        )
+        raise already_exists
 
     new_user = User(
         first_name=user_data.first_name,
         last_name=user_data.last_name,
         phone_number=normalized_phone,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=await get_password_hash_async(user_data.password),
         role=UserRole.CLIENT
     )
 
     db.add(new_user)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # The same number was registered concurrently
+        db.rollback()
+        raise already_exists
     db.refresh(new_user)
 
     access_token = create_access_token(data={"sub": str(new_user.id)})
@@ -85,9 +90,17 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
 
 @router.post("/login", response_model=Token)
-async def login(credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(credentials: UserLogin, request: Request, db: Session = Depends(get_db)):
     """Login user."""
-    normalized_phone = _normalize_phone_number(credentials.phone_number)
+    normalized_phone = normalize_phone(credentials.phone_number)
+    rules = _rate_limit_rules(
+        request, normalized_phone,
+        settings.LOGIN_RATE_LIMIT_PER_PHONE,
+        settings.LOGIN_RATE_LIMIT_PER_IP,
+        settings.LOGIN_RATE_LIMIT_WINDOW
+    )
+    attempt_id = uuid.uuid4().hex
+    await _enforce_rate_limit("login", rules, attempt_id)
     if not normalized_phone:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -96,16 +109,19 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
 
     user = (
         db.query(User)
-        .filter(User.phone_number.in_(_possible_phone_variants(normalized_phone)))
+        .filter(User.phone_normalized == normalized_phone)
         .first()
     )
     
-    if not user or not verify_password(credentials.password, user.password_hash):
+    if not user or not await verify_password_async(credentials.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect phone number or password"
         )
     
+    # Only failed logins count against the limits
+    await rate_limiter.release("login", rules, attempt_id)
+    
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
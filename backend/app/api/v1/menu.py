@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
 from app.db.session import get_db
-from app.schemas.schemas import MenuResponse, MenuCategory, ProductResponse, OptionGroupWithOptions
-from app.models.models import Category, Product, ProductStatus
+from app.schemas.schemas import MenuResponse, ProductResponse
 from app.core.cache import cache
 from app.core.config import settings
-import json
+from app.core.metrics import metrics
+from app.core.responses import json_response
+from app.services.menu import build_menu
+from app.services.menu_search import menu_search_index
+from typing import List
 
 router = APIRouter(prefix="/menu", tags=["Menu"])
 
@@ -14,69 +16,33 @@ router = APIRouter(prefix="/menu", tags=["Menu"])
 async def get_menu(db: Session = Depends(get_db)):
     """Get complete menu with caching."""
     
-    # Try to get from cache
+    # The cache holds the serialized response, so a hit is sent as it is
     cached_menu = await cache.get(settings.REDIS_MENU_CACHE_KEY)
-    
     if cached_menu:
-        return MenuResponse(**json.loads(cached_menu))
+        return json_response(cached_menu)
     
     # Build menu from database
-    categories = db.query(Category).filter(Category.is_active == True).order_by(Category.order).all()
+    payload = build_menu(db).model_dump_json()
     
-    menu_categories = []
-    for category in categories:
-        # Get active products for this category
-        products = db.query(Product).filter(
-            and_(
-                Product.category_id == category.id,
-                Product.status == ProductStatus.ACTIVE
-            )
-        ).all()
-        
-        product_responses = []
-        for product in products:
-            # Build option groups with options
-            option_groups = []
-            for group in product.option_groups:
-                options_list = [opt for opt in group.options if opt.is_available]
-                option_groups.append(OptionGroupWithOptions(
-                    id=group.id,
-                    name_rus=group.name_rus,
-                    name_kaz=group.name_kaz,
-                    is_required=group.is_required,
-                    is_multiple=group.is_multiple,
-                    options=options_list
-                ))
-            
-            product_responses.append(ProductResponse(
-                id=product.id,
-                category_id=product.category_id,
-                name_rus=product.name_rus,
-                name_kaz=product.name_kaz,
-                description_rus=product.description_rus,
-                description_kaz=product.description_kaz,
-                base_price=product.base_price,
-                image_url=product.image_url,
-                status=product.status,
-                created_at=product.created_at,
-                option_groups=option_groups
-            ))
-        
-        menu_categories.append(MenuCategory(
-            id=category.id,
-            name_rus=category.name_rus,
-            name_kaz=category.name_kaz,
-            order=category.order,
-            products=product_responses
-        ))
+    # Cache the menu
+    await cache.set(settings.REDIS_MENU_CACHE_KEY, payload, settings.REDIS_CACHE_TTL)
     
-    menu_response = MenuResponse(categories=menu_categories)
+    return json_response(payload)
+
+@router.get("/search", response_model=List[ProductResponse])
+async def search_menu(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=50)
+):
+    """
+    Search menu products by Russian and Kazakh names and descriptions.
+    Matches whole words, word prefixes and words with small typos; every
+    query word has to match. Served from an in-memory index.
+    """
     
-    # Cache the menu
-    await cache.set(
-        settings.REDIS_MENU_CACHE_KEY,
-        menu_response.model_dump_json(),
-        settings.REDIS_CACHE_TTL
-    )
+    await menu_search_index.ensure_fresh()
+    with metrics.timer("menu_search.query"):
+        results = menu_search_index.search(q, limit)
     
-    return menu_response
+    # Products are stored pre-serialized in the index
+    return json_response("[" + ",".join(results) + "]")
@@ -1,3 +1,4 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import Optional
@@ -5,23 +6,38 @@ from datetime import datetime
 from app.db.session import get_db
 from app.schemas.schemas import (
     OrderCreate, OrderResponse, OrderStatusResponse, 
-    PaymentCreateResponse, OrderItemResponse, OrderItemOptionCreate
+    PaymentCreateResponse
 )
-from app.models.models import Order, OrderItem, OrderItemOption, Product, User, OrderStatus
-from app.api.dependencies import get_current_user, get_optional_current_user
-from app.services.kaspi import kaspi_service
+from app.models.models import Order, Product, OrderStatus
+from app.api.dependencies import get_current_principal, get_optional_principal
+from app.core.principals import Principal
+from app.services.kaspi import kaspi_service, KaspiError
+from app.services.order_status import order_status_store
+from app.services.order_state import transition_order
+from app.services.order_intake import order_intake, add_order_rows, reserve_order_id
+from app.services.serializers import ORDER_WITH_ITEMS, order_to_response
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
-@router.post("", response_model=PaymentCreateResponse)
-async def create_order(
-    order_data: OrderCreate,
-    db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_optional_current_user)
-):
-    """Create a new order and generate Kaspi QR payment."""
-    
-    # Calculate total amount
+# Postgres is the source of truth; the Redis status hash only saves queries,
+# so a Redis failure is logged and the request carries on without it.
+async def _store_status(order: Order):
+    try:
+        await order_status_store.save(order)
+    except Exception:
+        logger.exception("Failed to store status of order %s", order.id)
+
+async def _load_status(order_id: int) -> Optional[dict]:
+    try:
+        return await order_status_store.load(order_id)
+    except Exception:
+        logger.exception("Failed to load status of order %s", order_id)
+        return None
+
+def _price_order_items(db: Session, order_data: OrderCreate) -> tuple:
+    """Validate products and return (total_amount, priced item dicts)."""
     total_amount = 0
     order_items_data = []
     
@@ -43,56 +59,56 @@ async def create_order(
         total_amount += item_total
         
         order_items_data.append({
-            "product": product,
+            "product_id": product.id,
+            "product_name": product.name_rus,
             "quantity": item.quantity,
             "base_price": product.base_price,
             "total_price": item_total,
-            "selected_options": item.selected_options
+            "selected_options": [option.model_dump() for option in item.selected_options]
         })
     
+    return total_amount, order_items_data
+
+@router.post("", response_model=PaymentCreateResponse)
+async def create_order(
+    order_data: OrderCreate,
+    db: Session = Depends(get_db),
+    current_user: Optional[Principal] = Depends(get_optional_principal)
+):
+    """
+    Create a new order and generate Kaspi QR payment.
+    In queue intake mode the order is only validated and buffered; the
+    response carries the reserved order ID and the payment URL appears on
+    the status endpoint once a consumer has created the invoice.
+    """
+    
+    # Calculate total amount
+    total_amount, order_items_data = _price_order_items(db, order_data)
+    
     # Calculate bonus points (1% of total)
     bonus_earned = int(total_amount * 0.01) if current_user else 0
+    user_id = current_user.id if current_user else None
+    delivery = order_data.model_dump(exclude={"items"})
+    
+    if order_intake.enabled:
+        order_id = reserve_order_id(db)
+        db.rollback()  # Release the connection before talking to Redis
+        await order_intake.enqueue(order_id, user_id, total_amount, bonus_earned, order_items_data, delivery)
+        return PaymentCreateResponse(
+            order_id=order_id,
+            total_amount=total_amount,
+            queued=True
+        )
     
     # Create order
-    new_order = Order(
-        user_id=current_user.id if current_user else None,
-        total_amount=total_amount,
-        bonus_earned=bonus_earned,
-        status=OrderStatus.PENDING
-    )
-    
-    db.add(new_order)
-    db.flush()  # Get order ID
-    
-    # Create order items
-    for item_data in order_items_data:
-        order_item = OrderItem(
-            order_id=new_order.id,
-            product_id=item_data["product"].id,
-            product_name=item_data["product"].name_rus,
-            base_price=item_data["base_price"],
-            quantity=item_data["quantity"],
-            total_price=item_data["total_price"]
-        )
-        db.add(order_item)
-        db.flush()
-        
-        # Add selected options
-        for option in item_data["selected_options"]:
-            order_item_option = OrderItemOption(
-                order_item_id=order_item.id,
-                option_group_name=option.option_group_name,
-                option_name=option.option_name,
-                option_price=option.option_price
-            )
-            db.add(order_item_option)
+    new_order = add_order_rows(db, user_id, total_amount, bonus_earned, order_items_data, delivery)
     
     # Create Kaspi payment
     try:
         payment_data = await kaspi_service.create_invoice(new_order.id, total_amount)
         new_order.payment_token = payment_data["token"]
         new_order.payment_url = payment_data["payment_url"]
-    except Exception as e:
+    except KaspiError:
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -100,6 +116,7 @@ async def create_order(
         )
     
     db.commit()
+    await _store_status(new_order)
     
     return PaymentCreateResponse(
         order_id=new_order.id,
@@ -110,7 +127,41 @@ async def create_order(
 
 @router.get("/status/{order_id}", response_model=OrderStatusResponse)
 async def get_order_status(order_id: int, db: Session = Depends(get_db)):
-    """Check order payment status."""
+    """
+    Check order payment status.
+    Served from the Redis status hash when possible; the session is only
+    used (and a connection checked out) on a cache miss or a payment.
+    """
+    
+    cached = await _load_status(order_id)
+    
+    # Accepted by the intake queue, not persisted yet
+    if cached and cached["queued"]:
+        return OrderStatusResponse(
+            order_id=order_id,
+            status=cached["status"],
+            queued=True
+        )
+    
+    # Final states never change again, answer without touching Postgres
+    if cached and cached["status"] != OrderStatus.PENDING:
+        return OrderStatusResponse(
+            order_id=order_id,
+            status=cached["status"],
+            payment_url=cached["payment_url"]
+        )
+    
+    # Pending order: ask Kaspi first and only load the row if it got paid
+    if cached and cached["payment_token"]:
+        payment_status = await kaspi_service.get_payment_status(cached["payment_token"])
+        if payment_status != "paid":
+            return OrderStatusResponse(
+                order_id=order_id,
+                status=cached["status"],
+                payment_url=cached["payment_url"]
+            )
+    else:
+        payment_status = None
     
     order = db.query(Order).filter(Order.id == order_id).first()
     if not order:
@@ -119,28 +170,21 @@ async def get_order_status(order_id: int, db: Session = Depends(get_db)):
             detail="Order not found"
         )
     
-    # If already paid, return status
-    if order.status in [OrderStatus.PAID, OrderStatus.COMPLETED]:
-        return OrderStatusResponse(
-            order_id=order.id,
-            status=order.status,
-            payment_url=order.payment_url
-        )
-    
     # Check with Kaspi if still pending
     if order.status == OrderStatus.PENDING and order.payment_token:
-        payment_status = await kaspi_service.check_payment_status(order.payment_token)
+        if payment_status is None:
+            payment_status = await kaspi_service.get_payment_status(order.payment_token)
         
         if payment_status == "paid":
-            order.status = OrderStatus.PAID
-            
-            # Add bonus points to user if exists
-            if order.user_id:
-                user = db.query(User).filter(User.id == order.user_id).first()
-                if user:
-                    user.bonus_points += order.bonus_earned
-            
-            db.commit()
+            # Credits bonus exactly once even if several pollers get here
+            if await transition_order(db, order, OrderStatus.PAID):
+                return OrderStatusResponse(
+                    order_id=order.id,
+                    status=order.status,
+                    payment_url=order.payment_url
+                )
+    
+    await _store_status(order)
     
     return OrderStatusResponse(
         order_id=order.id,
@@ -152,11 +196,11 @@ async def get_order_status(order_id: int, db: Session = Depends(get_db)):
 async def get_order(
     order_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get order details."""
     
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = db.query(Order).options(ORDER_WITH_ITEMS).filter(Order.id == order_id).first()
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -170,35 +214,4 @@ async def get_order(
             detail="Access denied"
         )
     
-    # Build response
-    items = []
-    for item in order.items:
-        options = [
-            OrderItemOptionCreate(
-                option_group_name=opt.option_group_name,
-                option_name=opt.option_name,
-                option_price=opt.option_price
-            )
-            for opt in item.selected_options
-        ]
-        
-        items.append(OrderItemResponse(
-            id=item.id,
-            product_name=item.product_name,
-            base_price=item.base_price,
-            quantity=item.quantity,
-            total_price=item.total_price,
-            selected_options=options
-        ))
-    
-    return OrderResponse(
-        id=order.id,
-        user_id=order.user_id,
-        total_amount=order.total_amount,
-        bonus_earned=order.bonus_earned,
-        status=order.status,
-        payment_token=order.payment_token,
-        payment_url=order.payment_url,
-        created_at=order.created_at,
-        items=items
-    )
+    return order_to_response(order)
@@ -1,17 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.schemas.schemas import (
     UserResponse,
     AdminProfileUpdate,
-    AdminAvatarUpdate,
     AdminPasswordUpdate,
 )
 from app.models.models import User
 from app.api.dependencies import get_current_user
-from app.core.security import verify_password, get_password_hash
-import base64
-import os
+from app.core.phone import normalize_phone
+from app.core.principals import principal_cache
+from app.core.security import verify_password_async, get_password_hash_async
+from app.services.avatars import save_avatar, discard_avatar, InvalidAvatar, AvatarTooLarge
 
 router = APIRouter(prefix="/profile", tags=["Profile"])
 
@@ -34,23 +35,37 @@ async def update_profile(
 ):
     """Update current user profile information."""
     update_data = profile_data.model_dump(exclude_unset=True)
-
-    if 'phone_number' in update_data and update_data['phone_number'] != current_user.phone_number:
-        existing_user = (
-            db.query(User)
-            .filter(User.phone_number == update_data['phone_number'], User.id != current_user.id)
-            .first()
-        )
-        if existing_user:
+    phone_in_use = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Phone number already in use"
+    )
+
+    if 'phone_number' in update_data:
+        normalized_phone = normalize_phone(update_data['phone_number'])
+        if not normalized_phone:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Phone number already in use",
+                detail="Invalid phone number format"
             )
+        update_data['phone_number'] = normalized_phone
+
+        # Check if phone number is being changed and if it's already taken
+        if normalized_phone != current_user.phone_normalized:
+            existing_user = db.query(User).filter(
+                User.phone_normalized == normalized_phone,
+                User.id != current_user.id
+            ).first()
+            if existing_user:
+                raise phone_in_use
 
     for key, value in update_data.items():
         setattr(current_user, key, value)
 
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise phone_in_use
     db.refresh(current_user)
 
     return current_user
@@ -58,34 +73,34 @@ async def update_profile(
 
 @router.put("/avatar", response_model=UserResponse)
 async def update_avatar(
-    avatar_data: AdminAvatarUpdate,
+    file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Update current user avatar."""
+    """Upload a new avatar (multipart, JPEG, PNG or WebP)."""
     try:
-        image_data = base64.b64decode(avatar_data.avatar_base64)
-
-        os.makedirs("uploads/avatars", exist_ok=True)
-
-        filename = f"avatar_{current_user.id}.jpg"
-        filepath = os.path.join("uploads/avatars", filename)
-
-        with open(filepath, "wb") as f:
-            f.write(image_data)
-
-        avatar_url = f"/uploads/avatars/{filename}"
-        current_user.avatar_url = avatar_url
-
-        db.commit()
-        db.refresh(current_user)
-
-        return current_user
-    except Exception as exc:
+        avatar_url = await save_avatar(file, current_user.id)
+    except AvatarTooLarge as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    except InvalidAvatar as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Failed to process avatar: {exc}",
+            detail=str(e)
         )
+    finally:
+        await file.close()
+
+    previous_url = current_user.avatar_url
+    current_user.avatar_url = avatar_url
+    db.commit()
+    db.refresh(current_user)
+    if previous_url != avatar_url:
+        discard_avatar(previous_url)
+
+    return current_user
 
 
 @router.put("/password")
@@ -95,13 +110,14 @@ async def update_password(
     db: Session = Depends(get_db)
 ):
     """Update current user password."""
-    if not verify_password(password_data.current_password, current_user.password_hash):
+    if not await verify_password_async(password_data.current_password, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect",
         )
 
-    current_user.password_hash = get_password_hash(password_data.new_password)
+    current_user.password_hash = await get_password_hash_async(password_data.new_password)
     db.commit()
+    await principal_cache.invalidate(current_user.id)
 
     return {"message": "Password updated successfully"}
@@ -18,6 +18,12 @@ class RedisCache:
         if self.redis_client:
             await self.redis_client.close()
     
+    async def get_client(self):
+        """Return the connected Redis client for commands not wrapped here."""
+        if not self.redis_client:
+            await self.connect()
+        return self.redis_client
+    
     async def get(self, key: str):
         """Get value from cache."""
         if not self.redis_client:
@@ -33,6 +39,28 @@ class RedisCache:
         else:
             await self.redis_client.set(key, value)
     
+    async def set_if_absent(self, key: str, value: str, ttl: int) -> bool:
+        """Set value with TTL only if the key does not exist. Returns True if set."""
+        if not self.redis_client:
+            await self.connect()
+        return bool(await self.redis_client.set(key, value, ex=ttl, nx=True))
+    
+    async def hset(self, key: str, mapping: dict, ttl: int = None):
+        """Write hash fields with optional TTL on the whole hash."""
+        if not self.redis_client:
+            await self.connect()
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=mapping)
+            if ttl:
+                pipe.expire(key, ttl)
+            await pipe.execute()
+    
+    async def hgetall(self, key: str) -> dict:
+        """Get all hash fields (empty dict if the key is missing)."""
+        if not self.redis_client:
+            await self.connect()
+        return await self.redis_client.hgetall(key)
+    
     async def delete(self, key: str):
         """Delete value from cache."""
         if not self.redis_client:
@@ -40,7 +68,12 @@ class RedisCache:
         await self.redis_client.delete(key)
     
     async def invalidate_menu_cache(self):
-        """Invalidate menu cache."""
-        await self.delete(settings.REDIS_MENU_CACHE_KEY)
+        """Invalidate menu cache and bump the menu version seen by every worker."""
+        if not self.redis_client:
+            await self.connect()
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.delete(settings.REDIS_MENU_CACHE_KEY)
+            pipe.incr(settings.REDIS_MENU_VERSION_KEY)
+            await pipe.execute()
 
 cache = RedisCache()
@@ -0,0 +1,52 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from threading import Lock
+
+
+class Metrics:
+    """In-process counters and latency timings for the current worker."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._counters = defaultdict(int)
+        self._timings = {}
+
+    def increment(self, name: str, value: int = 1):
+        """Increase a counter."""
+        with self._lock:
+            self._counters[name] += value
+
+    def observe(self, name: str, seconds: float):
+        """Record a single duration in seconds."""
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                timing = self._timings[name] = {"count": 0, "total": 0.0, "max": 0.0}
+            timing["count"] += 1
+            timing["total"] += seconds
+            timing["max"] = max(timing["max"], seconds)
+
+    @contextmanager
+    def timer(self, name: str):
+        """Measure the duration of the wrapped block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def snapshot(self) -> dict:
+        """Return a copy of all counters and timing summaries (in milliseconds)."""
+        with self._lock:
+            timings = {
+                name: {
+                    "count": t["count"],
+                    "avg_ms": round(t["total"] / t["count"] * 1000, 3) if t["count"] else 0.0,
+                    "max_ms": round(t["max"] * 1000, 3),
+                }
+                for name, t in self._timings.items()
+            }
+            return {"counters": dict(self._counters), "timings": timings}
+
+metrics = Metrics()
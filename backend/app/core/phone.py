@@ -0,0 +1,19 @@
+from typing import Optional
+
+
+def normalize_phone(raw_phone: Optional[str]) -> str:
+    """
+    Canonical form of a phone number: digits only, with the Kazakhstan
+    country code (8XXXXXXXXXX and 10-digit local numbers become 7XXXXXXXXXX).
+    Returns an empty string when there are no digits. Keep in sync with
+    the backfill in add_user_phone_normalized.sql.
+    """
+    digits = ''.join(filter(str.isdigit, raw_phone or ""))
+
+    if len(digits) == 11 and digits.startswith('8'):
+        digits = '7' + digits[1:]
+
+    if len(digits) == 10:
+        digits = '7' + digits
+
+    return digits
@@ -0,0 +1,74 @@
+import json
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.models import UserRole
+
+PRINCIPAL_CACHE_PREFIX = "auth:principal:"
+
+
+class Principal(NamedTuple):
+    """The authenticated caller: enough to authorize a request without loading the user."""
+    id: int
+    role: UserRole
+
+
+class PrincipalCache:
+    """
+    Short-lived cache of active users' principals, keyed by user ID.
+    Each worker keeps an LRU with a TTL of PRINCIPAL_CACHE_TTL seconds; with
+    PRINCIPAL_CACHE_REDIS a miss is looked up in Redis before the database.
+    Call invalidate() after changing a user's role, is_active or password.
+    Other workers notice within their TTL.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()  # user ID -> (expires_at, Principal)
+
+    async def get(self, user_id: int) -> Optional[Principal]:
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            expires_at, principal = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(user_id)
+                metrics.increment("auth.principal_cache.hits")
+                return principal
+            del self._entries[user_id]
+
+        if settings.PRINCIPAL_CACHE_REDIS:
+            cached = await cache.get(f"{PRINCIPAL_CACHE_PREFIX}{user_id}")
+            if cached:
+                principal = Principal(id=user_id, role=UserRole(json.loads(cached)["role"]))
+                self._remember(principal)
+                metrics.increment("auth.principal_cache.redis_hits")
+                return principal
+
+        metrics.increment("auth.principal_cache.misses")
+        return None
+
+    async def put(self, principal: Principal):
+        """Cache the principal of an active user."""
+        self._remember(principal)
+        if settings.PRINCIPAL_CACHE_REDIS:
+            await cache.set(
+                f"{PRINCIPAL_CACHE_PREFIX}{principal.id}",
+                json.dumps({"role": principal.role.value}),
+                settings.PRINCIPAL_CACHE_REDIS_TTL
+            )
+
+    async def invalidate(self, user_id: int):
+        """Forget a user's principal in this worker and in Redis."""
+        self._entries.pop(user_id, None)
+        if settings.PRINCIPAL_CACHE_REDIS:
+            await cache.delete(f"{PRINCIPAL_CACHE_PREFIX}{user_id}")
+
+    def _remember(self, principal: Principal):
+        self._entries[principal.id] = (time.monotonic() + settings.PRINCIPAL_CACHE_TTL, principal)
+        self._entries.move_to_end(principal.id)
+        while len(self._entries) > settings.PRINCIPAL_CACHE_SIZE:
+            self._entries.popitem(last=False)
+
+principal_cache = PrincipalCache()
@@ -0,0 +1,123 @@
+import logging
+import math
+import time
+import uuid
+from typing import List, NamedTuple, Optional, Tuple
+from redis.exceptions import RedisError
+from app.core.cache import cache
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_PREFIX = "ratelimit:"
+
+# Sliding-window log per key: a sorted set of attempt timestamps (ms).
+# Every key is checked first and the attempt is recorded on all of them only
+# if none is at its limit, so rejected attempts do not extend the window.
+# Returns 0 when allowed, otherwise milliseconds until a slot frees up.
+# KEYS: limit keys; ARGV: now, member, then window (ms) and limit per key.
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local retry_after = 0
+for i, key in ipairs(KEYS) do
+    local window = tonumber(ARGV[1 + i * 2])
+    local limit = tonumber(ARGV[2 + i * 2])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= limit then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        local wait = tonumber(oldest[2]) + window - now
+        if wait > retry_after then
+            retry_after = wait
+        end
+    end
+end
+if retry_after > 0 then
+    return retry_after
+end
+for i, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, ARGV[2])
+    redis.call('PEXPIRE', key, tonumber(ARGV[1 + i * 2]))
+end
+return 0
+"""
+
+
+class RateLimit(NamedTuple):
+    limit: int  # attempts allowed per window
+    window: int  # seconds
+
+
+def _active_rules(rules: List[Tuple[str, RateLimit]]) -> List[Tuple[str, RateLimit]]:
+    """Drop rules without an identifier or with limiting disabled."""
+    return [(identifier, rule) for identifier, rule in rules if identifier and rule.limit > 0]
+
+
+class SlidingWindowLimiter:
+    """
+    Redis sliding-window rate limiter shared by all workers.
+    One atomic script call checks and records an attempt against several
+    keys (say a phone number and an IP) at once.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._script = None
+
+    async def _get_script(self):
+        client = await cache.get_client()
+        if client is not self._client:
+            self._client = client
+            self._script = client.register_script(SLIDING_WINDOW_SCRIPT)
+        return self._script
+
+    async def acquire(
+        self, scope: str, rules: List[Tuple[str, RateLimit]], attempt_id: Optional[str] = None
+    ) -> int:
+        """
+        Record an attempt for every (identifier, limit) rule in `scope`.
+        Returns 0 if allowed, otherwise the seconds to wait. Pass a unique
+        `attempt_id` to be able to release() the attempt later. Fails open
+        when Redis is unavailable: throttling must not take logins down with it.
+        """
+        rules = _active_rules(rules)
+        if not rules:
+            return 0
+
+        now = int(time.time() * 1000)
+        args = [now, attempt_id or f"{now}:{uuid.uuid4().hex}"]
+        for _, rule in rules:
+            args.extend([rule.window * 1000, rule.limit])
+
+        try:
+            script = await self._get_script()
+            retry_after_ms = await script(
+                keys=[f"{RATE_LIMIT_PREFIX}{scope}:{identifier}" for identifier, _ in rules],
+                args=args
+            )
+        except RedisError:
+            logger.warning("Rate limiter unavailable, letting %s through", scope, exc_info=True)
+            metrics.increment("rate_limit.errors")
+            return 0
+
+        if retry_after_ms:
+            metrics.increment(f"rate_limit.{scope}.rejected")
+            return max(1, math.ceil(int(retry_after_ms) / 1000))
+        return 0
+
+    async def release(self, scope: str, rules: List[Tuple[str, RateLimit]], attempt_id: str):
+        """Take back an attempt recorded by acquire(), e.g. because it succeeded."""
+        rules = _active_rules(rules)
+        if not rules:
+            return
+        try:
+            client = await cache.get_client()
+            async with client.pipeline(transaction=False) as pipe:
+                for identifier, _ in rules:
+                    pipe.zrem(f"{RATE_LIMIT_PREFIX}{scope}:{identifier}", attempt_id)
+                await pipe.execute()
+        except RedisError:
+            logger.warning("Rate limiter unavailable, could not release %s attempt", scope, exc_info=True)
+            metrics.increment("rate_limit.errors")
+
+
+rate_limiter = SlidingWindowLimiter()
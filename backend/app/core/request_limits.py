@@ -0,0 +1,28 @@
+from typing import Dict, Tuple
+from fastapi.responses import ORJSONResponse
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class RequestSizeLimitMiddleware:
+    """
+    Reject requests whose Content-Length is over the limit for their path
+    with 413, before the body is received. Endpoints parse multipart forms
+    (and spool them to disk) before their own checks run, so a size cap in
+    the endpoint alone still lets the whole upload through. Chunked
+    requests without Content-Length are left to the endpoint.
+    """
+
+    def __init__(self, app: ASGIApp, limits: Dict[str, Tuple[int, str]]):
+        self.app = app
+        self.limits = limits  # path -> (max bytes, error detail)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and scope["path"] in self.limits:
+            max_bytes, detail = self.limits[scope["path"]]
+            content_length = Headers(scope=scope).get("content-length", "")
+            if content_length.isdigit() and int(content_length) > max_bytes:
+                response = ORJSONResponse({"detail": detail}, status_code=413, headers={"Connection": "close"})
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
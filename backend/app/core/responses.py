@@ -0,0 +1,57 @@
+import os
+from typing import Any, Mapping, Optional, Union
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+from starlette.staticfiles import PathLike, StaticFiles
+from starlette.types import Scope
+from app.core.config import settings
+
+
+def json_response(
+    body: Union[str, bytes],
+    headers: Optional[Mapping[str, str]] = None,
+    status_code: int = 200
+) -> Response:
+    """Send JSON that is already serialized, such as a cached payload."""
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
+
+
+def schema_response(
+    content: Any,
+    adapter: Optional[TypeAdapter] = None,
+    headers: Optional[Mapping[str, str]] = None,
+    status_code: int = 200
+) -> Response:
+    """
+    Serialize schema objects with pydantic's own JSON serializer and send
+    them as they are. FastAPI would otherwise dump them to dicts, validate
+    them against the response_model again and run jsonable_encoder before
+    rendering. Only use this for content built as the route's response
+    schema; pass an adapter for lists.
+    """
+    if adapter is not None:
+        body = adapter.dump_json(content)
+    elif isinstance(content, BaseModel):
+        body = content.model_dump_json()
+    else:
+        raise TypeError("schema_response needs a TypeAdapter for non-model content")
+    return json_response(body, headers=headers, status_code=status_code)
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """
+    StaticFiles for content-addressed files: a URL never changes what it
+    serves, so browsers and proxies may keep a copy for
+    UPLOADS_CACHE_MAX_AGE without revalidating.
+    """
+
+    def file_response(
+        self,
+        full_path: PathLike,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200
+    ) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        response.headers["Cache-Control"] = f"public, max-age={settings.UPLOADS_CACHE_MAX_AGE}, immutable"
+        return response
@@ -1,8 +1,20 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 import bcrypt
 from app.core.config import settings
+from app.core.metrics import metrics
+
+# bcrypt releases the GIL, so hashes run in parallel on these threads. The
+# pool is separate from the default threadpool so a login burst queues
+# here instead of starving database work.
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password."""
@@ -16,6 +28,28 @@ def get_password_hash(password: str) -> str:
     salt = bcrypt.gensalt()
     return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
 
+async def _run_password_job(name: str, fn, *args):
+    """Run a bcrypt call on the password pool, recording queue and run time."""
+    submitted = time.perf_counter()
+    
+    def job():
+        started = time.perf_counter()
+        metrics.observe("password_hash.queue", started - submitted)
+        try:
+            return fn(*args)
+        finally:
+            metrics.observe(f"password_hash.{name}", time.perf_counter() - started)
+    
+    return await asyncio.get_running_loop().run_in_executor(_password_executor, job)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password without blocking the event loop."""
+    return await _run_password_job("verify", verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash without blocking the event loop."""
+    return await _run_password_job("hash", get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
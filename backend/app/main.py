@@ -1,21 +1,62 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
 from app.api.v1 import api_router
-from app.db.session import engine
+from app.db.session import engine, SessionLocal
 from app.db.base import Base
+from app.core.cache import cache
+from app.core.request_limits import RequestSizeLimitMiddleware
+from app.core.responses import ImmutableStaticFiles
+from app.services.kaspi import kaspi_service
+from app.services.order_sweeper import pending_order_sweeper
+from app.services.order_intake import order_intake
+from app.services.dashboard_counters import dashboard_counters
+from app.services.avatars import avatar_collector, upload_request_limit
+from app.services.sales_rollup import ensure_daily_sales
 import os
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+def _ensure_daily_sales():
+    with SessionLocal() as db:
+        ensure_daily_sales(db)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared clients on startup and close them on shutdown."""
+    # Before serving, so no sale is recorded into an unfilled rollup
+    await run_in_threadpool(_ensure_daily_sales)
+    await kaspi_service.start()
+    await pending_order_sweeper.start()
+    await order_intake.start()
+    await dashboard_counters.start()
+    await avatar_collector.start()
+    yield
+    await avatar_collector.stop()
+    await dashboard_counters.stop()
+    await order_intake.stop()
+    await pending_order_sweeper.stop()
+    await kaspi_service.close()
+    await cache.disconnect()
+
 app = FastAPI(
     title="Social Coffee Shop API",
     description="API for Social Coffee Shop web application",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+# Refuse oversized uploads before their body is read (inside CORS so the 413 reaches the browser)
+app.add_middleware(RequestSizeLimitMiddleware, limits={
+    "/api/v1/profile/avatar": upload_request_limit(),
+    "/api/v1/admin/profile/avatar": upload_request_limit(),
+})
+
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
@@ -27,13 +68,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
 # Create uploads directory if it doesn't exist
 os.makedirs("uploads", exist_ok=True)
 
-# Mount static files for uploads
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Mount static files for uploads (content-hashed names, cached for a year)
+app.mount("/uploads", ImmutableStaticFiles(directory="uploads"), name="uploads")
 
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Table, Text, Enum as SQLEnum, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Boolean, Date, DateTime, ForeignKey, Table, Text, Enum as SQLEnum, JSON, Index, UniqueConstraint
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
+from app.core.phone import normalize_phone
 from app.db.base import Base
 import enum
+import uuid
 
 # User Roles
 class UserRole(str, enum.Enum):
@@ -22,12 +24,17 @@ class ProductStatus(str, enum.Enum):
     OUT_OF_STOCK = "out_of_stock"
     INACTIVE = "inactive"
 
+def new_external_id() -> str:
+    """Stable catalog identifier used to match records across environments."""
+    return uuid.uuid4().hex
+
 # Association table for products and option groups
 product_option_groups = Table(
     'product_option_groups',
     Base.metadata,
     Column('product_id', Integer, ForeignKey('products.id', ondelete='CASCADE')),
-    Column('option_group_id', Integer, ForeignKey('option_groups.id', ondelete='CASCADE'))
+    Column('option_group_id', Integer, ForeignKey('option_groups.id', ondelete='CASCADE')),
+    Index('product_option_groups_pair_key', 'product_id', 'option_group_id', unique=True)
 )
 
 # User Model
@@ -38,6 +45,8 @@ class User(Base):
     first_name = Column(String(100), nullable=False)
     last_name = Column(String(100), nullable=False)
     phone_number = Column(String(20), unique=True, nullable=False, index=True)
+    # Canonical digits of phone_number; auth looks users up by this
+    phone_normalized = Column(String(20), unique=True, nullable=False, index=True)
     password_hash = Column(String(255), nullable=False)
     avatar_url = Column(Text)
     role = Column(SQLEnum(UserRole), default=UserRole.CLIENT, nullable=False)
@@ -48,12 +57,18 @@ class User(Base):
     
     # Relationships
     orders = relationship("Order", back_populates="user")
+    
+    @validates("phone_number")
+    def _sync_phone_normalized(self, key, phone_number):
+        self.phone_normalized = normalize_phone(phone_number)
+        return phone_number
 
 # Category Model
 class Category(Base):
     __tablename__ = "categories"
     
     id = Column(Integer, primary_key=True, index=True)
+    external_id = Column(String(64), unique=True, nullable=False, default=new_external_id)
     name_rus = Column(String(100), nullable=False)
     name_kaz = Column(String(100), nullable=False)
     order = Column(Integer, default=0)
@@ -69,6 +84,7 @@ class Product(Base):
     __tablename__ = "products"
     
     id = Column(Integer, primary_key=True, index=True)
+    external_id = Column(String(64), unique=True, nullable=False, default=new_external_id)
     category_id = Column(Integer, ForeignKey('categories.id', ondelete='CASCADE'))
     name_rus = Column(String(100), nullable=False)
     name_kaz = Column(String(100), nullable=False)
@@ -90,6 +106,7 @@ class OptionGroup(Base):
     __tablename__ = "option_groups"
     
     id = Column(Integer, primary_key=True, index=True)
+    external_id = Column(String(64), unique=True, nullable=False, default=new_external_id)
     name_rus = Column(String(100), nullable=False)
     name_kaz = Column(String(100), nullable=False)
     is_required = Column(Boolean, default=False)
@@ -105,6 +122,7 @@ class Option(Base):
     __tablename__ = "options"
     
     id = Column(Integer, primary_key=True, index=True)
+    external_id = Column(String(64), unique=True, nullable=False, default=new_external_id)
     group_id = Column(Integer, ForeignKey('option_groups.id', ondelete='CASCADE'))
     name_rus = Column(String(100), nullable=False)
     name_kaz = Column(String(100), nullable=False)
@@ -143,6 +161,12 @@ class Order(Base):
     # Relationships
     user = relationship("User", back_populates="orders")
     items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        Index("ix_orders_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_orders_delivery_type_created_at_id", "delivery_type", "created_at", "id"),
+        Index("ix_orders_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
 
 # Order Item Model
 class OrderItem(Base):
@@ -175,6 +199,24 @@ class OrderItemOption(Base):
     order_item = relationship("OrderItem", back_populates="selected_options")
 
 
+# Daily Sales Rollup (paid and completed orders by shop-local creation day)
+class DailySales(Base):
+    __tablename__ = "daily_sales"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)
+    delivery_type = Column(String(50), nullable=False, default='pickup')
+    revenue = Column(Float, nullable=False, default=0)
+    order_count = Column(Integer, nullable=False, default=0)
+    items_count = Column(Integer, nullable=False, default=0)
+    bonus_points = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint("day", "delivery_type", name="uq_daily_sales_day_delivery_type"),
+    )
+
+
 # Delivery Zone Model
 class DeliveryZone(Base):
     __tablename__ = "delivery_zones"
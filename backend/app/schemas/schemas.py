@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
-from datetime import datetime
+from typing import Optional, List, Literal, Any, Dict, Union
+from datetime import date, datetime
 from app.models.models import UserRole, OrderStatus, ProductStatus
 
 # User Schemas
@@ -43,10 +43,6 @@ class AdminProfileUpdate(BaseModel):
     phone_number: Optional[str] = None
 
 
-class AdminAvatarUpdate(BaseModel):
-    avatar_base64: str
-
-
 class AdminPasswordUpdate(BaseModel):
     current_password: str
     new_password: str = Field(..., min_length=6)
@@ -141,6 +137,69 @@ class ProductResponse(ProductBase):
     class Config:
         from_attributes = True
 
+# Bulk catalog changes
+class CatalogOperation(BaseModel):
+    op: Literal[
+        "create_category", "update_category", "delete_category",
+        "create_product", "update_product", "delete_product",
+        "create_option_group", "create_option", "delete_option"
+    ]
+    id: Optional[Union[int, str]] = None  # Record ID or "$ref" of an earlier operation
+    ref: Optional[str] = None  # Name for the ID this operation creates
+    data: Optional[Dict[str, Any]] = None
+
+class CatalogBatchRequest(BaseModel):
+    operations: List[CatalogOperation] = Field(..., min_length=1, max_length=1000)
+    atomic: bool = True
+
+class CatalogOperationResult(BaseModel):
+    index: int
+    op: str
+    success: bool
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class CatalogBatchResponse(BaseModel):
+    committed: bool
+    results: List[CatalogOperationResult] = []
+
+# Catalog import/export (records reference each other by external_id)
+class CatalogCategoryRecord(CategoryBase):
+    external_id: str = Field(..., min_length=1, max_length=64)
+
+class CatalogOptionGroupRecord(OptionGroupBase):
+    external_id: str = Field(..., min_length=1, max_length=64)
+
+class CatalogOptionRecord(OptionBase):
+    external_id: str = Field(..., min_length=1, max_length=64)
+    group: Optional[str] = None  # Option group external_id
+
+class CatalogProductRecord(BaseModel):
+    external_id: str = Field(..., min_length=1, max_length=64)
+    category: Optional[str] = None  # Category external_id
+    name_rus: str
+    name_kaz: str
+    description_rus: Optional[str] = None
+    description_kaz: Optional[str] = None
+    base_price: float
+    image_url: Optional[str] = None
+    status: ProductStatus = ProductStatus.ACTIVE
+    option_groups: List[str] = []  # Option group external_ids
+
+class CatalogDocument(BaseModel):
+    version: int = 1
+    categories: List[CatalogCategoryRecord] = []
+    option_groups: List[CatalogOptionGroupRecord] = []
+    options: List[CatalogOptionRecord] = []
+    products: List[CatalogProductRecord] = []
+
+class CatalogImportResponse(BaseModel):
+    categories: int
+    option_groups: int
+    options: int
+    products: int
+    links: int
+
 # Menu Response (for client side)
 class MenuCategory(BaseModel):
     id: int
@@ -210,13 +269,15 @@ class OrderStatusResponse(BaseModel):
     order_id: int
     status: OrderStatus
     payment_url: Optional[str] = None
+    queued: bool = False  # Accepted by the intake queue, invoice not created yet
 
 # Payment Schemas
 class PaymentCreateResponse(BaseModel):
     order_id: int
-    payment_url: str
-    qr_token: str
+    payment_url: Optional[str] = None  # None while the order is queued
+    qr_token: Optional[str] = None
     total_amount: float
+    queued: bool = False
 
 # Dashboard Stats
 class DashboardStats(BaseModel):
@@ -226,6 +287,42 @@ class DashboardStats(BaseModel):
     total_orders_month: int
     active_orders: int
 
+class DailySalesResponse(BaseModel):
+    day: date
+    delivery_type: str
+    revenue: float
+    order_count: int
+    items_count: int
+    bonus_points: int
+    
+    class Config:
+        from_attributes = True
+
+# Sales analytics
+class TopProduct(BaseModel):
+    product_id: Optional[int] = None
+    product_name: str
+    quantity: int
+    revenue: float
+    orders: int
+
+class OptionUsage(BaseModel):
+    option_name: str
+    quantity: int  # sold items carrying the option
+    revenue: float  # option surcharges collected
+    share: float  # of the group's items
+
+class OptionAttachRate(BaseModel):
+    option_group_name: str
+    items: int  # sold items with at least one option of the group
+    attach_rate: float  # of all sold items in the range
+    options: List[OptionUsage] = []
+
+class OrderHeatmap(BaseModel):
+    # [weekday][hour], Monday = 0, shop-local time
+    orders: List[List[int]]
+    revenue: List[List[float]]
+
 
 # Delivery Zone Schemas
 class DeliveryZoneBase(BaseModel):
@@ -0,0 +1,165 @@
+import hashlib
+import json
+from datetime import date, timedelta
+from typing import Callable, List
+from pydantic import TypeAdapter
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import distinct, extract, func, select
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import ReadSessionLocal
+from app.models.models import Order, OrderItem, OrderItemOption
+from app.schemas.schemas import OrderHeatmap, OptionAttachRate, OptionUsage, TopProduct
+from app.services.dashboard import shop_day_start, shop_now
+from app.services.sales_rollup import SOLD_STATUSES
+
+ANALYTICS_CACHE_PREFIX = "analytics:"
+
+TOP_PRODUCTS = TypeAdapter(List[TopProduct])
+ATTACH_RATES = TypeAdapter(List[OptionAttachRate])
+
+
+def _sold_in_range(query, date_from: date, date_to: date):
+    """Limit a query joined to orders to sales of the shop-local day range (inclusive)."""
+    return query.where(
+        Order.status.in_(SOLD_STATUSES),
+        Order.created_at >= shop_day_start(date_from),
+        Order.created_at < shop_day_start(date_to + timedelta(days=1))
+    )
+
+
+def top_products(db, date_from: date, date_to: date, order_by: str, limit: int) -> List[TopProduct]:
+    """Best-selling products by revenue or quantity."""
+    quantity = func.sum(OrderItem.quantity).label("quantity")
+    revenue = func.sum(OrderItem.total_price).label("revenue")
+    query = _sold_in_range(
+        select(
+            OrderItem.product_id,
+            # Name stored on the item, in case the product was renamed or deleted
+            func.max(OrderItem.product_name).label("product_name"),
+            quantity,
+            revenue,
+            func.count(distinct(OrderItem.order_id)).label("orders"),
+        ).join(Order, Order.id == OrderItem.order_id),
+        date_from, date_to
+    ).group_by(OrderItem.product_id)
+
+    ranking = revenue if order_by == "revenue" else quantity
+    rows = db.execute(query.order_by(ranking.desc(), OrderItem.product_id).limit(limit)).all()
+    return [
+        TopProduct(
+            product_id=row.product_id,
+            product_name=row.product_name,
+            quantity=row.quantity or 0,
+            revenue=row.revenue or 0,
+            orders=row.orders
+        )
+        for row in rows
+    ]
+
+
+def option_attach_rates(db, date_from: date, date_to: date) -> List[OptionAttachRate]:
+    """
+    Per option group: sold items carrying one of its options, as a share of
+    all sold items, with a breakdown per option. Items count by quantity.
+    """
+    total_items = db.execute(_sold_in_range(
+        select(func.coalesce(func.sum(OrderItem.quantity), 0))
+        .join(Order, Order.id == OrderItem.order_id),
+        date_from, date_to
+    )).scalar()
+
+    # Each item once per group, even with several options of a multi-choice group
+    item_groups = _sold_in_range(
+        select(OrderItemOption.option_group_name, OrderItem.id, OrderItem.quantity)
+        .join(OrderItem, OrderItem.id == OrderItemOption.order_item_id)
+        .join(Order, Order.id == OrderItem.order_id),
+        date_from, date_to
+    ).distinct().subquery()
+    group_rows = db.execute(
+        select(item_groups.c.option_group_name, func.sum(item_groups.c.quantity))
+        .group_by(item_groups.c.option_group_name)
+    ).all()
+
+    option_rows = db.execute(_sold_in_range(
+        select(
+            OrderItemOption.option_group_name,
+            OrderItemOption.option_name,
+            func.sum(OrderItem.quantity),
+            func.sum(func.coalesce(OrderItemOption.option_price, 0) * OrderItem.quantity),
+        )
+        .join(OrderItem, OrderItem.id == OrderItemOption.order_item_id)
+        .join(Order, Order.id == OrderItem.order_id),
+        date_from, date_to
+    ).group_by(OrderItemOption.option_group_name, OrderItemOption.option_name)).all()
+
+    groups = {
+        name: OptionAttachRate(
+            option_group_name=name,
+            items=items,
+            attach_rate=round(items / total_items, 4) if total_items else 0.0
+        )
+        for name, items in group_rows
+    }
+    for group_name, option_name, quantity, revenue in option_rows:
+        group = groups[group_name]
+        group.options.append(OptionUsage(
+            option_name=option_name,
+            quantity=quantity,
+            revenue=revenue or 0,
+            share=round(quantity / group.items, 4) if group.items else 0.0
+        ))
+
+    for group in groups.values():
+        group.options.sort(key=lambda option: -option.quantity)
+    return sorted(groups.values(), key=lambda group: -group.items)
+
+
+def order_heatmap(db, date_from: date, date_to: date) -> OrderHeatmap:
+    """Orders and revenue by shop-local weekday and hour."""
+    local_time = func.timezone(settings.SHOP_TIMEZONE, Order.created_at)
+    weekday = extract("isodow", local_time).label("weekday")
+    hour = extract("hour", local_time).label("hour")
+    rows = db.execute(_sold_in_range(
+        select(weekday, hour, func.count(Order.id), func.sum(Order.total_amount)),
+        date_from, date_to
+    ).group_by(weekday, hour)).all()
+
+    orders = [[0] * 24 for _ in range(7)]
+    revenue = [[0.0] * 24 for _ in range(7)]
+    for day, hour_of_day, count, total in rows:
+        orders[int(day) - 1][int(hour_of_day)] = count
+        revenue[int(day) - 1][int(hour_of_day)] = total or 0.0
+    return OrderHeatmap(orders=orders, revenue=revenue)
+
+
+async def cached_report(name: str, params: dict, date_to: date, compute: Callable, adapter=None) -> str:
+    """
+    Return a report as JSON, computing it on the read session in the
+    threadpool on a cache miss. Ranges that end before today only change
+    on late cancellations, so they are kept longer.
+    """
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+    key = f"{ANALYTICS_CACHE_PREFIX}{name}:{digest}"
+
+    cached = await cache.get(key)
+    if cached:
+        metrics.increment(f"analytics.{name}.cache_hits")
+        return cached
+
+    def run():
+        with ReadSessionLocal() as db:
+            return compute(db, **params)
+
+    with metrics.timer(f"analytics.{name}"):
+        result = await run_in_threadpool(run)
+    payload = adapter.dump_json(result).decode() if adapter else result.model_dump_json()
+
+    ttl = (
+        settings.ANALYTICS_CLOSED_RANGE_CACHE_TTL
+        if date_to < shop_now().date()
+        else settings.ANALYTICS_CACHE_TTL
+    )
+    await cache.set(key, payload, ttl)
+    return payload
@@ -0,0 +1,205 @@
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from typing import BinaryIO, Optional, Tuple
+from fastapi import UploadFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import SessionLocal
+from app.models.models import User
+
+logger = logging.getLogger(__name__)
+
+AVATAR_DIR = os.path.join("uploads", "avatars")
+AVATAR_URL_PREFIX = "/uploads/avatars/"
+AVATAR_FORMATS = {"JPEG", "PNG", "WEBP"}
+MAX_PIXELS = 40_000_000
+NOT_AN_IMAGE = "Avatar must be a JPEG, PNG or WebP image"
+CHUNK_SIZE = 64 * 1024
+# Room for multipart boundaries and part headers around the file
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class InvalidAvatar(ValueError):
+    """The upload is not an image we accept."""
+
+
+class AvatarTooLarge(InvalidAvatar):
+    """The upload is over AVATAR_MAX_BYTES."""
+
+
+def too_large_message() -> str:
+    """Error detail for uploads over AVATAR_MAX_BYTES."""
+    return f"Avatar must be at most {settings.AVATAR_MAX_BYTES / (1024 * 1024):g} MB"
+
+
+def upload_request_limit() -> Tuple[int, str]:
+    """Content-Length cap for avatar upload requests, for RequestSizeLimitMiddleware."""
+    return settings.AVATAR_MAX_BYTES + MULTIPART_OVERHEAD, too_large_message()
+
+
+def _copy_capped(source: BinaryIO, target: BinaryIO):
+    """Copy in chunks, giving up as soon as the size cap is passed."""
+    written = 0
+    while chunk := source.read(CHUNK_SIZE):
+        written += len(chunk)
+        if written > settings.AVATAR_MAX_BYTES:
+            raise AvatarTooLarge(too_large_message())
+        target.write(chunk)
+
+
+def _process_avatar(source: BinaryIO, user_id: int) -> str:
+    """
+    Copy the upload to a temporary file, check that it is a JPEG, PNG or
+    WebP image, shrink it to AVATAR_SIZE and move the JPEG into place.
+    The file is named after a hash of its content, so a URL always points
+    at the same bytes and can be cached forever. Temporary files live next
+    to the target so the final rename is atomic.
+    """
+    os.makedirs(AVATAR_DIR, exist_ok=True)
+    upload_path = output_path = None
+    try:
+        with tempfile.NamedTemporaryFile(dir=AVATAR_DIR, suffix=".upload", delete=False) as upload:
+            upload_path = upload.name
+            _copy_capped(source, upload)
+
+        try:
+            image = Image.open(upload_path)
+        except (UnidentifiedImageError, Image.DecompressionBombError) as e:
+            raise InvalidAvatar(NOT_AN_IMAGE) from e
+
+        with image:
+            if image.format not in AVATAR_FORMATS:
+                raise InvalidAvatar(NOT_AN_IMAGE)
+            # A small compressed file can still decode to a huge bitmap
+            if image.width * image.height > MAX_PIXELS:
+                raise InvalidAvatar("Avatar image dimensions are too large")
+            # Lets JPEG decode straight at a reduced scale
+            image.draft("RGB", (settings.AVATAR_SIZE, settings.AVATAR_SIZE))
+            try:
+                avatar = ImageOps.exif_transpose(image)
+                avatar.thumbnail((settings.AVATAR_SIZE, settings.AVATAR_SIZE))
+                avatar = avatar.convert("RGB")
+            except OSError as e:
+                raise InvalidAvatar(NOT_AN_IMAGE) from e
+
+        with tempfile.NamedTemporaryFile(dir=AVATAR_DIR, suffix=".jpg", delete=False) as output:
+            output_path = output.name
+            avatar.save(output, "JPEG", quality=85, optimize=True)
+
+        digest = hashlib.sha256()
+        with open(output_path, "rb") as output:
+            while chunk := output.read(CHUNK_SIZE):
+                digest.update(chunk)
+        filename = f"avatar_{user_id}_{digest.hexdigest()[:16]}.jpg"
+
+        os.chmod(output_path, 0o644)
+        os.replace(output_path, os.path.join(AVATAR_DIR, filename))
+        output_path = None
+        return f"{AVATAR_URL_PREFIX}{filename}"
+    finally:
+        for path in (upload_path, output_path):
+            if path and os.path.exists(path):
+                os.remove(path)
+
+
+async def save_avatar(upload: UploadFile, user_id: int) -> str:
+    """Store an uploaded avatar off the event loop; returns its URL."""
+    with metrics.timer("avatars.save"):
+        return await run_in_threadpool(_process_avatar, upload.file, user_id)
+
+
+def discard_avatar(avatar_url: Optional[str]):
+    """Delete a replaced avatar file; the caller has already committed the new URL."""
+    if not avatar_url or not avatar_url.startswith(AVATAR_URL_PREFIX):
+        return
+    filename = avatar_url[len(AVATAR_URL_PREFIX):]
+    if os.path.basename(filename) != filename:
+        return
+    try:
+        os.remove(os.path.join(AVATAR_DIR, filename))
+    except FileNotFoundError:
+        pass
+
+
+class AvatarCollector:
+    """
+    Periodically deletes avatar files no user points at any more: leftovers
+    of uploads whose commit failed, of concurrent uploads, or of workers
+    that died before discard_avatar() ran.
+    """
+
+    def __init__(self):
+        self._task = None
+
+    async def start(self):
+        """Start the background sweep loop (called on app startup)."""
+        if settings.AVATAR_GC_INTERVAL > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the sweep loop (called on app shutdown)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await run_in_threadpool(self.collect)
+            except Exception:
+                logger.exception("Avatar sweep failed")
+            await asyncio.sleep(settings.AVATAR_GC_INTERVAL)
+
+    def collect(self) -> int:
+        """
+        Delete unreferenced files older than AVATAR_GC_GRACE seconds; newer
+        ones may belong to an upload whose URL is not committed yet.
+        Returns the number of files deleted.
+        """
+        metrics.increment("avatars.gc.runs")
+        cutoff = time.time() - settings.AVATAR_GC_GRACE
+        try:
+            candidates = [
+                entry.name for entry in os.scandir(AVATAR_DIR)
+                if entry.is_file() and entry.stat().st_mtime < cutoff
+            ]
+        except FileNotFoundError:
+            return 0
+        if not candidates:
+            return 0
+
+        db = SessionLocal()
+        try:
+            referenced = set(db.scalars(
+                select(User.avatar_url).where(User.avatar_url.startswith(AVATAR_URL_PREFIX))
+            ))
+        finally:
+            db.close()
+
+        deleted = 0
+        for name in candidates:
+            if f"{AVATAR_URL_PREFIX}{name}" in referenced:
+                continue
+            try:
+                os.remove(os.path.join(AVATAR_DIR, name))
+                deleted += 1
+            except FileNotFoundError:
+                pass
+
+        metrics.increment("avatars.gc.deleted", deleted)
+        if deleted:
+            logger.info("Deleted %d unreferenced avatar files", deleted)
+        return deleted
+
+avatar_collector = AvatarCollector()
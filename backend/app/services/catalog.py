@@ -0,0 +1,78 @@
+from sqlalchemy.orm import Session
+from app.models.models import Category, Product, OptionGroup, Option
+from app.schemas.schemas import (
+    CategoryCreate, CategoryUpdate,
+    ProductCreate, ProductUpdate,
+    OptionGroupCreate, OptionCreate
+)
+
+
+class CatalogNotFound(LookupError):
+    """Raised when a catalog record to change does not exist."""
+
+
+# Catalog changes below only flush; callers commit and invalidate the menu cache.
+
+def _get_or_raise(db: Session, model, record_id: int, label: str):
+    record = db.query(model).filter(model.id == record_id).first()
+    if not record:
+        raise CatalogNotFound(f"{label} not found")
+    return record
+
+def create_category(db: Session, data: CategoryCreate) -> Category:
+    category = Category(**data.model_dump())
+    db.add(category)
+    db.flush()
+    return category
+
+def update_category(db: Session, category_id: int, data: CategoryUpdate) -> Category:
+    category = _get_or_raise(db, Category, category_id, "Category")
+    for key, value in data.model_dump(exclude_unset=True).items():
+        setattr(category, key, value)
+    db.flush()
+    return category
+
+def delete_category(db: Session, category_id: int):
+    db.delete(_get_or_raise(db, Category, category_id, "Category"))
+    db.flush()
+
+def create_product(db: Session, data: ProductCreate) -> Product:
+    product = Product(**data.model_dump(exclude={"option_group_ids"}))
+    if data.option_group_ids:
+        product.option_groups = db.query(OptionGroup).filter(
+            OptionGroup.id.in_(data.option_group_ids)
+        ).all()
+    db.add(product)
+    db.flush()
+    return product
+
+def update_product(db: Session, product_id: int, data: ProductUpdate) -> Product:
+    product = _get_or_raise(db, Product, product_id, "Product")
+    for key, value in data.model_dump(exclude_unset=True, exclude={"option_group_ids"}).items():
+        setattr(product, key, value)
+    if data.option_group_ids is not None:
+        product.option_groups = db.query(OptionGroup).filter(
+            OptionGroup.id.in_(data.option_group_ids)
+        ).all()
+    db.flush()
+    return product
+
+def delete_product(db: Session, product_id: int):
+    db.delete(_get_or_raise(db, Product, product_id, "Product"))
+    db.flush()
+
+def create_option_group(db: Session, data: OptionGroupCreate) -> OptionGroup:
+    group = OptionGroup(**data.model_dump())
+    db.add(group)
+    db.flush()
+    return group
+
+def create_option(db: Session, data: OptionCreate) -> Option:
+    option = Option(**data.model_dump())
+    db.add(option)
+    db.flush()
+    return option
+
+def delete_option(db: Session, option_id: int):
+    db.delete(_get_or_raise(db, Option, option_id, "Option"))
+    db.flush()
@@ -0,0 +1,309 @@
+import csv
+import io
+import json
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Iterator, List
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.models import Category, Product, OptionGroup, Option, product_option_groups
+from app.schemas.schemas import CatalogDocument
+
+CATALOG_FORMAT_VERSION = 1
+
+# CSV holds every record type in one table; `parent` is the category of a
+# product or the group of an option, `price` is a product's base price
+CSV_COLUMNS = [
+    "type", "external_id", "parent", "name_rus", "name_kaz",
+    "description_rus", "description_kaz", "order", "is_active", "price",
+    "is_required", "is_multiple", "is_available", "image_url", "status",
+    "option_groups",
+]
+CSV_LIST_SEPARATOR = "|"
+
+# document section -> CSV record type
+SECTION_TYPES = {
+    "categories": "category",
+    "option_groups": "option_group",
+    "options": "option",
+    "products": "product",
+}
+
+
+class CatalogImportError(ValueError):
+    """Raised when a catalog document fails validation; nothing is written."""
+
+    def __init__(self, errors: List[dict]):
+        self.errors = errors
+        super().__init__(f"{len(errors)} catalog record(s) are invalid")
+
+
+# Export
+
+def _record_batches(db: Session, query) -> Iterator[List[dict]]:
+    """Yield query rows as dicts, in batches from a server-side cursor."""
+    result = db.execute(query.execution_options(yield_per=settings.CATALOG_BATCH_SIZE))
+    try:
+        for partition in result.partitions():
+            yield [dict(row._mapping) for row in partition]
+    finally:
+        result.close()
+
+
+def _product_batches(db: Session) -> Iterator[List[dict]]:
+    """Products with their category and option group external IDs."""
+    query = (
+        select(
+            Product.id,
+            Product.external_id,
+            Category.external_id.label("category"),
+            Product.name_rus, Product.name_kaz,
+            Product.description_rus, Product.description_kaz,
+            Product.base_price, Product.image_url, Product.status,
+        )
+        .outerjoin(Category, Category.id == Product.category_id)
+        .order_by(Product.id)
+    )
+
+    for batch in _record_batches(db, query):
+        product_ids = [record.pop("id") for record in batch]
+        links = defaultdict(list)
+        for product_id, group_external_id in db.execute(
+            select(product_option_groups.c.product_id, OptionGroup.external_id)
+            .join(OptionGroup, OptionGroup.id == product_option_groups.c.option_group_id)
+            .where(product_option_groups.c.product_id.in_(product_ids))
+            .order_by(product_option_groups.c.product_id, OptionGroup.id)
+        ):
+            links[product_id].append(group_external_id)
+
+        for product_id, record in zip(product_ids, batch):
+            record["status"] = record["status"].value if record["status"] else None
+            record["option_groups"] = links[product_id]
+        yield batch
+
+
+def _catalog_sections(db: Session):
+    """(section name, batches of records) in dependency order."""
+    yield "categories", _record_batches(db, select(
+        Category.external_id, Category.name_rus, Category.name_kaz,
+        Category.order, Category.is_active,
+    ).order_by(Category.id))
+    yield "option_groups", _record_batches(db, select(
+        OptionGroup.external_id, OptionGroup.name_rus, OptionGroup.name_kaz,
+        OptionGroup.is_required, OptionGroup.is_multiple,
+    ).order_by(OptionGroup.id))
+    yield "options", _record_batches(db, select(
+        Option.external_id, OptionGroup.external_id.label("group"),
+        Option.name_rus, Option.name_kaz, Option.price, Option.is_available,
+    ).outerjoin(OptionGroup, OptionGroup.id == Option.group_id).order_by(Option.id))
+    yield "products", _product_batches(db)
+
+
+def export_catalog_json(db: Session) -> Iterator[str]:
+    """Stream the catalog as one JSON document in the CatalogDocument shape."""
+    yield '{"version": %d' % CATALOG_FORMAT_VERSION
+    for section, batches in _catalog_sections(db):
+        yield f', "{section}": ['
+        separator = ""
+        for batch in batches:
+            yield separator + ", ".join(json.dumps(record, ensure_ascii=False) for record in batch)
+            separator = ", "
+        yield "]"
+    yield "}\n"
+
+
+def export_catalog_csv(db: Session) -> Iterator[str]:
+    """Stream the catalog as CSV with one row per record."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+
+    for section, batches in _catalog_sections(db):
+        for batch in batches:
+            for record in batch:
+                row = {**record, "type": SECTION_TYPES[section]}
+                if section == "options":
+                    row["parent"] = record["group"]
+                elif section == "products":
+                    row["parent"] = record["category"]
+                    row["price"] = record["base_price"]
+                    row["option_groups"] = CSV_LIST_SEPARATOR.join(record["option_groups"])
+                writer.writerow(row)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+# Import
+
+def parse_catalog_csv(text: str) -> dict:
+    """
+    Turn catalog CSV into a document dict for CatalogDocument validation.
+    Empty cells are left out so schema defaults apply.
+    """
+    sections = {section: [] for section in SECTION_TYPES}
+    types = {record_type: section for section, record_type in SECTION_TYPES.items()}
+
+    for line, row in enumerate(csv.DictReader(io.StringIO(text)), start=2):
+        record_type = (row.pop("type", None) or "").strip()
+        if record_type not in types:
+            raise CatalogImportError([{
+                "loc": ["csv", line, "type"],
+                "msg": f"Unknown record type {record_type!r}"
+            }])
+
+        record = {key: value for key, value in row.items() if key and value not in (None, "")}
+        parent = record.pop("parent", None)
+        price = record.pop("price", None)
+        if record_type == "option":
+            record["group"] = parent
+            if price is not None:
+                record["price"] = price
+        elif record_type == "product":
+            record["category"] = parent
+            record["base_price"] = price
+            record["option_groups"] = [
+                external_id for external_id in record.get("option_groups", "").split(CSV_LIST_SEPARATOR)
+                if external_id
+            ]
+        sections[types[record_type]].append(record)
+
+    return sections
+
+
+def _chunks(items: list) -> Iterator[list]:
+    size = settings.CATALOG_BATCH_SIZE
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _existing_ids(db: Session, model, external_ids: Iterable[str]) -> Dict[str, int]:
+    """Map external IDs already in the database to primary keys."""
+    ids = {}
+    for chunk in _chunks([external_id for external_id in set(external_ids) if external_id]):
+        ids.update(db.execute(
+            select(model.external_id, model.id).where(model.external_id.in_(chunk))
+        ).all())
+    return ids
+
+
+def _upsert(db: Session, model, rows: List[dict]) -> Dict[str, int]:
+    """Insert or update rows keyed on external_id; returns external_id -> id."""
+    ids = {}
+    for chunk in _chunks(rows):
+        stmt = insert(model).values(chunk)
+        updates = {column: stmt.excluded[column] for column in chunk[0] if column != "external_id"}
+        if hasattr(model, "updated_at"):
+            updates["updated_at"] = func.now()
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[model.external_id],
+            set_=updates
+        ).returning(model.external_id, model.id)
+        ids.update(db.execute(stmt).all())
+    return ids
+
+
+def _validate_references(db: Session, document: CatalogDocument) -> List[dict]:
+    """Check duplicate external IDs and that every reference resolves."""
+    errors = []
+
+    for section in SECTION_TYPES:
+        counts = Counter(record.external_id for record in getattr(document, section))
+        for external_id, count in counts.items():
+            if count > 1:
+                errors.append({
+                    "loc": [section, external_id],
+                    "msg": f"Duplicate external_id in {count} records"
+                })
+
+    def check(section, label, references, model, field):
+        known = {record.external_id for record in getattr(document, section)}
+        missing = {external_id for _, external_id in references} - known
+        if missing:
+            missing -= set(_existing_ids(db, model, missing))
+        for index, external_id in references:
+            if external_id in missing:
+                errors.append({
+                    "loc": [field[0], index, field[1]],
+                    "msg": f"Unknown {label} {external_id!r}"
+                })
+
+    check("option_groups", "option group", [
+        (index, option.group) for index, option in enumerate(document.options) if option.group
+    ], OptionGroup, ("options", "group"))
+    check("categories", "category", [
+        (index, product.category) for index, product in enumerate(document.products) if product.category
+    ], Category, ("products", "category"))
+    check("option_groups", "option group", [
+        (index, external_id)
+        for index, product in enumerate(document.products)
+        for external_id in product.option_groups
+    ], OptionGroup, ("products", "option_groups"))
+
+    return errors
+
+
+def import_catalog(db: Session, document: CatalogDocument) -> dict:
+    """
+    Upsert a catalog document keyed on external_id and replace the option
+    group links of every imported product. Records missing from the
+    document are left as they are. References are validated before any
+    write; the caller commits and invalidates the menu cache.
+    """
+    errors = _validate_references(db, document)
+    if errors:
+        raise CatalogImportError(errors)
+
+    category_ids = _upsert(db, Category, [
+        record.model_dump() for record in document.categories
+    ])
+    group_ids = _upsert(db, OptionGroup, [
+        record.model_dump() for record in document.option_groups
+    ])
+
+    # References to records that are already in the database
+    category_ids = {
+        **_existing_ids(db, Category, {p.category for p in document.products} - set(category_ids)),
+        **category_ids
+    }
+    group_ids = {
+        **_existing_ids(db, OptionGroup, (
+            {o.group for o in document.options}
+            | {external_id for p in document.products for external_id in p.option_groups}
+        ) - set(group_ids)),
+        **group_ids
+    }
+
+    _upsert(db, Option, [
+        {**record.model_dump(exclude={"group"}), "group_id": group_ids.get(record.group)}
+        for record in document.options
+    ])
+    product_ids = _upsert(db, Product, [
+        {
+            **record.model_dump(exclude={"category", "option_groups"}),
+            "category_id": category_ids.get(record.category)
+        }
+        for record in document.products
+    ])
+
+    links = [
+        {"product_id": product_ids[record.external_id], "option_group_id": group_ids[external_id]}
+        for record in document.products
+        for external_id in dict.fromkeys(record.option_groups)
+    ]
+    for chunk in _chunks(list(product_ids.values())):
+        db.execute(delete(product_option_groups).where(product_option_groups.c.product_id.in_(chunk)))
+    for chunk in _chunks(links):
+        db.execute(insert(product_option_groups).values(chunk))
+
+    return {
+        "categories": len(document.categories),
+        "option_groups": len(document.option_groups),
+        "options": len(document.options),
+        "products": len(document.products),
+        "links": len(links),
+    }
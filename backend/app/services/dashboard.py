@@ -0,0 +1,92 @@
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.models import DailySales, Order, OrderStatus
+from app.schemas.schemas import DashboardStats
+from app.services.sales_rollup import SOLD_STATUSES
+
+
+def shop_now() -> datetime:
+    """Current time in the shop's timezone."""
+    return datetime.now(ZoneInfo(settings.SHOP_TIMEZONE))
+
+
+def shop_day_start(day: date) -> datetime:
+    """Midnight of a shop-local day as an aware datetime."""
+    return datetime.combine(day, time(), tzinfo=ZoneInfo(settings.SHOP_TIMEZONE))
+
+
+def compute_dashboard_stats(db: Session) -> DashboardStats:
+    """
+    Compute dashboard numbers from the daily_sales rollup.
+    Reads at most one row per day and delivery type of the current month;
+    active orders come from the (status, created_at) index.
+    """
+    today = shop_now().date()
+    month_start = today.replace(day=1)
+    is_today = DailySales.day == today
+    active_orders = (
+        select(func.count(Order.id))
+        .where(Order.status == OrderStatus.PAID)
+        .scalar_subquery()
+    )
+    
+    row = db.query(
+        func.sum(DailySales.revenue).filter(is_today),
+        func.sum(DailySales.revenue),
+        func.sum(DailySales.order_count).filter(is_today),
+        func.sum(DailySales.order_count),
+        active_orders,
+    ).filter(
+        DailySales.day >= month_start,
+        DailySales.day <= today
+    ).one()
+    
+    today_sales, monthly_sales, total_orders_today, total_orders_month, active_orders = row
+    
+    return DashboardStats(
+        today_sales=float(today_sales or 0),
+        monthly_sales=float(monthly_sales or 0),
+        total_orders_today=total_orders_today or 0,
+        total_orders_month=total_orders_month or 0,
+        active_orders=active_orders or 0
+    )
+
+
+def compute_dashboard_stats_from_orders(db: Session) -> DashboardStats:
+    """
+    Compute all dashboard numbers in one query over the orders table.
+    Every condition compares `created_at` against shop-local day boundaries
+    so Postgres can use the (status, created_at) index instead of
+    evaluating date(created_at) per row.
+    """
+    today = shop_now().date()
+    today_start = shop_day_start(today)
+    tomorrow_start = shop_day_start(today + timedelta(days=1))
+    month_start = shop_day_start(today.replace(day=1))
+    
+    sold = Order.status.in_(SOLD_STATUSES)
+    sold_today = and_(sold, Order.created_at >= today_start, Order.created_at < tomorrow_start)
+    sold_month = and_(sold, Order.created_at >= month_start, Order.created_at < tomorrow_start)
+    
+    row = db.query(
+        func.sum(Order.total_amount).filter(sold_today),
+        func.sum(Order.total_amount).filter(sold_month),
+        func.count(Order.id).filter(sold_today),
+        func.count(Order.id).filter(sold_month),
+        func.count(Order.id).filter(Order.status == OrderStatus.PAID),
+    ).filter(
+        or_(Order.created_at >= month_start, Order.status == OrderStatus.PAID)
+    ).one()
+    
+    today_sales, monthly_sales, total_orders_today, total_orders_month, active_orders = row
+    
+    return DashboardStats(
+        today_sales=float(today_sales or 0),
+        monthly_sales=float(monthly_sales or 0),
+        total_orders_today=total_orders_today or 0,
+        total_orders_month=total_orders_month or 0,
+        active_orders=active_orders or 0
+    )
@@ -0,0 +1,177 @@
+import asyncio
+import logging
+from datetime import date
+from redis.exceptions import WatchError
+from starlette.concurrency import run_in_threadpool
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import SessionLocal
+from app.models.models import Order, OrderStatus
+from app.schemas.schemas import DashboardStats
+from app.services.dashboard import compute_dashboard_stats, shop_now
+from app.services.sales_rollup import order_sales_day
+
+logger = logging.getLogger(__name__)
+
+DAY_KEY_PREFIX = "dashboard:day:"
+MONTH_KEY_PREFIX = "dashboard:month:"
+ACTIVE_ORDERS_KEY = "dashboard:active_orders"
+RECONCILE_LOCK_KEY = "dashboard:reconcile:lock"
+
+DAY_KEY_TTL = 2 * 86400
+MONTH_KEY_TTL = 40 * 86400
+RECONCILE_ATTEMPTS = 3
+
+
+def _day_key(day: date) -> str:
+    return f"{DAY_KEY_PREFIX}{day.isoformat()}"
+
+
+def _month_key(day: date) -> str:
+    return f"{MONTH_KEY_PREFIX}{day:%Y-%m}"
+
+
+class DashboardCounters:
+    """
+    Atomic Redis counters for the admin dashboard.
+    Sales and order counts are kept per shop-local day and month; the order
+    transition path increments them and a periodic job overwrites them with
+    values from Postgres to correct any drift. Keys written by reconciliation
+    carry a `seeded` flag; counters without it are rebuilt before being read.
+    """
+
+    def __init__(self):
+        self._task = None
+
+    async def record_transition(self, order: Order, previous: OrderStatus, target: OrderStatus):
+        """Apply a committed status change to the counters."""
+        sale_sign = 0
+        if target == OrderStatus.PAID:
+            sale_sign = 1
+        elif previous == OrderStatus.PAID and target == OrderStatus.CANCELLED:
+            sale_sign = -1
+
+        active_delta = 0
+        if target == OrderStatus.PAID:
+            active_delta = 1
+        elif previous == OrderStatus.PAID:
+            active_delta = -1
+
+        if not sale_sign and not active_delta:
+            return
+
+        client = await cache.get_client()
+        async with client.pipeline(transaction=True) as pipe:
+            if sale_sign:
+                day = order_sales_day(order)
+                for key, ttl in ((_day_key(day), DAY_KEY_TTL), (_month_key(day), MONTH_KEY_TTL)):
+                    pipe.hincrbyfloat(key, "sales", sale_sign * order.total_amount)
+                    pipe.hincrby(key, "orders", sale_sign)
+                    pipe.expire(key, ttl)
+            if active_delta:
+                pipe.incrby(ACTIVE_ORDERS_KEY, active_delta)
+            await pipe.execute()
+
+    async def read(self) -> DashboardStats:
+        """Read dashboard stats from Redis, rebuilding missing counters first."""
+        today = shop_now().date()
+        client = await cache.get_client()
+
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.hgetall(_day_key(today))
+            pipe.hgetall(_month_key(today))
+            pipe.get(ACTIVE_ORDERS_KEY)
+            day, month, active_orders = await pipe.execute()
+
+        if not day.get("seeded") or not month.get("seeded") or active_orders is None:
+            metrics.increment("dashboard.counters.cold_reads")
+            return await self.reconcile()
+
+        return DashboardStats(
+            today_sales=float(day.get("sales", 0)),
+            monthly_sales=float(month.get("sales", 0)),
+            total_orders_today=int(day.get("orders", 0)),
+            total_orders_month=int(month.get("orders", 0)),
+            active_orders=int(active_orders)
+        )
+
+    async def reconcile(self) -> DashboardStats:
+        """
+        Overwrite today's and this month's counters with values from Postgres.
+        The keys are WATCHed before the query: if record_transition changes
+        them before the overwrite, the transaction aborts and the reconcile
+        starts over, so that increment is not lost. A transition committed
+        before the query whose increment only arrives after the overwrite is
+        counted twice; the counters stay off by that order until the next
+        reconcile.
+        """
+        today = shop_now().date()
+        day_key, month_key = _day_key(today), _month_key(today)
+
+        client = await cache.get_client()
+        async with client.pipeline(transaction=True) as pipe:
+            for _ in range(RECONCILE_ATTEMPTS):
+                try:
+                    await pipe.watch(day_key, month_key, ACTIVE_ORDERS_KEY)
+                    stats = await run_in_threadpool(self._load_from_db)
+                    pipe.multi()
+                    pipe.hset(day_key, mapping={
+                        "sales": stats.today_sales,
+                        "orders": stats.total_orders_today,
+                        "seeded": 1,
+                    })
+                    pipe.expire(day_key, DAY_KEY_TTL)
+                    pipe.hset(month_key, mapping={
+                        "sales": stats.monthly_sales,
+                        "orders": stats.total_orders_month,
+                        "seeded": 1,
+                    })
+                    pipe.expire(month_key, MONTH_KEY_TTL)
+                    pipe.set(ACTIVE_ORDERS_KEY, stats.active_orders)
+                    await pipe.execute()
+                    break
+                except WatchError:
+                    metrics.increment("dashboard.counters.reconcile_conflicts")
+            else:
+                # Busy enough that every attempt raced an order; the counters
+                # keep their increments and the next run tries again
+                logger.info("Dashboard reconciliation skipped after %d conflicts", RECONCILE_ATTEMPTS)
+                return stats
+
+        metrics.increment("dashboard.counters.reconciliations")
+        return stats
+
+    def _load_from_db(self) -> DashboardStats:
+        db = SessionLocal()
+        try:
+            return compute_dashboard_stats(db)
+        finally:
+            db.close()
+
+    async def start(self):
+        """Start periodic reconciliation (called on app startup)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop periodic reconciliation (called on app shutdown)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                # One worker reconciles per interval
+                if await cache.set_if_absent(RECONCILE_LOCK_KEY, "1", settings.DASHBOARD_RECONCILE_INTERVAL):
+                    await self.reconcile()
+            except Exception:
+                logger.exception("Dashboard counter reconciliation failed")
+            await asyncio.sleep(settings.DASHBOARD_RECONCILE_INTERVAL)
+
+dashboard_counters = DashboardCounters()
@@ -1,15 +1,98 @@
-from typing import Optional
+import asyncio
+import logging
+import random
+from typing import Dict, Optional
 import httpx
+from app.core.cache import cache
 from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying for idempotent calls
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+
+# Payment statuses that will not change anymore
+FINAL_PAYMENT_STATUSES = {"paid", "failed", "cancelled"}
+
+STATUS_CACHE_PREFIX = "kaspi:status:"
+STATUS_LOCK_PREFIX = "kaspi:status:lock:"
+
+
+class KaspiError(Exception):
+    """Raised when the Kaspi API call fails."""
+
 
 class KaspiPaymentService:
     """Service for Kaspi QR payment integration."""
-    
+
     def __init__(self):
         self.api_url = settings.KASPI_API_URL
         self.api_key = settings.KASPI_API_KEY
         self.merchant_id = settings.KASPI_MERCHANT_ID
-    
+        self._client: Optional[httpx.AsyncClient] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def start(self):
+        """Open the pooled keep-alive HTTP client (called on app startup)."""
+        if self._client is not None:
+            return
+        self._client = httpx.AsyncClient(
+            base_url=self.api_url,
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            },
+            timeout=httpx.Timeout(
+                settings.KASPI_READ_TIMEOUT,
+                connect=settings.KASPI_CONNECT_TIMEOUT
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.KASPI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.KASPI_MAX_KEEPALIVE_CONNECTIONS
+            )
+        )
+
+    async def close(self):
+        """Close the HTTP client (called on app shutdown)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _request(self, name: str, method: str, path: str, idempotent: bool = False, **kwargs) -> dict:
+        """
+        Send a request through the shared client and return the JSON body.
+        Idempotent calls are retried with jittered exponential backoff.
+        """
+        if self._client is None:
+            await self.start()
+
+        attempts = 1 + (settings.KASPI_MAX_RETRIES if idempotent else 0)
+        for attempt in range(1, attempts + 1):
+            try:
+                with metrics.timer(f"kaspi.{name}"):
+                    response = await self._client.request(method, path, **kwargs)
+                if response.status_code in RETRYABLE_STATUS_CODES and attempt < attempts:
+                    raise httpx.HTTPStatusError(
+                        f"Retryable status {response.status_code}",
+                        request=response.request,
+                        response=response
+                    )
+                response.raise_for_status()
+                return response.json()
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                metrics.increment(f"kaspi.{name}.errors")
+                retryable = isinstance(e, httpx.TransportError) or (
+                    e.response.status_code in RETRYABLE_STATUS_CODES
+                )
+                if not retryable or attempt >= attempts:
+                    logger.warning("Kaspi %s failed after %d attempt(s): %s", name, attempt, e)
+                    raise KaspiError(str(e)) from e
+
+                metrics.increment(f"kaspi.{name}.retries")
+                delay = settings.KASPI_RETRY_BACKOFF * (2 ** (attempt - 1))
+                await asyncio.sleep(random.uniform(0, delay))
+
     async def create_invoice(self, order_id: int, amount: float) -> dict:
         """
         Create a payment invoice with Kaspi.
@@ -18,74 +101,122 @@ class KaspiPaymentService:
             "payment_url": "https://kaspi.kz/pay/..."
         }
         """
-        # Mock implementation - replace with real Kaspi API integration
-        # Real implementation would make HTTP request to Kaspi API
-        
-        async with httpx.AsyncClient() as client:
-            try:
-                # Example API call structure (adjust based on real Kaspi API documentation)
-                payload = {
-                    "merchant_id": self.merchant_id,
-                    "order_id": str(order_id),
-                    "amount": amount,
-                    "currency": "KZT",
-                    "description": f"Order #{order_id} at Social Coffee"
-                }
-                
-                headers = {
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                }
-                
-                # Mock response for development
-                # response = await client.post(
-                #     f"{self.api_url}/invoices",
-                #     json=payload,
-                #     headers=headers
-                # )
-                # data = response.json()
-                
-                # Mock data for development
-                token = f"mock_kaspi_token_{order_id}"
-                payment_url = f"https://kaspi.kz/pay/{token}"
-                
-                return {
-                    "token": token,
-                    "payment_url": payment_url
-                }
-                
-            except Exception as e:
-                # Handle API errors
-                print(f"Kaspi API error: {e}")
-                raise Exception("Failed to create payment invoice")
-    
+        if settings.KASPI_MOCK:
+            # Mock data for development
+            token = f"mock_kaspi_token_{order_id}"
+            payment_url = f"https://kaspi.kz/pay/{token}"
+
+            return {
+                "token": token,
+                "payment_url": payment_url
+            }
+
+        # Example API call structure (adjust based on real Kaspi API documentation).
+        # Invoice creation is not idempotent, so it is never retried.
+        payload = {
+            "merchant_id": self.merchant_id,
+            "order_id": str(order_id),
+            "amount": amount,
+            "currency": "KZT",
+            "description": f"Order #{order_id} at Social Coffee"
+        }
+
+        try:
+            data = await self._request("create_invoice", "POST", "/invoices", json=payload)
+            return {
+                "token": data["token"],
+                "payment_url": data["payment_url"]
+            }
+        except (KaspiError, KeyError, ValueError) as e:
+            logger.error("Failed to create Kaspi invoice for order %s: %s", order_id, e)
+            raise KaspiError("Failed to create payment invoice") from e
+
     async def check_payment_status(self, payment_token: str) -> str:
         """
         Check payment status with Kaspi.
         Returns: "pending" | "paid" | "failed" | "cancelled"
         """
-        # Mock implementation - replace with real Kaspi API integration
-        
-        async with httpx.AsyncClient() as client:
-            try:
-                headers = {
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                }
-                
-                # Mock response for development
-                # response = await client.get(
-                #     f"{self.api_url}/invoices/{payment_token}/status",
-                #     headers=headers
-                # )
-                # data = response.json()
-                # return data.get("status", "pending")
-                
-                # Mock: return "paid" for testing
-                return "pending"  # Change to "paid" to test successful payment
-                
-            except Exception as e:
-                print(f"Kaspi API error: {e}")
-                return "pending"
+        if settings.KASPI_MOCK:
+            # Mock: return "paid" for testing
+            return "pending"  # Change to "paid" to test successful payment
+
+        try:
+            data = await self._request(
+                "check_payment_status",
+                "GET",
+                f"/invoices/{payment_token}/status",
+                idempotent=True
+            )
+            return data.get("status", "pending")
+        except (KaspiError, ValueError) as e:
+            logger.warning("Kaspi status check failed for %s: %s", payment_token, e)
+            return "pending"
+
+    async def cancel_invoice(self, payment_token: str) -> bool:
+        """Void an unpaid invoice. Returns True if Kaspi accepted the cancellation."""
+        if settings.KASPI_MOCK:
+            return True
+
+        try:
+            await self._request(
+                "cancel_invoice",
+                "POST",
+                f"/invoices/{payment_token}/cancel",
+                idempotent=True
+            )
+            return True
+        except (KaspiError, ValueError) as e:
+            logger.warning("Kaspi invoice cancellation failed for %s: %s", payment_token, e)
+            return False
+
+    async def get_payment_status(self, payment_token: str) -> str:
+        """
+        Check payment status, sharing one upstream call between all pollers.
+        Concurrent callers in this worker await the same in-flight lookup, and
+        results are cached in Redis so other workers reuse them.
+        """
+        cached = await cache.get(STATUS_CACHE_PREFIX + payment_token)
+        if cached:
+            metrics.increment("kaspi.status_cache.hits")
+            return cached
+
+        task = self._inflight.get(payment_token)
+        if task is None:
+            task = asyncio.ensure_future(self._refresh_payment_status(payment_token))
+            self._inflight[payment_token] = task
+            task.add_done_callback(lambda _: self._inflight.pop(payment_token, None))
+        else:
+            metrics.increment("kaspi.status_cache.coalesced")
+
+        # Shield so a disconnecting poller does not cancel the lookup for the others
+        return await asyncio.shield(task)
+
+    async def _refresh_payment_status(self, payment_token: str) -> str:
+        """Fetch status from Kaspi unless another worker already is, then cache it."""
+        cache_key = STATUS_CACHE_PREFIX + payment_token
+        lock_key = STATUS_LOCK_PREFIX + payment_token
+
+        if await cache.set_if_absent(lock_key, "1", settings.KASPI_STATUS_CACHE_TTL):
+            metrics.increment("kaspi.status_cache.misses")
+            payment_status = await self.check_payment_status(payment_token)
+            ttl = (
+                settings.KASPI_FINAL_STATUS_CACHE_TTL
+                if payment_status in FINAL_PAYMENT_STATUSES
+                else settings.KASPI_STATUS_CACHE_TTL
+            )
+            await cache.set(cache_key, payment_status, ttl)
+            return payment_status
+
+        # Another worker holds the lock for this interval; wait for its result
+        metrics.increment("kaspi.status_cache.waits")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.KASPI_STATUS_WAIT
+        while loop.time() < deadline:
+            await asyncio.sleep(0.1)
+            cached = await cache.get(cache_key)
+            if cached:
+                return cached
+
+        return "pending"
 
 kaspi_service = KaspiPaymentService()
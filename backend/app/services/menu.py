@@ -0,0 +1,36 @@
+from sqlalchemy.orm import Session
+from app.models.models import Category, Product, ProductStatus
+from app.schemas.schemas import MenuResponse, MenuCategory
+from app.services.serializers import PRODUCT_WITH_OPTIONS, product_to_response
+
+
+def build_menu(db: Session) -> MenuResponse:
+    """Build the customer menu: active categories with their active products."""
+    categories = db.query(Category).filter(Category.is_active == True).order_by(Category.order).all()
+    
+    products_by_category = {category.id: [] for category in categories}
+    products = (
+        db.query(Product)
+        .options(PRODUCT_WITH_OPTIONS)
+        .filter(
+            Product.category_id.in_(list(products_by_category)),
+            Product.status == ProductStatus.ACTIVE
+        )
+        .order_by(Product.id)
+        .all()
+    )
+    for product in products:
+        products_by_category[product.category_id].append(
+            product_to_response(product, available_options_only=True)
+        )
+    
+    return MenuResponse(categories=[
+        MenuCategory(
+            id=category.id,
+            name_rus=category.name_rus,
+            name_kaz=category.name_kaz,
+            order=category.order,
+            products=products_by_category[category.id]
+        )
+        for category in categories
+    ])
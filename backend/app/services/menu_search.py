@@ -0,0 +1,193 @@
+import asyncio
+import re
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Set
+from starlette.concurrency import run_in_threadpool
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import SessionLocal
+from app.schemas.schemas import MenuResponse
+from app.services.menu import build_menu
+
+# Letters folded together so "қ" finds "к", "ё" finds "е" and so on
+LETTER_FOLDS = str.maketrans({
+    "ё": "е", "й": "и", "ә": "а", "ғ": "г", "қ": "к", "ң": "н",
+    "ө": "о", "ұ": "у", "ү": "у", "һ": "х", "і": "и",
+})
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Field weights: names count more than descriptions
+NAME_WEIGHT = 3.0
+DESCRIPTION_WEIGHT = 1.0
+
+# Match quality per query token
+EXACT_MATCH = 1.0
+PREFIX_MATCH = 0.8
+FUZZY_MATCH = 0.6
+
+
+def fold(text: str) -> str:
+    """Lowercase, strip accents and fold Kazakh and Russian letter variants."""
+    text = unicodedata.normalize("NFKD", text.lower().translate(LETTER_FOLDS))
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN_RE.findall(fold(text)) if text else []
+
+
+def trigrams(token: str) -> Set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _IndexState(NamedTuple):
+    postings: Dict[str, Dict[int, float]]  # token -> product ID -> field weight
+    tokens: List[str]  # sorted, for prefix lookups
+    trigrams: Dict[str, Set[str]]  # trigram -> tokens
+    trigram_counts: Dict[str, int]
+    documents: Dict[int, str]  # product ID -> ProductResponse JSON
+    positions: Dict[int, int]  # product ID -> position in the menu
+
+
+EMPTY_STATE = _IndexState({}, [], {}, {}, {}, {})
+
+
+class MenuSearchIndex:
+    """
+    In-memory inverted and trigram index over the customer menu.
+    Each worker keeps its own copy and rebuilds it when the menu version
+    in Redis changes (every menu cache invalidation bumps it) or when it
+    is older than the menu cache TTL.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._version = None
+        self._built_at = 0.0
+        self._state = EMPTY_STATE
+
+    def build(self, menu: MenuResponse):
+        """Replace the index with the products of a menu."""
+        postings = defaultdict(dict)
+        documents = {}
+        positions = {}
+
+        for category in menu.categories:
+            for product in category.products:
+                positions[product.id] = len(positions)
+                documents[product.id] = product.model_dump_json()
+                fields = [
+                    (product.name_rus, NAME_WEIGHT),
+                    (product.name_kaz, NAME_WEIGHT),
+                    (product.description_rus, DESCRIPTION_WEIGHT),
+                    (product.description_kaz, DESCRIPTION_WEIGHT),
+                ]
+                for text, weight in fields:
+                    for token in tokenize(text):
+                        if postings[token].get(product.id, 0) < weight:
+                            postings[token][product.id] = weight
+
+        token_trigrams = defaultdict(set)
+        trigram_counts = {}
+        for token in postings:
+            token_grams = trigrams(token)
+            trigram_counts[token] = len(token_grams)
+            for trigram in token_grams:
+                token_trigrams[trigram].add(token)
+
+        # One assignment, so searches never see a half-built index
+        self._state = _IndexState(
+            dict(postings), sorted(postings), dict(token_trigrams),
+            trigram_counts, documents, positions
+        )
+
+    @staticmethod
+    def _match_tokens(state: _IndexState, query_token: str) -> Dict[str, float]:
+        """Index tokens matching one query token, with match quality."""
+        matches = {}
+        if query_token in state.postings:
+            matches[query_token] = EXACT_MATCH
+
+        # Prefix matches ("кап" -> "капучино")
+        if len(query_token) >= 2:
+            start = bisect_left(state.tokens, query_token)
+            for token in state.tokens[start:]:
+                if not token.startswith(query_token):
+                    break
+                matches.setdefault(token, PREFIX_MATCH)
+
+        # Typos: tokens sharing enough trigrams ("капучина" -> "капучино")
+        if len(query_token) >= 4:
+            query_trigrams = trigrams(query_token)
+            shared = defaultdict(int)
+            for trigram in query_trigrams:
+                for token in state.trigrams.get(trigram, ()):
+                    shared[token] += 1
+            for token, count in shared.items():
+                similarity = count / (len(query_trigrams) + state.trigram_counts[token] - count)
+                if similarity >= settings.MENU_SEARCH_MIN_SIMILARITY:
+                    matches.setdefault(token, FUZZY_MATCH * similarity)
+
+        return matches
+
+    def search(self, query: str, limit: int) -> List[str]:
+        """Serialized products matching every query word, best first."""
+        state = self._state
+        scores = None
+        for query_token in dict.fromkeys(tokenize(query)):
+            token_scores = {}
+            for token, quality in self._match_tokens(state, query_token).items():
+                for product_id, weight in state.postings[token].items():
+                    score = quality * weight
+                    if score > token_scores.get(product_id, 0):
+                        token_scores[product_id] = score
+
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    product_id: score + token_scores[product_id]
+                    for product_id, score in scores.items()
+                    if product_id in token_scores
+                }
+            if not scores:
+                return []
+
+        if not scores:
+            return []
+
+        ranked = sorted(scores, key=lambda product_id: (-scores[product_id], state.positions[product_id]))
+        return [state.documents[product_id] for product_id in ranked[:limit]]
+
+    async def ensure_fresh(self):
+        """Rebuild the index if the menu changed since it was built."""
+        version = await cache.get(settings.REDIS_MENU_VERSION_KEY)
+        if self._is_fresh(version):
+            return
+
+        async with self._lock:
+            if self._is_fresh(version):
+                return
+            with metrics.timer("menu_search.rebuild"):
+                await run_in_threadpool(self._rebuild)
+            self._version = version
+
+    def _is_fresh(self, version) -> bool:
+        return (
+            self._built_at
+            and self._version == version
+            and time.monotonic() - self._built_at < settings.REDIS_CACHE_TTL
+        )
+
+    def _rebuild(self):
+        with SessionLocal() as db:
+            self.build(build_menu(db))
+        self._built_at = time.monotonic()
+
+menu_search_index = MenuSearchIndex()
@@ -0,0 +1,99 @@
+import csv
+import io
+from datetime import datetime
+from typing import Iterator, List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.models import Order, OrderStatus
+from app.services.serializers import ORDER_WITH_ITEMS, order_to_response
+
+# One CSV row per order item; order columns repeat on every item row
+CSV_COLUMNS = [
+    "order_id", "created_at", "completed_at", "status", "user_id",
+    "delivery_type", "total_amount", "bonus_earned",
+    "item_id", "product_id", "product_name", "base_price", "quantity",
+    "item_total", "options", "options_total",
+]
+
+
+def export_orders_query(
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    order_status: Optional[OrderStatus] = None,
+    delivery_type: Optional[str] = None
+):
+    """Orders with items and options in (created_at, id) order."""
+    query = select(Order).options(ORDER_WITH_ITEMS)
+    if date_from:
+        query = query.where(Order.created_at >= date_from)
+    if date_to:
+        query = query.where(Order.created_at < date_to)
+    if order_status is not None:
+        query = query.where(Order.status == order_status)
+    if delivery_type:
+        query = query.where(Order.delivery_type == delivery_type)
+    return query.order_by(Order.created_at, Order.id)
+
+
+def iter_order_batches(db: Session, query) -> Iterator[List[Order]]:
+    """
+    Yield orders in batches of ORDER_EXPORT_BATCH_SIZE from a server-side
+    cursor. Items of each batch are loaded with one selectin query, and
+    each batch is expunged once consumed so memory stays flat.
+    """
+    result = db.execute(query.execution_options(yield_per=settings.ORDER_EXPORT_BATCH_SIZE))
+    try:
+        for partition in result.partitions():
+            orders = [row[0] for row in partition]
+            yield orders
+            # Cascades to items and their options
+            for order in orders:
+                db.expunge(order)
+    finally:
+        result.close()
+
+
+def _format_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, OrderStatus):
+        return value.value
+    return str(value)
+
+
+def orders_to_csv(orders: List[Order], header: bool = False) -> str:
+    """Render a batch of orders as CSV text."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(CSV_COLUMNS)
+
+    for order in orders:
+        order_columns = [
+            order.id, order.created_at, order.completed_at, order.status, order.user_id,
+            order.delivery_type, order.total_amount, order.bonus_earned,
+        ]
+        if not order.items:
+            writer.writerow([_format_value(v) for v in order_columns] + [""] * 8)
+            continue
+
+        for item in order.items:
+            options = "; ".join(
+                f"{opt.option_group_name}: {opt.option_name} (+{opt.option_price or 0:g})"
+                for opt in item.selected_options
+            )
+            options_total = sum(opt.option_price or 0 for opt in item.selected_options)
+            writer.writerow([_format_value(v) for v in order_columns + [
+                item.id, item.product_id, item.product_name, item.base_price, item.quantity,
+                item.total_price, options, options_total,
+            ]])
+
+    return buffer.getvalue()
+
+
+def orders_to_jsonl(orders: List[Order]) -> str:
+    """Render a batch of orders as JSON lines in the OrderResponse shape."""
+    return "".join(order_to_response(order).model_dump_json() + "\n" for order in orders)
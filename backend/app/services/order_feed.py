@@ -0,0 +1,84 @@
+import json
+from typing import AsyncIterator, Optional, Tuple
+from app.core.cache import cache
+from app.core.config import settings
+
+# Event names sent to the kitchen feed
+ORDER_PAID = "order_paid"
+ORDER_COMPLETED = "order_completed"
+ORDER_CANCELLED = "order_cancelled"
+
+
+def _stream_id(entry_id: str) -> Tuple[int, int]:
+    milliseconds, _, sequence = entry_id.partition("-")
+    return int(milliseconds), int(sequence or 0)
+
+
+class OrderFeed:
+    """
+    Order events for the kitchen, kept in a capped Redis stream.
+    Stream entry IDs double as SSE event IDs, so a reconnecting client
+    resumes right after the last event it received, on any worker.
+    """
+
+    async def publish(self, event: str, data: str):
+        """Append an event; `data` is a JSON string."""
+        client = await cache.get_client()
+        await client.xadd(
+            settings.ORDER_FEED_STREAM,
+            {"event": event, "data": data},
+            maxlen=settings.ORDER_FEED_MAXLEN,
+            approximate=True
+        )
+
+    async def last_id(self) -> str:
+        """ID of the newest event, or "0-0" if the stream is empty."""
+        client = await cache.get_client()
+        entries = await client.xrevrange(settings.ORDER_FEED_STREAM, count=1)
+        return entries[0][0] if entries else "0-0"
+
+    async def can_resume(self, last_event_id: str) -> bool:
+        """Check that no events after `last_event_id` were trimmed away."""
+        try:
+            resume_from = _stream_id(last_event_id)
+        except ValueError:
+            return False
+        client = await cache.get_client()
+        entries = await client.xrange(settings.ORDER_FEED_STREAM, count=1)
+        return not entries or _stream_id(entries[0][0]) <= resume_from
+
+    async def listen(self, after_id: str) -> AsyncIterator[Optional[Tuple[str, str, str]]]:
+        """
+        Yield (event_id, event, data) for events after `after_id`.
+        Yields None when nothing arrived within ORDER_FEED_KEEPALIVE seconds.
+        """
+        client = await cache.get_client()
+        while True:
+            response = await client.xread(
+                {settings.ORDER_FEED_STREAM: after_id},
+                block=settings.ORDER_FEED_KEEPALIVE * 1000,
+                count=100
+            )
+            if not response:
+                yield None
+                continue
+            for _, entries in response:
+                for entry_id, fields in entries:
+                    after_id = entry_id
+                    yield entry_id, fields["event"], fields["data"]
+
+
+def format_sse(event: str, data: str, event_id: Optional[str] = None) -> str:
+    """Format one server-sent event."""
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.extend(f"data: {line}" for line in data.splitlines() or [""])
+    return "\n".join(lines) + "\n\n"
+
+
+def order_event_data(order_id: int) -> str:
+    return json.dumps({"id": order_id})
+
+order_feed = OrderFeed()
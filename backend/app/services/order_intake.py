@@ -0,0 +1,281 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+from typing import List, Optional
+from redis.exceptions import ResponseError
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import SessionLocal
+from app.models.models import Order, OrderItem, OrderItemOption, OrderStatus
+from app.services.kaspi import kaspi_service, KaspiError
+from app.services.order_state import transition_order
+from app.services.order_status import order_status_store
+
+logger = logging.getLogger(__name__)
+
+
+def add_order_rows(
+    db: Session,
+    user_id: Optional[int],
+    total_amount: float,
+    bonus_earned: int,
+    items: List[dict],
+    delivery: Optional[dict] = None,
+    order_id: Optional[int] = None
+) -> Order:
+    """
+    Add a pending order with its items and selected options to the session.
+    `items` are priced item dicts: product_id, product_name, base_price,
+    quantity, total_price and selected_options (group/name/price dicts);
+    `delivery` holds the delivery_* columns from OrderCreate.
+    """
+    new_order = Order(
+        id=order_id,
+        user_id=user_id,
+        total_amount=total_amount,
+        bonus_earned=bonus_earned,
+        status=OrderStatus.PENDING,
+        **(delivery or {})
+    )
+    
+    for item in items:
+        order_item = OrderItem(
+            product_id=item["product_id"],
+            product_name=item["product_name"],
+            base_price=item["base_price"],
+            quantity=item["quantity"],
+            total_price=item["total_price"]
+        )
+        order_item.selected_options = [
+            OrderItemOption(
+                option_group_name=option["option_group_name"],
+                option_name=option["option_name"],
+                option_price=option["option_price"]
+            )
+            for option in item["selected_options"]
+        ]
+        new_order.items.append(order_item)
+    
+    db.add(new_order)
+    db.flush()  # Get order ID
+    return new_order
+
+
+def reserve_order_id(db: Session) -> int:
+    """Take the next order ID from the Postgres sequence without inserting a row."""
+    return db.execute(text("SELECT nextval(pg_get_serial_sequence('orders', 'id'))")).scalar()
+
+
+class OrderIntakeQueue:
+    """
+    Buffers validated orders in a Redis stream and persists them in the
+    background at a bounded rate, so checkout bursts do not hold a DB
+    transaction and a Kaspi call per request.
+    """
+
+    def __init__(self):
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def enabled(self) -> bool:
+        return settings.ORDER_INTAKE_MODE == "queue"
+
+    async def enqueue(
+        self,
+        order_id: int,
+        user_id: Optional[int],
+        total_amount: float,
+        bonus_earned: int,
+        items: List[dict],
+        delivery: dict
+    ):
+        """Append an order to the intake stream and mark it as queued."""
+        payload = {
+            "order_id": order_id,
+            "user_id": user_id,
+            "total_amount": total_amount,
+            "bonus_earned": bonus_earned,
+            "items": items,
+            "delivery": delivery,
+        }
+        await order_status_store.save_fields(order_id, OrderStatus.PENDING, None, None, queued=True)
+        client = await cache.get_client()
+        await client.xadd(settings.ORDER_INTAKE_STREAM, {"order": json.dumps(payload)})
+        metrics.increment("orders.intake.enqueued")
+
+    async def start(self):
+        """Start consumer tasks (called on app startup)."""
+        if not self.enabled or self._tasks:
+            return
+        
+        client = await cache.get_client()
+        try:
+            await client.xgroup_create(
+                settings.ORDER_INTAKE_STREAM, settings.ORDER_INTAKE_GROUP, id="0", mkstream=True
+            )
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        
+        worker_name = f"{socket.gethostname()}-{os.getpid()}"
+        self._tasks = [
+            asyncio.create_task(self._consume(f"{worker_name}-{i}"))
+            for i in range(settings.ORDER_INTAKE_CONSUMERS)
+        ]
+
+    async def stop(self):
+        """Stop consumer tasks (called on app shutdown)."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _consume(self, consumer: str):
+        # Each consumer gets an equal share of the per-worker rate
+        interval = settings.ORDER_INTAKE_CONSUMERS / settings.ORDER_INTAKE_MAX_RATE
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            try:
+                client = await cache.get_client()
+                
+                # Take over entries left unacknowledged by a crashed consumer
+                _, messages, *_ = await client.xautoclaim(
+                    settings.ORDER_INTAKE_STREAM,
+                    settings.ORDER_INTAKE_GROUP,
+                    consumer,
+                    min_idle_time=settings.ORDER_INTAKE_CLAIM_IDLE_MS,
+                    count=10
+                )
+                if not messages:
+                    entries = await client.xreadgroup(
+                        settings.ORDER_INTAKE_GROUP,
+                        consumer,
+                        {settings.ORDER_INTAKE_STREAM: ">"},
+                        count=10,
+                        block=5000
+                    )
+                    messages = [message for _, stream_messages in entries for message in stream_messages]
+                
+                for message_id, fields in messages:
+                    started = loop.time()
+                    try:
+                        await self._process(fields)
+                    except Exception:
+                        logger.exception("Failed to process queued order entry %s", message_id)
+                        metrics.increment("orders.intake.errors")
+                        if await self._delivery_count(client, message_id) >= settings.ORDER_INTAKE_MAX_DELIVERIES:
+                            await self._dead_letter(client, message_id, fields)
+                        # Below the limit it stays pending for XAUTOCLAIM to redeliver
+                        continue
+                    await client.xack(settings.ORDER_INTAKE_STREAM, settings.ORDER_INTAKE_GROUP, message_id)
+                    await client.xdel(settings.ORDER_INTAKE_STREAM, message_id)
+                    await asyncio.sleep(max(0.0, interval - (loop.time() - started)))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Order intake consumer %s failed", consumer)
+                await asyncio.sleep(1)
+
+    async def _delivery_count(self, client, message_id: str) -> int:
+        """How many times the group has handed out this entry."""
+        pending = await client.xpending_range(
+            settings.ORDER_INTAKE_STREAM,
+            settings.ORDER_INTAKE_GROUP,
+            min=message_id,
+            max=message_id,
+            count=1
+        )
+        return pending[0]["times_delivered"] if pending else 0
+
+    async def _dead_letter(self, client, message_id: str, fields: dict):
+        """
+        Park an entry that keeps failing so it stops being redelivered.
+        Only the consumer whose XACK removes it from the pending list copies
+        it, so an entry claimed twice is parked once.
+        """
+        if not await client.xack(settings.ORDER_INTAKE_STREAM, settings.ORDER_INTAKE_GROUP, message_id):
+            return
+        await client.xadd(settings.ORDER_INTAKE_DEAD_LETTER_STREAM, {**fields, "source_id": message_id})
+        await client.xdel(settings.ORDER_INTAKE_STREAM, message_id)
+        metrics.increment("orders.intake.dead_lettered")
+        logger.error(
+            "Queued order entry %s failed %d times; moved to %s",
+            message_id, settings.ORDER_INTAKE_MAX_DELIVERIES, settings.ORDER_INTAKE_DEAD_LETTER_STREAM
+        )
+
+    async def _process(self, fields: dict):
+        """Persist one queued order and create its Kaspi invoice."""
+        payload = json.loads(fields["order"])
+        order_id = payload["order_id"]
+        
+        with metrics.timer("orders.intake.process"):
+            # Redelivered entries find the row already there and only finish the invoice step
+            order_status, payment_url, payment_token = await run_in_threadpool(self._persist, payload)
+            
+            if order_status == OrderStatus.PENDING and not payment_token:
+                try:
+                    payment_data = await kaspi_service.create_invoice(order_id, payload["total_amount"])
+                except KaspiError:
+                    payment_data = None
+                if payment_data:
+                    order_status, payment_url, payment_token = await run_in_threadpool(
+                        self._attach_invoice, order_id, payment_data
+                    )
+                else:
+                    order_status, payment_url, payment_token = await self._cancel_uninvoiced(order_id)
+            
+            await order_status_store.save_fields(order_id, order_status, payment_url, payment_token)
+        metrics.increment("orders.intake.processed")
+
+    def _persist(self, payload: dict) -> tuple:
+        db = SessionLocal()
+        try:
+            order = db.get(Order, payload["order_id"])
+            if order is None:
+                order = add_order_rows(
+                    db,
+                    payload["user_id"],
+                    payload["total_amount"],
+                    payload["bonus_earned"],
+                    payload["items"],
+                    delivery=payload.get("delivery"),
+                    order_id=payload["order_id"]
+                )
+                db.commit()
+            return order.status, order.payment_url, order.payment_token
+        finally:
+            db.close()
+
+    def _attach_invoice(self, order_id: int, payment_data: dict) -> tuple:
+        """Store invoice data on a still pending order."""
+        db = SessionLocal()
+        try:
+            order = db.get(Order, order_id)
+            if order.status == OrderStatus.PENDING:
+                order.payment_token = payment_data["token"]
+                order.payment_url = payment_data["payment_url"]
+                db.commit()
+            return order.status, order.payment_url, order.payment_token
+        finally:
+            db.close()
+
+    async def _cancel_uninvoiced(self, order_id: int) -> tuple:
+        """Cancel an order whose invoice could not be created."""
+        metrics.increment("orders.intake.invoice_failures")
+        db = SessionLocal()
+        try:
+            order = db.get(Order, order_id)
+            if order.status == OrderStatus.PENDING:
+                await transition_order(db, order, OrderStatus.CANCELLED)
+            return order.status, order.payment_url, order.payment_token
+        finally:
+            db.close()
+
+order_intake = OrderIntakeQueue()
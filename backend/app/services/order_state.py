@@ -0,0 +1,112 @@
+import logging
+from sqlalchemy import update, func
+from sqlalchemy.orm import Session
+from app.models.models import Order, OrderStatus, User
+from app.services.order_status import order_status_store
+from app.services.sales_rollup import record_sale
+from app.services.dashboard_counters import dashboard_counters
+from app.services.order_feed import (
+    order_feed, order_event_data, ORDER_PAID, ORDER_COMPLETED, ORDER_CANCELLED
+)
+from app.services.serializers import order_to_response
+
+logger = logging.getLogger(__name__)
+
+# Allowed order status transitions
+ORDER_TRANSITIONS = {
+    OrderStatus.PENDING: {OrderStatus.PAID, OrderStatus.CANCELLED},
+    OrderStatus.PAID: {OrderStatus.COMPLETED, OrderStatus.CANCELLED},
+    OrderStatus.COMPLETED: set(),
+    OrderStatus.CANCELLED: set(),
+}
+
+
+class InvalidOrderTransition(Exception):
+    """Raised when an order cannot move from its current status to the target one."""
+
+    def __init__(self, current: OrderStatus, target: OrderStatus):
+        self.current = current
+        self.target = target
+        super().__init__(f"Cannot change order status from {current.value} to {target.value}")
+
+
+def can_transition(current: OrderStatus, target: OrderStatus) -> bool:
+    """Check whether the state machine allows the transition."""
+    return target in ORDER_TRANSITIONS.get(current, set())
+
+
+async def transition_order(db: Session, order: Order, target: OrderStatus) -> bool:
+    """
+    Move an order from its loaded status to the target status.
+    The row is updated with `WHERE status = <loaded status>`, so when several
+    workers race only one of them wins; the others get False back and the
+    order refreshed to its new status. Bonus points are credited (or taken
+    back on cancellation of a paid order) with an atomic SQL increment in the
+    same transaction, together with the daily_sales rollup.
+    """
+    expected = order.status
+    if not can_transition(expected, target):
+        raise InvalidOrderTransition(expected, target)
+
+    values = {"status": target}
+    if target == OrderStatus.COMPLETED:
+        values["completed_at"] = func.now()
+
+    result = db.execute(
+        update(Order)
+        .where(Order.id == order.id, Order.status == expected)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        # Another request changed the status first
+        db.rollback()
+        db.refresh(order)
+        return False
+
+    # +1 when the order becomes a sale, -1 when a sale is cancelled
+    sale_sign = 0
+    if target == OrderStatus.PAID:
+        sale_sign = 1
+    elif expected == OrderStatus.PAID and target == OrderStatus.CANCELLED:
+        sale_sign = -1
+
+    if sale_sign:
+        record_sale(db, order, sale_sign)
+
+    if sale_sign and order.user_id and order.bonus_earned:
+        db.execute(
+            update(User)
+            .where(User.id == order.user_id)
+            .values(bonus_points=func.coalesce(User.bonus_points, 0) + sale_sign * order.bonus_earned)
+            .execution_options(synchronize_session=False)
+        )
+
+    db.commit()
+    db.refresh(order)
+
+    # The transition is committed, so a Redis failure below must not turn
+    # it into an error response; each side effect is attempted on its own.
+    # Drifted counters are corrected by the periodic reconcile.
+    try:
+        await order_status_store.save(order)
+    except Exception:
+        logger.exception("Failed to store status of order %s", order.id)
+    try:
+        await dashboard_counters.record_transition(order, expected, target)
+    except Exception:
+        logger.exception("Failed to update dashboard counters for order %s", order.id)
+    try:
+        await _publish_transition(order, expected, target)
+    except Exception:
+        logger.exception("Failed to publish feed event for order %s", order.id)
+    return True
+
+
+async def _publish_transition(order: Order, previous: OrderStatus, target: OrderStatus):
+    """Kitchen feed: paid orders appear with their items, then disappear."""
+    if target == OrderStatus.PAID:
+        await order_feed.publish(ORDER_PAID, order_to_response(order).model_dump_json())
+    elif previous == OrderStatus.PAID:
+        event = ORDER_COMPLETED if target == OrderStatus.COMPLETED else ORDER_CANCELLED
+        await order_feed.publish(event, order_event_data(order.id))
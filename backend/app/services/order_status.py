@@ -0,0 +1,58 @@
+from typing import Optional
+from app.core.cache import cache
+from app.core.config import settings
+from app.models.models import Order, OrderStatus
+
+ORDER_STATUS_KEY_PREFIX = "order:status:"
+
+
+class OrderStatusStore:
+    """
+    Redis hash per order holding what the status endpoint needs.
+    Postgres stays the source of truth; entries are rewritten on every
+    status change and expire after ORDER_STATUS_CACHE_TTL.
+    """
+
+    def _key(self, order_id: int) -> str:
+        return f"{ORDER_STATUS_KEY_PREFIX}{order_id}"
+
+    async def save(self, order: Order):
+        """Store the current status of an order."""
+        await self.save_fields(order.id, order.status, order.payment_url, order.payment_token)
+
+    async def save_fields(
+        self,
+        order_id: int,
+        status: OrderStatus,
+        payment_url: Optional[str],
+        payment_token: Optional[str],
+        queued: bool = False
+    ):
+        """
+        Store status fields without a loaded Order (e.g. after bulk updates).
+        `queued` marks orders accepted by the intake queue but not yet persisted.
+        """
+        await cache.hset(
+            self._key(order_id),
+            {
+                "status": status.value,
+                "payment_url": payment_url or "",
+                "payment_token": payment_token or "",
+                "queued": "1" if queued else "",
+            },
+            settings.ORDER_STATUS_CACHE_TTL
+        )
+
+    async def load(self, order_id: int) -> Optional[dict]:
+        """Return stored status fields, or None if the order is not cached."""
+        data = await cache.hgetall(self._key(order_id))
+        if not data:
+            return None
+        return {
+            "status": OrderStatus(data["status"]),
+            "payment_url": data.get("payment_url") or None,
+            "payment_token": data.get("payment_token") or None,
+            "queued": bool(data.get("queued")),
+        }
+
+order_status_store = OrderStatusStore()
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from sqlalchemy import select, update
+from starlette.concurrency import run_in_threadpool
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import SessionLocal
+from app.models.models import Order, OrderStatus
+from app.services.kaspi import kaspi_service, FINAL_PAYMENT_STATUSES
+from app.services.order_state import transition_order
+from app.services.order_status import order_status_store
+
+logger = logging.getLogger(__name__)
+
+SWEEP_LOCK_KEY = "orders:sweep:lock"
+
+
+class PendingOrderSweeper:
+    """Periodically cancels pending orders whose checkout was abandoned."""
+
+    def __init__(self):
+        self._task = None
+
+    async def start(self):
+        """Start the background sweep loop (called on app startup)."""
+        if settings.ORDER_SWEEP_ENABLED and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the sweep loop (called on app shutdown)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                # One worker sweeps per interval, so each invoice is voided
+                # or checked against Kaspi once rather than once per worker
+                if await cache.set_if_absent(SWEEP_LOCK_KEY, "1", settings.ORDER_SWEEP_INTERVAL):
+                    await self.sweep()
+            except Exception:
+                logger.exception("Pending order sweep failed")
+            await asyncio.sleep(settings.ORDER_SWEEP_INTERVAL)
+
+    async def sweep(self) -> dict:
+        """
+        Cancel all pending orders older than ORDER_PENDING_EXPIRY_MINUTES.
+        Orders without an invoice are cancelled in bulk. An order with a
+        Kaspi invoice is only cancelled once the invoice can no longer be
+        paid; if Kaspi reports it paid, the order is moved to paid instead.
+        Returns counts of cancelled orders, voided invoices and recovered
+        (paid) orders.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(minutes=settings.ORDER_PENDING_EXPIRY_MINUTES)
+        counts = {"cancelled": 0, "invoices_voided": 0, "recovered": 0}
+
+        while True:
+            order_ids = await run_in_threadpool(self._cancel_batch, cutoff)
+            counts["cancelled"] += len(order_ids)
+            for order_id in order_ids:
+                await order_status_store.save_fields(order_id, OrderStatus.CANCELLED, None, None)
+            if len(order_ids) < settings.ORDER_SWEEP_BATCH_SIZE:
+                break
+
+        after_id = 0
+        while True:
+            rows = await run_in_threadpool(self._invoiced_batch, cutoff, after_id)
+            for order_id, payment_token in rows:
+                outcome = await self._settle_invoiced(order_id, payment_token)
+                if outcome == "voided":
+                    counts["invoices_voided"] += 1
+                if outcome in ("voided", "cancelled"):
+                    counts["cancelled"] += 1
+                elif outcome == "recovered":
+                    counts["recovered"] += 1
+            if len(rows) < settings.ORDER_SWEEP_BATCH_SIZE:
+                break
+            after_id = rows[-1][0]
+
+        metrics.increment("orders.sweeper.runs")
+        metrics.increment("orders.sweeper.cancelled", counts["cancelled"])
+        metrics.increment("orders.sweeper.invoices_voided", counts["invoices_voided"])
+        metrics.increment("orders.sweeper.recovered", counts["recovered"])
+        if counts["cancelled"] or counts["recovered"]:
+            logger.info(
+                "Cancelled %d expired pending orders (%d invoices voided), %d found paid",
+                counts["cancelled"], counts["invoices_voided"], counts["recovered"]
+            )
+
+        return counts
+
+    async def _settle_invoiced(self, order_id: int, payment_token: str) -> Optional[str]:
+        """
+        Close one expired order that has a Kaspi invoice. Returns "voided" or
+        "cancelled" when the order was cancelled, "recovered" when it turned
+        out to be paid, or None when it stays pending until the next sweep
+        (the invoice could not be voided and is not final yet).
+        """
+        voided = settings.KASPI_VOID_EXPIRED_INVOICES and await kaspi_service.cancel_invoice(payment_token)
+        if voided:
+            target, outcome = OrderStatus.CANCELLED, "voided"
+        else:
+            payment_status = await kaspi_service.check_payment_status(payment_token)
+            if payment_status == "paid":
+                target, outcome = OrderStatus.PAID, "recovered"
+            elif payment_status in FINAL_PAYMENT_STATUSES or not settings.KASPI_VOID_EXPIRED_INVOICES:
+                target, outcome = OrderStatus.CANCELLED, "cancelled"
+            else:
+                metrics.increment("orders.sweeper.void_failures")
+                return None
+
+        db = SessionLocal()
+        try:
+            order = db.get(Order, order_id)
+            if order is None or order.status != OrderStatus.PENDING:
+                return None
+            if not await transition_order(db, order, target):
+                return None
+        finally:
+            db.close()
+
+        if outcome == "recovered":
+            logger.warning("Expired order %s was paid after its pending window; marked paid", order_id)
+        return outcome
+
+    def _cancel_batch(self, cutoff: datetime) -> List[int]:
+        """
+        Cancel one batch of expired orders without an invoice in a single
+        UPDATE. Rows locked by another worker's sweep are skipped.
+        """
+        db = SessionLocal()
+        try:
+            expired_ids = (
+                select(Order.id)
+                .where(
+                    Order.status == OrderStatus.PENDING,
+                    Order.created_at < cutoff,
+                    Order.payment_token.is_(None)
+                )
+                .order_by(Order.id)
+                .limit(settings.ORDER_SWEEP_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            )
+            order_ids = db.scalars(
+                update(Order)
+                .where(Order.id.in_(expired_ids), Order.status == OrderStatus.PENDING)
+                .values(status=OrderStatus.CANCELLED)
+                .returning(Order.id)
+                .execution_options(synchronize_session=False)
+            ).all()
+            db.commit()
+            return list(order_ids)
+        finally:
+            db.close()
+
+    def _invoiced_batch(self, cutoff: datetime, after_id: int) -> List[tuple]:
+        """Next batch of (id, payment_token) of expired orders that have an invoice."""
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                select(Order.id, Order.payment_token)
+                .where(
+                    Order.status == OrderStatus.PENDING,
+                    Order.created_at < cutoff,
+                    Order.payment_token.isnot(None),
+                    Order.id > after_id
+                )
+                .order_by(Order.id)
+                .limit(settings.ORDER_SWEEP_BATCH_SIZE)
+            ).all()
+            return [tuple(row) for row in rows]
+        finally:
+            db.close()
+
+pending_order_sweeper = PendingOrderSweeper()
@@ -0,0 +1,118 @@
+import logging
+from datetime import date
+from typing import Optional
+from zoneinfo import ZoneInfo
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.models import DailySales, Order, OrderItem, OrderStatus
+
+logger = logging.getLogger(__name__)
+
+# Statuses counted as sales
+SOLD_STATUSES = [OrderStatus.PAID, OrderStatus.COMPLETED]
+
+# pg_advisory_xact_lock key serialising the startup backfill across workers
+BACKFILL_LOCK_ID = 7310001
+
+
+def order_sales_day(order: Order) -> date:
+    """Shop-local day an order's sales are attributed to."""
+    return order.created_at.astimezone(ZoneInfo(settings.SHOP_TIMEZONE)).date()
+
+
+def record_sale(db: Session, order: Order, sign: int):
+    """
+    Add (sign=1) or remove (sign=-1) an order from its daily_sales row.
+    Runs inside the caller's transaction so the rollup changes atomically
+    with the order status.
+    """
+    items_count = db.query(func.coalesce(func.sum(OrderItem.quantity), 0)).filter(
+        OrderItem.order_id == order.id
+    ).scalar()
+
+    stmt = insert(DailySales).values(
+        day=order_sales_day(order),
+        delivery_type=order.delivery_type or "pickup",
+        revenue=sign * order.total_amount,
+        order_count=sign,
+        items_count=sign * items_count,
+        bonus_points=sign * (order.bonus_earned or 0)
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[DailySales.day, DailySales.delivery_type],
+        set_={
+            "revenue": DailySales.revenue + stmt.excluded.revenue,
+            "order_count": DailySales.order_count + stmt.excluded.order_count,
+            "items_count": DailySales.items_count + stmt.excluded.items_count,
+            "bonus_points": DailySales.bonus_points + stmt.excluded.bonus_points,
+            "updated_at": func.now(),
+        }
+    ))
+
+
+def backfill_daily_sales(db: Session, date_from: Optional[date] = None, date_to: Optional[date] = None) -> int:
+    """
+    Rebuild daily_sales rows for a day range (inclusive) from the orders table.
+    Returns the number of rows written.
+    """
+    local_day = func.date(func.timezone(settings.SHOP_TIMEZONE, Order.created_at))
+
+    items = (
+        select(OrderItem.order_id, func.sum(OrderItem.quantity).label("items_count"))
+        .group_by(OrderItem.order_id)
+        .subquery()
+    )
+
+    query = (
+        select(
+            local_day.label("day"),
+            func.coalesce(Order.delivery_type, "pickup").label("delivery_type"),
+            func.sum(Order.total_amount),
+            func.count(Order.id),
+            func.coalesce(func.sum(items.c.items_count), 0),
+            func.coalesce(func.sum(Order.bonus_earned), 0),
+        )
+        .outerjoin(items, items.c.order_id == Order.id)
+        .where(Order.status.in_(SOLD_STATUSES))
+        .group_by("day", "delivery_type")
+    )
+    cleanup = delete(DailySales)
+
+    if date_from:
+        query = query.where(local_day >= date_from)
+        cleanup = cleanup.where(DailySales.day >= date_from)
+    if date_to:
+        query = query.where(local_day <= date_to)
+        cleanup = cleanup.where(DailySales.day <= date_to)
+
+    db.execute(cleanup)
+    result = db.execute(
+        insert(DailySales).from_select(
+            ["day", "delivery_type", "revenue", "order_count", "items_count", "bonus_points"],
+            query
+        )
+    )
+    db.commit()
+    return result.rowcount
+
+
+def ensure_daily_sales(db: Session) -> Optional[int]:
+    """
+    Fill daily_sales from the orders table if it has no rows yet, e.g. on the
+    first start after the table was created. record_sale only adjusts
+    existing totals, so without this the dashboard would count from zero and
+    cancellations of earlier orders would push days negative. Workers wait on
+    an advisory lock, so one of them backfills and the others find the rows;
+    none serves requests before that. Returns rows written, or None if the
+    rollup was already filled.
+    """
+    db.execute(select(func.pg_advisory_xact_lock(BACKFILL_LOCK_ID)))
+    if db.scalar(select(DailySales.id).limit(1)) is not None:
+        db.rollback()
+        return None
+
+    rows = backfill_daily_sales(db)  # Commits, releasing the lock
+    logger.info("daily_sales was empty; backfilled %d rows from orders", rows)
+    return rows
@@ -0,0 +1,97 @@
+from sqlalchemy.orm import selectinload
+from app.models.models import Order, OrderItem, Product, OptionGroup
+from app.schemas.schemas import (
+    OrderResponse, OrderItemResponse, OrderItemOptionCreate,
+    ProductResponse, OptionGroupWithOptions
+)
+
+# Loader options that fetch items and their options in two bulk queries
+ORDER_WITH_ITEMS = selectinload(Order.items).selectinload(OrderItem.selected_options)
+
+# Same for product option groups and their options
+PRODUCT_WITH_OPTIONS = selectinload(Product.option_groups).selectinload(OptionGroup.options)
+
+
+def order_to_response(order: Order) -> OrderResponse:
+    """
+    Build an OrderResponse from an Order loaded with ORDER_WITH_ITEMS.
+    ORM values are already typed, so models are constructed without
+    re-running field validation.
+    """
+    items = [
+        OrderItemResponse.model_construct(
+            id=item.id,
+            product_name=item.product_name,
+            base_price=item.base_price,
+            quantity=item.quantity,
+            total_price=item.total_price,
+            selected_options=[
+                OrderItemOptionCreate.model_construct(
+                    option_group_name=opt.option_group_name,
+                    option_name=opt.option_name,
+                    option_price=opt.option_price
+                )
+                for opt in item.selected_options
+            ]
+        )
+        for item in order.items
+    ]
+    
+    return OrderResponse.model_construct(
+        id=order.id,
+        user_id=order.user_id,
+        total_amount=order.total_amount,
+        bonus_earned=order.bonus_earned,
+        status=order.status,
+        payment_token=order.payment_token,
+        payment_url=order.payment_url,
+        delivery_type=order.delivery_type,
+        delivery_address=order.delivery_address,
+        delivery_apartment=order.delivery_apartment,
+        delivery_entrance=order.delivery_entrance,
+        delivery_floor=order.delivery_floor,
+        delivery_latitude=order.delivery_latitude,
+        delivery_longitude=order.delivery_longitude,
+        created_at=order.created_at,
+        items=items
+    )
+
+
+def product_to_response(
+    product: Product,
+    available_options_only: bool = False,
+    include_image: bool = True
+) -> ProductResponse:
+    """
+    Build a ProductResponse with the product's option groups and options.
+    Without include_image the (often base64) image_url is left out, so the
+    column can be deferred in the query.
+    """
+    option_groups = [
+        OptionGroupWithOptions(
+            id=group.id,
+            name_rus=group.name_rus,
+            name_kaz=group.name_kaz,
+            is_required=group.is_required,
+            is_multiple=group.is_multiple,
+            options=[
+                opt for opt in group.options
+                if opt.is_available or not available_options_only
+            ]
+        )
+        for group in product.option_groups
+    ]
+    
+    return ProductResponse(
+        id=product.id,
+        category_id=product.category_id,
+        name_rus=product.name_rus,
+        name_kaz=product.name_kaz,
+        description_rus=product.description_rus,
+        description_kaz=product.description_kaz,
+        base_price=product.base_price,
+        image_url=product.image_url if include_image else None,
+        status=product.status,
+        created_at=product.created_at,
+        option_groups=option_groups
+    )
@@ -0,0 +1,28 @@
+"""
+Rebuild the daily_sales rollup from the orders table.
+
+Usage: python backfill_daily_sales.py [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+Without a range every day is rebuilt. The API fills an empty rollup by
+itself on startup; run this to rebuild days after orders were corrected
+by hand.
+"""
+import argparse
+from datetime import date
+from app.db.session import SessionLocal
+from app.services.sales_rollup import backfill_daily_sales
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the daily_sales rollup")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat)
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat)
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    try:
+        rows = backfill_daily_sales(db, args.date_from, args.date_to)
+        print(f"✅ daily_sales rebuilt: {rows} rows written")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
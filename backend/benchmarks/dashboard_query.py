@@ -0,0 +1,102 @@
+"""
+Benchmark the admin dashboard query against a synthetic order table.
+
+Creates a throwaway `bench` schema in the configured database, fills it with
+synthetic orders and times the previous five-query implementation against
+compute_dashboard_stats_from_orders().
+
+Usage (from backend/): python -m benchmarks.dashboard_query [--orders 1000000] [--runs 20]
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime
+from sqlalchemy import and_, func, text
+from sqlalchemy.orm import Session
+from app.db.base import Base
+from app.db.session import engine
+from app.models.models import Order, OrderStatus
+from app.services.dashboard import compute_dashboard_stats_from_orders
+
+SCHEMA = "bench"
+
+
+def legacy_dashboard_stats(db: Session) -> tuple:
+    """The five separate queries the dashboard used to run."""
+    today = datetime.now().date()
+    month_start = datetime(today.year, today.month, 1)
+    sold = Order.status.in_([OrderStatus.PAID, OrderStatus.COMPLETED])
+    
+    return (
+        db.query(func.sum(Order.total_amount)).filter(and_(func.date(Order.created_at) == today, sold)).scalar(),
+        db.query(func.sum(Order.total_amount)).filter(and_(Order.created_at >= month_start, sold)).scalar(),
+        db.query(func.count(Order.id)).filter(and_(func.date(Order.created_at) == today, sold)).scalar(),
+        db.query(func.count(Order.id)).filter(and_(Order.created_at >= month_start, sold)).scalar(),
+        db.query(func.count(Order.id)).filter(Order.status == OrderStatus.PAID).scalar(),
+    )
+
+
+def populate(connection, orders: int):
+    """Insert synthetic orders spread over the last two years, mostly closed."""
+    status_type = connection.execute(text(f"""
+        SELECT format_type(atttypid, atttypmod) FROM pg_attribute
+        WHERE attrelid = '{SCHEMA}.orders'::regclass AND attname = 'status'
+    """)).scalar()
+    connection.execute(text(f"""
+        INSERT INTO {SCHEMA}.orders (total_amount, bonus_earned, status, delivery_type, created_at)
+        SELECT
+            500 + (random() * 9500)::int,
+            0,
+            (CASE
+                WHEN g % 50 = 0 THEN 'PENDING'
+                WHEN g % 40 = 0 THEN 'CANCELLED'
+                WHEN g % 1000 = 0 THEN 'PAID'
+                ELSE 'COMPLETED'
+            END)::{status_type},
+            'pickup',
+            now() - (random() * interval '730 days')
+        FROM generate_series(1, :orders) AS g
+    """), {"orders": orders})
+    connection.execute(text(f"ANALYZE {SCHEMA}.orders"))
+
+
+def timed(label: str, fn, db: Session, runs: int):
+    fn(db)  # warm up
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn(db)
+        samples.append((time.perf_counter() - started) * 1000)
+    print(f"{label:<28} median {statistics.median(samples):8.2f} ms   p95 {sorted(samples)[int(runs * 0.95) - 1]:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    
+    bench_engine = engine.execution_options(schema_translate_map={None: SCHEMA})
+    
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    
+    try:
+        with bench_engine.begin() as connection:
+            Base.metadata.create_all(connection, tables=[
+                Base.metadata.tables["users"], Base.metadata.tables["orders"]
+            ])
+            print(f"Inserting {args.orders} orders...")
+            populate(connection, args.orders)
+        
+        with Session(bench_engine) as db:
+            timed("legacy (5 queries)", legacy_dashboard_stats, db, args.runs)
+            timed("aggregated (1 query)", compute_dashboard_stats_from_orders, db, args.runs)
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
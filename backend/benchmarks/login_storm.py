@@ -0,0 +1,81 @@
+"""
+Benchmark event-loop latency during a login storm.
+
+Fires a burst of concurrent password checks while a probe task, standing
+in for menu traffic on the same worker, wakes up every few milliseconds
+and records how late it runs. Compares calling verify_password() inline in
+the coroutine (what the login handler used to do) with
+verify_password_async(). Needs no services.
+
+Usage (from backend/): python -m benchmarks.login_storm [--logins 50] [--rounds 12]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import bcrypt
+from app.core.metrics import metrics
+from app.core.security import verify_password, verify_password_async
+
+PROBE_INTERVAL = 0.005  # seconds
+
+
+async def inline_login(password: str, hashed: str) -> bool:
+    return verify_password(password, hashed)
+
+
+async def offloaded_login(password: str, hashed: str) -> bool:
+    return await verify_password_async(password, hashed)
+
+
+async def storm(login, logins: int, hashed: str) -> tuple:
+    """Run a burst of logins; return (probe lags in ms, burst duration in s)."""
+    lags = []
+    done = asyncio.Event()
+
+    async def probe():
+        while not done.is_set():
+            expected = time.perf_counter() + PROBE_INTERVAL
+            await asyncio.sleep(PROBE_INTERVAL)
+            lags.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+    probe_task = asyncio.create_task(probe())
+    await asyncio.sleep(PROBE_INTERVAL * 2)
+    started = time.perf_counter()
+    await asyncio.gather(*(login("correct horse", hashed) for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await probe_task
+    return lags, elapsed
+
+
+def report(label: str, lags: list, elapsed: float, logins: int):
+    lags = sorted(lags)
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+    print(
+        f"{label:<22} loop lag median {statistics.median(lags):8.1f} ms   "
+        f"p99 {p99:8.1f} ms   max {lags[-1]:8.1f} ms   "
+        f"{logins / elapsed:6.1f} logins/s"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    args = parser.parse_args()
+
+    hashed = bcrypt.hashpw(b"correct horse", bcrypt.gensalt(args.rounds)).decode()
+
+    lags, elapsed = await storm(inline_login, args.logins, hashed)
+    report("inline verify", lags, elapsed, args.logins)
+
+    lags, elapsed = await storm(offloaded_login, args.logins, hashed)
+    report("verify_password_async", lags, elapsed, args.logins)
+
+    queue = metrics.snapshot()["timings"]["password_hash.queue"]
+    print(f"{'':<22} queue wait avg {queue['avg_ms']:8.1f} ms   max {queue['max_ms']:8.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
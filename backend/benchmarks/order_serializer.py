@@ -0,0 +1,122 @@
+"""
+Benchmark loading and serializing admin order lists.
+
+Compares the previous per-handler code (lazy loading of items and options,
+validated OrderResponse construction) with ORDER_WITH_ITEMS +
+order_to_response(), counting queries and timing both. Runs against an
+in-memory SQLite database, so no services are needed.
+
+Usage (from backend/): python -m benchmarks.order_serializer [--orders 100] [--runs 20]
+"""
+import argparse
+import statistics
+import time
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from typing import List
+from app.db.base import Base
+from app.models.models import Order, OrderItem, OrderItemOption, OrderStatus
+from app.schemas.schemas import OrderResponse, OrderItemResponse, OrderItemOptionCreate
+from app.services.serializers import ORDER_WITH_ITEMS, order_to_response
+
+ORDER_LIST = TypeAdapter(List[OrderResponse])
+
+
+def legacy_orders(db: Session, limit: int) -> List[OrderResponse]:
+    """The hand-built response code previously copied into each handler."""
+    orders = db.query(Order).order_by(Order.created_at.desc()).limit(limit).all()
+    
+    result = []
+    for order in orders:
+        items = []
+        for item in order.items:
+            options = [
+                OrderItemOptionCreate(
+                    option_group_name=opt.option_group_name,
+                    option_name=opt.option_name,
+                    option_price=opt.option_price
+                )
+                for opt in item.selected_options
+            ]
+            
+            items.append(OrderItemResponse(
+                id=item.id,
+                product_name=item.product_name,
+                base_price=item.base_price,
+                quantity=item.quantity,
+                total_price=item.total_price,
+                selected_options=options
+            ))
+        
+        result.append(OrderResponse(
+            id=order.id,
+            user_id=order.user_id,
+            total_amount=order.total_amount,
+            bonus_earned=order.bonus_earned,
+            status=order.status,
+            payment_token=order.payment_token,
+            payment_url=order.payment_url,
+            created_at=order.created_at,
+            items=items
+        ))
+    return result
+
+
+def shared_orders(db: Session, limit: int) -> List[OrderResponse]:
+    orders = db.query(Order).options(ORDER_WITH_ITEMS).order_by(Order.created_at.desc()).limit(limit).all()
+    return [order_to_response(order) for order in orders]
+
+
+def populate(db: Session, orders: int):
+    for n in range(orders):
+        order = Order(total_amount=3000, bonus_earned=30, status=OrderStatus.PAID,
+                      payment_token=f"token_{n}", payment_url=f"https://kaspi.kz/pay/token_{n}")
+        for i in range(3):
+            item = OrderItem(product_name=f"Латте {i}", base_price=1200, quantity=1, total_price=1600)
+            item.selected_options = [
+                OrderItemOption(option_group_name="Молоко", option_name="Кокосовое", option_price=400),
+                OrderItemOption(option_group_name="Сироп", option_name="Ваниль", option_price=0),
+            ]
+            order.items.append(item)
+        db.add(order)
+    db.commit()
+
+
+def run(label: str, fn, engine, limit: int, runs: int):
+    queries = []
+    
+    def count_query(*args):
+        queries.append(1)
+    
+    event.listen(engine, "before_cursor_execute", count_query)
+    samples = []
+    try:
+        for _ in range(runs):
+            queries.clear()
+            with Session(engine) as db:
+                started = time.perf_counter()
+                ORDER_LIST.dump_json(fn(db, limit))
+                samples.append((time.perf_counter() - started) * 1000)
+    finally:
+        event.remove(engine, "before_cursor_execute", count_query)
+    print(f"{label:<24} {len(queries):4d} queries   median {statistics.median(samples):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--orders", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        populate(db, args.orders)
+    
+    run("legacy (lazy loading)", legacy_orders, engine, args.orders, args.runs)
+    run("shared serializer", shared_orders, engine, args.orders, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark rendering of the large list responses.
+
+For the menu, active orders and admin product list, times FastAPI's
+default path (response_model validation, jsonable encoding and
+JSONResponse), the same path rendered with ORJSONResponse, and
+schema_response(), which serializes the schema objects directly. The menu
+cache hit is timed separately: it used to be parsed and rebuilt as a
+MenuResponse before being serialized again. Data lives in an in-memory
+SQLite database, so no services are needed.
+
+Usage (from backend/): python -m benchmarks.response_rendering [--products 200] [--orders 200] [--runs 50]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import List
+import orjson
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from app.core.responses import json_response, schema_response
+from app.db.base import Base
+from app.models.models import (
+    Category, Product, ProductStatus, OptionGroup, Option,
+    Order, OrderItem, OrderItemOption, OrderStatus
+)
+from app.schemas.schemas import MenuResponse, OrderResponse, ProductResponse
+from app.services.menu import build_menu
+from app.services.serializers import ORDER_WITH_ITEMS, PRODUCT_WITH_OPTIONS, order_to_response, product_to_response
+
+
+def populate(db: Session, products: int, orders: int):
+    groups = []
+    for g in range(4):
+        group = OptionGroup(name_rus=f"Группа {g}", name_kaz=f"Топ {g}", is_required=g == 0, is_multiple=g > 1)
+        group.options = [
+            Option(name_rus=f"Опция {g}.{o}", name_kaz=f"Опция {g}.{o}", price=100 * o, is_available=True)
+            for o in range(5)
+        ]
+        groups.append(group)
+    categories = [Category(name_rus=f"Категория {c}", name_kaz=f"Санат {c}", order=c, is_active=True) for c in range(8)]
+    db.add_all(groups + categories)
+    db.flush()
+
+    for p in range(products):
+        product = Product(
+            category_id=categories[p % len(categories)].id,
+            name_rus=f"Напиток {p}", name_kaz=f"Сусын {p}",
+            description_rus="Эспрессо с молоком и молочной пенкой " * 3,
+            description_kaz="Сүт пен көбігі бар эспрессо " * 3,
+            base_price=900 + p, image_url=f"/uploads/products/{p}.jpg", status=ProductStatus.ACTIVE
+        )
+        product.option_groups = groups[:1 + p % len(groups)]
+        db.add(product)
+
+    for n in range(orders):
+        order = Order(total_amount=3000, bonus_earned=30, status=OrderStatus.PAID, delivery_type="pickup",
+                      payment_token=f"token_{n}", payment_url=f"https://kaspi.kz/pay/token_{n}")
+        for i in range(3):
+            item = OrderItem(product_name=f"Латте {i}", base_price=1200, quantity=1, total_price=1600)
+            item.selected_options = [
+                OrderItemOption(option_group_name="Молоко", option_name="Кокосовое", option_price=400),
+                OrderItemOption(option_group_name="Сироп", option_name="Ваниль", option_price=0),
+            ]
+            order.items.append(item)
+        db.add(order)
+    db.commit()
+
+
+def fastapi_render(response_class, response_type):
+    """What a route with response_model=response_type does with a returned value."""
+    field = create_response_field(name="benchmark", type_=response_type)
+
+    def render(content) -> bytes:
+        serialized = asyncio.run(serialize_response(field=field, response_content=content))
+        return response_class(serialized).body
+    return render
+
+
+def measure(fn, content, runs: int) -> tuple:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        body = fn(content)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), body
+
+
+def compare(label: str, content, response_type, adapter, runs: int, cached: bool = False):
+    paths = [
+        ("fastapi + JSONResponse", fastapi_render(JSONResponse, response_type)),
+        ("fastapi + ORJSONResponse", fastapi_render(ORJSONResponse, response_type)),
+        ("schema_response", lambda value: schema_response(value, adapter).body),
+    ]
+    if cached:
+        # `content` is the cached JSON string here
+        legacy = fastapi_render(JSONResponse, response_type)
+        paths = [
+            ("legacy cache hit", lambda payload: legacy(MenuResponse(**json.loads(payload)))),
+            ("json_response", lambda payload: json_response(payload).body),
+        ]
+
+    print(label)
+    bodies = []
+    for name, fn in paths:
+        median, body = measure(fn, content, runs)
+        bodies.append(orjson.loads(body))
+        print(f"  {name:<26} median {median:8.3f} ms   {len(body) / 1024:8.1f} KiB")
+    assert all(body == bodies[0] for body in bodies), f"{label}: responses differ"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        populate(db, args.products, args.orders)
+
+        menu = build_menu(db)
+        orders = [
+            order_to_response(order)
+            for order in db.query(Order).options(ORDER_WITH_ITEMS).order_by(Order.created_at.desc()).all()
+        ]
+        products = [
+            product_to_response(product)
+            for product in db.query(Product).options(PRODUCT_WITH_OPTIONS).order_by(Product.id).all()
+        ]
+
+    compare("GET /menu (cache miss)", menu, MenuResponse, None, args.runs)
+    compare("GET /menu (cache hit)", menu.model_dump_json(), MenuResponse, None, args.runs, cached=True)
+    compare("GET /admin/orders/active", orders, List[OrderResponse], TypeAdapter(List[OrderResponse]), args.runs)
+    compare("GET /admin/products", products, List[ProductResponse], TypeAdapter(List[ProductResponse]), args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Shared fixtures. Tests run on in-memory SQLite and fakeredis, so neither
+Postgres nor Redis is needed:
+
+    pip install -r requirements-dev.txt
+    pytest            # from backend/
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+# Before any app module creates its engine
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import fakeredis.aioredis
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.api.dependencies import get_current_admin
+from app.core.cache import cache
+from app.core.principals import Principal
+from app.db.base import Base
+from app.db.session import get_db
+from app.models import models  # noqa: F401  (registers the tables)
+from app.models.models import UserRole
+
+
+def _create_engine():
+    """A fresh in-memory database with every table."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def _sessionmaker(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def engine():
+    engine = _create_engine()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return _sessionmaker(engine)
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def other_db():
+    """Session on a second, empty database (e.g. to copy data into)."""
+    engine = _create_engine()
+    session = _sessionmaker(engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def run():
+    """Run coroutines on one event loop per test; fakeredis binds to the first loop it sees."""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    """Point the shared cache at a fresh in-memory Redis."""
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(cache, "redis_client", client)
+    return client
+
+
+@asynccontextmanager
+async def _no_lifespan(app):
+    yield
+
+
+@pytest.fixture
+def client(db, redis, monkeypatch):
+    """
+    API client using the test session. Background tasks are not started;
+    all requests share one event loop, as fakeredis requires.
+    """
+    from app.main import app
+
+    monkeypatch.setattr(app.router, "lifespan_context", _no_lifespan)
+    app.dependency_overrides[get_db] = lambda: db
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def admin_client(client):
+    """API client whose requests pass get_current_admin."""
+    client.app.dependency_overrides[get_current_admin] = lambda: Principal(id=1, role=UserRole.ADMIN)
+    return client
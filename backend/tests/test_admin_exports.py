@@ -0,0 +1,49 @@
+import pytest
+from app.api import dependencies
+from app.api.v1 import admin
+from app.core.security import create_access_token
+from app.db.session import get_db
+from app.models.models import Order, OrderStatus, User, UserRole
+
+
+@pytest.fixture
+def exports(client, db, session_factory, monkeypatch):
+    """Exports and their auth open their own sessions; get_db must stay unused."""
+    monkeypatch.setattr(dependencies, "SessionLocal", session_factory)
+    monkeypatch.setattr(admin, "SessionLocal", session_factory)
+
+    def no_request_session():
+        raise AssertionError("exports must not depend on get_db")
+
+    client.app.dependency_overrides[get_db] = no_request_session
+    user = User(
+        first_name="Dana", last_name="Admin", phone_number="77005550000",
+        password_hash="x", role=UserRole.ADMIN
+    )
+    db.add(user)
+    db.add(Order(total_amount=1500, status=OrderStatus.COMPLETED))
+    db.commit()
+    return client, create_access_token({"sub": str(user.id)})
+
+
+@pytest.mark.parametrize("path", ["/api/v1/admin/orders/export", "/api/v1/admin/catalog/export"])
+def test_export_authenticates_from_header_without_request_session(exports, path):
+    client, token = exports
+    response = client.get(path, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("path", ["/api/v1/admin/orders/export", "/api/v1/admin/catalog/export"])
+def test_export_rejects_query_token(exports, path):
+    client, token = exports
+    assert client.get(path, params={"token": token}).status_code == 401
+
+
+def test_export_requires_admin(exports, db):
+    client, _ = exports
+    user = User(first_name="Aida", last_name="Client", phone_number="77001234567", password_hash="x")
+    db.add(user)
+    db.commit()
+    token = create_access_token({"sub": str(user.id)})
+    response = client.get("/api/v1/admin/orders/export", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 403
@@ -0,0 +1,159 @@
+import io
+import os
+import time
+import pytest
+from PIL import Image
+from app.api.dependencies import get_current_user
+from app.core.config import settings
+from app.models.models import User, UserRole
+from app.services import avatars
+from app.services.avatars import (
+    AVATAR_URL_PREFIX, AvatarTooLarge, InvalidAvatar, _process_avatar, avatar_collector, discard_avatar
+)
+
+
+@pytest.fixture(autouse=True)
+def avatar_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(avatars, "AVATAR_DIR", str(tmp_path))
+    return tmp_path
+
+
+def image_bytes(image_format, size=(2000, 1500), color=(200, 30, 30), **params) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, image_format, **params)
+    return buffer.getvalue()
+
+
+def process(data: bytes, user_id: int = 7) -> str:
+    return _process_avatar(io.BytesIO(data), user_id)
+
+
+def stored(avatar_dir, url: str) -> Image.Image:
+    return Image.open(avatar_dir / url[len(AVATAR_URL_PREFIX):])
+
+
+@pytest.mark.parametrize("image_format", ["PNG", "JPEG", "WEBP"])
+def test_resized_to_jpeg(avatar_dir, image_format):
+    url = process(image_bytes(image_format))
+
+    assert url.startswith(f"{AVATAR_URL_PREFIX}avatar_7_") and url.endswith(".jpg")
+    with stored(avatar_dir, url) as image:
+        assert image.format == "JPEG"
+        assert image.size == (settings.AVATAR_SIZE, settings.AVATAR_SIZE * 3 // 4)
+    # Only the avatar is left, no temporary files
+    assert len(os.listdir(avatar_dir)) == 1
+
+
+def test_name_follows_content():
+    red = process(image_bytes("PNG"))
+
+    assert process(image_bytes("PNG")) == red
+    assert process(image_bytes("PNG", color=(30, 30, 200))) != red
+
+
+def test_exif_orientation_is_applied(avatar_dir):
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotate 90° clockwise when displayed
+    url = process(image_bytes("JPEG", size=(800, 400), exif=exif))
+
+    with stored(avatar_dir, url) as image:
+        assert image.size == (settings.AVATAR_SIZE // 2, settings.AVATAR_SIZE)
+
+
+@pytest.mark.parametrize("data", [
+    image_bytes("GIF", size=(64, 64)),
+    b"definitely not an image",
+    image_bytes("PNG")[:200],
+])
+def test_rejects_other_content(avatar_dir, data):
+    with pytest.raises(InvalidAvatar):
+        process(data)
+    assert os.listdir(avatar_dir) == []
+
+
+def test_rejects_huge_dimensions(avatar_dir, monkeypatch):
+    monkeypatch.setattr(avatars, "MAX_PIXELS", 100 * 100)
+
+    with pytest.raises(InvalidAvatar, match="dimensions"):
+        process(image_bytes("PNG", size=(200, 200)))
+    assert os.listdir(avatar_dir) == []
+
+
+def test_size_cap(avatar_dir, monkeypatch):
+    monkeypatch.setattr(settings, "AVATAR_MAX_BYTES", 1024)
+
+    with pytest.raises(AvatarTooLarge):
+        process(os.urandom(1025))
+    assert os.listdir(avatar_dir) == []
+
+
+def test_discard_only_touches_avatar_files(avatar_dir):
+    url = process(image_bytes("PNG"))
+    (avatar_dir / "keep.jpg").write_bytes(b"x")
+
+    discard_avatar(None)
+    discard_avatar("https://example.com/avatar.jpg")
+    discard_avatar(f"{AVATAR_URL_PREFIX}../keep.jpg")
+    discard_avatar(f"{AVATAR_URL_PREFIX}missing.jpg")
+    assert sorted(os.listdir(avatar_dir)) == sorted(["keep.jpg", url[len(AVATAR_URL_PREFIX):]])
+
+    discard_avatar(url)
+    assert os.listdir(avatar_dir) == ["keep.jpg"]
+
+
+def test_collector_deletes_old_unreferenced_files(db, session_factory, avatar_dir, monkeypatch):
+    monkeypatch.setattr(avatars, "SessionLocal", session_factory)
+    db.add(User(
+        first_name="Aida", last_name="Nurlanova", phone_number="77001234567", password_hash="x",
+        role=UserRole.CLIENT, avatar_url=f"{AVATAR_URL_PREFIX}in_use.jpg"
+    ))
+    db.commit()
+    old = time.time() - settings.AVATAR_GC_GRACE - 60
+    for name in ("in_use.jpg", "orphan.jpg", "fresh.jpg"):
+        (avatar_dir / name).write_bytes(b"x")
+    for name in ("in_use.jpg", "orphan.jpg"):
+        os.utime(avatar_dir / name, (old, old))
+
+    assert avatar_collector.collect() == 1
+    assert sorted(os.listdir(avatar_dir)) == ["fresh.jpg", "in_use.jpg"]
+
+
+@pytest.fixture
+def customer(db, client):
+    user = User(
+        first_name="Aida", last_name="Nurlanova", phone_number="77001234567",
+        password_hash="x", role=UserRole.CLIENT
+    )
+    db.add(user)
+    db.commit()
+    client.app.dependency_overrides[get_current_user] = lambda: user
+    return user
+
+
+def upload(client, data: bytes, content_type="image/png"):
+    return client.put("/api/v1/profile/avatar", files={"file": ("avatar", data, content_type)})
+
+
+def test_upload_replaces_previous_avatar(client, customer, avatar_dir):
+    first = upload(client, image_bytes("PNG"))
+    second = upload(client, image_bytes("PNG", color=(30, 30, 200)))
+
+    assert first.status_code == second.status_code == 200
+    assert customer.avatar_url == second.json()["avatar_url"]
+    assert os.listdir(avatar_dir) == [customer.avatar_url[len(AVATAR_URL_PREFIX):]]
+
+
+def test_upload_rejects_unsupported_format(client, customer):
+    assert upload(client, image_bytes("GIF", size=(64, 64)), "image/gif").status_code == 400
+    assert customer.avatar_url is None
+
+
+def test_oversized_upload_is_refused_from_content_length(client, customer):
+    response = client.put(
+        "/api/v1/profile/avatar",
+        content=b"x" * (settings.AVATAR_MAX_BYTES + avatars.MULTIPART_OVERHEAD + 1),
+        headers={"Content-Type": "multipart/form-data; boundary=x"}
+    )
+
+    assert response.status_code == 413
+    assert response.json() == {"detail": avatars.too_large_message()}
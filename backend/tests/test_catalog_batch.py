@@ -0,0 +1,113 @@
+import pytest
+from sqlalchemy import event
+from app.db.base import Base
+from app.models.models import Category, Product
+
+
+@pytest.fixture
+def engine(engine):
+    # pysqlite's own transaction handling breaks SAVEPOINT; let SQLAlchemy
+    # emit BEGIN so begin_nested() rolls back like it does on Postgres
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+    # Reconnect through the hooks above; the new in-memory database is empty
+    engine.dispose()
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def _category(ref=None, name="Кофе"):
+    return {"op": "create_category", "ref": ref, "data": {"name_rus": name, "name_kaz": name}}
+
+
+def _product(category, name="Латте"):
+    return {
+        "op": "create_product",
+        "data": {"category_id": category, "name_rus": name, "name_kaz": name, "base_price": 1200}
+    }
+
+
+def test_refs_resolve_to_created_ids(db, admin_client):
+    response = admin_client.post("/api/v1/admin/catalog/batch", json={
+        "operations": [_category("coffee"), _product("$coffee"), _product("$coffee", "Капучино")]
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["committed"] is True
+    assert all(result["success"] for result in body["results"])
+
+    category_id = body["results"][0]["id"]
+    products = db.query(Product).order_by(Product.id).all()
+    assert [product.category_id for product in products] == [category_id, category_id]
+    assert [product.id for product in products] == [result["id"] for result in body["results"][1:]]
+
+
+def test_unknown_ref_fails_its_operation(admin_client):
+    response = admin_client.post("/api/v1/admin/catalog/batch", json={
+        "operations": [_product("$missing")], "atomic": False
+    })
+    result = response.json()["results"][0]
+    assert result["success"] is False
+    assert "$missing" in result["error"]
+
+
+def test_atomic_batch_rolls_back_on_any_failure(db, admin_client):
+    response = admin_client.post("/api/v1/admin/catalog/batch", json={
+        "operations": [_category("coffee"), _product("$coffee"), {"op": "delete_category", "id": 999999}]
+    })
+    body = response.json()
+    assert body["committed"] is False
+    assert [result["error"] for result in body["results"][:2]] == ["Rolled back", "Rolled back"]
+    assert all(result["id"] is None for result in body["results"])
+    assert body["results"][2]["success"] is False
+    assert db.query(Category).count() == 0
+    assert db.query(Product).count() == 0
+
+
+def test_non_atomic_batch_keeps_successful_operations(db, admin_client):
+    response = admin_client.post("/api/v1/admin/catalog/batch", json={
+        "operations": [
+            _category("coffee"),
+            {"op": "create_product", "data": {"category_id": "$coffee", "name_rus": "Без цены"}},
+            _product("$coffee"),
+        ],
+        "atomic": False
+    })
+    body = response.json()
+    assert body["committed"] is True
+    assert [result["success"] for result in body["results"]] == [True, False, True]
+    assert db.query(Category).count() == 1
+    assert [product.name_rus for product in db.query(Product)] == ["Латте"]
+
+
+def test_free_text_starting_with_dollar_is_not_a_ref(db, admin_client):
+    product = _product("$coffee", "$5 скидка")
+    product["data"]["description_rus"] = "$5 скидка на второй"
+    response = admin_client.post("/api/v1/admin/catalog/batch", json={
+        "operations": [_category("coffee", "$ меню"), product]
+    })
+    assert response.json()["committed"] is True
+    assert db.query(Category).one().name_rus == "$ меню"
+    stored = db.query(Product).one()
+    assert (stored.name_rus, stored.description_rus) == ("$5 скидка", "$5 скидка на второй")
+
+
+def test_refs_resolve_in_id_lists(db, admin_client):
+    product = _product("$coffee")
+    product["data"]["option_group_ids"] = ["$milk"]
+    response = admin_client.post("/api/v1/admin/catalog/batch", json={
+        "operations": [
+            _category("coffee"),
+            {"op": "create_option_group", "ref": "milk", "data": {"name_rus": "Молоко", "name_kaz": "Сүт"}},
+            product,
+        ]
+    })
+    body = response.json()
+    assert body["committed"] is True
+    assert [group.id for group in db.query(Product).one().option_groups] == [body["results"][1]["id"]]
@@ -0,0 +1,125 @@
+import json
+import pytest
+from app.models.models import Category, Option, OptionGroup, Product, ProductStatus
+from app.schemas.schemas import CatalogDocument
+from app.services.catalog_transfer import (
+    CatalogImportError, export_catalog_csv, export_catalog_json, import_catalog, parse_catalog_csv
+)
+
+
+@pytest.fixture
+def catalog(db):
+    coffee = Category(external_id="coffee", name_rus="Кофе", name_kaz="Кофе", order=1)
+    tea = Category(external_id="tea", name_rus="Чай", name_kaz="Шай", order=2, is_active=False)
+    milk = OptionGroup(external_id="milk", name_rus="Молоко", name_kaz="Сүт", is_required=True)
+    syrup = OptionGroup(external_id="syrup", name_rus="Сироп", name_kaz="Шәрбат", is_multiple=True)
+    db.add_all([coffee, tea, milk, syrup])
+    db.flush()
+    db.add_all([
+        Option(external_id="oat", group_id=milk.id, name_rus="Овсяное", name_kaz="Сұлы", price=400),
+        Option(external_id="vanilla", group_id=syrup.id, name_rus="Ваниль", name_kaz="Ваниль", price=300, is_available=False),
+    ])
+    latte = Product(
+        external_id="latte", category_id=coffee.id, name_rus="Латте", name_kaz="Латте",
+        description_rus="Кофе с молоком", base_price=1200
+    )
+    latte.option_groups = [milk, syrup]
+    green = Product(
+        external_id="green", category_id=tea.id, name_rus="Зелёный", name_kaz="Жасыл",
+        base_price=800, status=ProductStatus.INACTIVE
+    )
+    db.add_all([latte, green])
+    db.commit()
+    return db
+
+
+@pytest.fixture
+def target(other_db):
+    """An empty database to import into."""
+    return other_db
+
+
+def export_json(db) -> dict:
+    return json.loads("".join(export_catalog_json(db)))
+
+
+def test_json_export_shape(catalog):
+    document = export_json(catalog)
+
+    assert document["version"] == 1
+    assert [c["external_id"] for c in document["categories"]] == ["coffee", "tea"]
+    latte = next(p for p in document["products"] if p["external_id"] == "latte")
+    assert latte["category"] == "coffee"
+    assert latte["option_groups"] == ["milk", "syrup"]
+    assert next(o for o in document["options"] if o["external_id"] == "oat")["group"] == "milk"
+
+
+def test_json_round_trip(catalog, target):
+    exported = export_json(catalog)
+
+    counts = import_catalog(target, CatalogDocument.model_validate(exported))
+    target.commit()
+
+    assert counts == {"categories": 2, "option_groups": 2, "options": 2, "products": 2, "links": 2}
+    assert export_json(target) == exported
+
+
+def test_csv_round_trip(catalog, target):
+    exported = "".join(export_catalog_csv(catalog))
+
+    import_catalog(target, CatalogDocument.model_validate(parse_catalog_csv(exported)))
+    target.commit()
+
+    assert "".join(export_catalog_csv(target)) == exported
+    assert export_json(target) == export_json(catalog)
+
+
+def test_import_updates_by_external_id_and_replaces_links(catalog):
+    document = CatalogDocument.model_validate({
+        "products": [{
+            "external_id": "latte", "category": "coffee", "name_rus": "Латте XL",
+            "name_kaz": "Латте XL", "base_price": 1500, "option_groups": ["syrup"]
+        }],
+    })
+
+    import_catalog(catalog, document)
+    catalog.commit()
+    catalog.expire_all()
+
+    latte = catalog.query(Product).filter(Product.external_id == "latte").one()
+    assert (latte.name_rus, latte.base_price) == ("Латте XL", 1500)
+    assert [group.external_id for group in latte.option_groups] == ["syrup"]
+    # Records left out of the document stay as they are
+    assert catalog.query(Product).count() == 2
+    assert catalog.query(Option).count() == 2
+
+
+def test_invalid_references_write_nothing(catalog):
+    document = CatalogDocument.model_validate({
+        "categories": [
+            {"external_id": "bakery", "name_rus": "Выпечка", "name_kaz": "Тоқаш"},
+            {"external_id": "bakery", "name_rus": "Выпечка", "name_kaz": "Тоқаш"},
+        ],
+        "options": [{"external_id": "soy", "group": "no-such-group", "name_rus": "Соевое", "name_kaz": "Соя"}],
+        "products": [{
+            "external_id": "croissant", "category": "no-such-category", "name_rus": "Круассан",
+            "name_kaz": "Круассан", "base_price": 900, "option_groups": ["milk", "no-such-group"]
+        }],
+    })
+
+    with pytest.raises(CatalogImportError) as error:
+        import_catalog(catalog, document)
+
+    assert sorted(tuple(e["loc"]) for e in error.value.errors) == sorted([
+        ("categories", "bakery"),
+        ("options", 0, "group"),
+        ("products", 0, "category"),
+        ("products", 0, "option_groups"),
+    ])
+    assert catalog.query(Category).count() == 2
+    assert catalog.query(Product).count() == 2
+
+
+def test_unknown_csv_record_type_is_rejected():
+    with pytest.raises(CatalogImportError):
+        parse_catalog_csv("type,external_id,name_rus,name_kaz\nsandwich,blt,БЛТ,БЛТ\n")
@@ -0,0 +1,93 @@
+import json
+from datetime import datetime
+import pytest
+from app.schemas.schemas import MenuCategory, MenuResponse, ProductResponse
+from app.services.menu_search import MenuSearchIndex, fold, tokenize
+
+CREATED = datetime(2026, 3, 1)
+
+
+def product(product_id, name_rus, name_kaz=None, description_rus=None):
+    return ProductResponse(
+        id=product_id, category_id=1, name_rus=name_rus, name_kaz=name_kaz or name_rus,
+        description_rus=description_rus, base_price=1000, created_at=CREATED
+    )
+
+
+@pytest.fixture
+def index():
+    index = MenuSearchIndex()
+    index.build(MenuResponse(categories=[
+        MenuCategory(id=1, name_rus="Кофе", name_kaz="Кофе", order=1, products=[
+            product(1, "Капучино", description_rus="Эспрессо с молочной пенкой"),
+            product(2, "Латте", description_rus="Кофе с молоком"),
+            product(3, "Раф ванильный", "Ванильді раф"),
+            product(4, "Капучино на овсяном молоке"),
+        ]),
+        MenuCategory(id=2, name_rus="Выпечка", name_kaz="Пісірілген", order=2, products=[
+            product(5, "Круассан", "Қытырлақ круассан"),
+            product(6, "Чизкейк с ёжевикой"),
+        ]),
+    ]))
+    return index
+
+
+def ids(results):
+    return [json.loads(result)["id"] for result in results]
+
+
+@pytest.mark.parametrize("text, folded", [
+    ("Қытырлақ", "кытырлак"),
+    ("Ёжевика", "ежевика"),
+    ("Йогурт", "иогурт"),
+    ("Әлем Ғажап Ңң Өнім Ұлы Үй Һ Іні", "алем гажап нн оним улы уи х ини"),
+    ("Café", "cafe"),
+])
+def test_fold(text, folded):
+    assert fold(text) == folded
+
+
+def test_tokenize_splits_on_punctuation():
+    assert tokenize("Раф, ванильный!") == ["раф", "ванильныи"]
+    assert tokenize(None) == []
+
+
+def test_exact_word_finds_product(index):
+    assert ids(index.search("латте", 10)) == [2]
+
+
+def test_prefix_finds_product(index):
+    assert ids(index.search("кап", 10)) == [1, 4]
+
+
+def test_folded_query_finds_kazakh_name(index):
+    assert ids(index.search("кытыр", 10)) == [5]
+    assert ids(index.search("Қытырлақ", 10)) == [5]
+    assert ids(index.search("ежевикой", 10)) == [6]
+
+
+def test_typo_finds_product(index):
+    assert ids(index.search("капучина", 10)) == [1, 4]
+    assert ids(index.search("круасан", 10)) == [5]
+
+
+def test_unrelated_word_finds_nothing(index):
+    assert index.search("пицца", 10) == []
+
+
+def test_every_query_word_must_match(index):
+    assert ids(index.search("капучино овсяном", 10)) == [4]
+    assert index.search("капучино пицца", 10) == []
+
+
+def test_name_ranks_above_description(index):
+    # Exact match in a name beats the close match "молоком" in Latte's description
+    assert ids(index.search("молоке", 10)) == [4, 2]
+
+
+def test_limit_keeps_best_results(index):
+    assert ids(index.search("кап", 1)) == [1]
+
+
+def test_short_query_does_not_match_by_prefix(index):
+    assert index.search("к", 10) == []
@@ -0,0 +1,111 @@
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy import update
+from app.core.config import settings
+from app.models.models import DailySales, Order, OrderStatus, User, UserRole
+from app.services.dashboard_counters import dashboard_counters
+from app.services.order_feed import ORDER_CANCELLED, ORDER_PAID
+from app.services.order_state import InvalidOrderTransition, can_transition, transition_order
+from app.services.order_status import order_status_store
+
+
+@pytest.fixture
+def customer(db):
+    user = User(
+        first_name="Aida", last_name="Nurlanova", phone_number="77001234567",
+        password_hash="x", role=UserRole.CLIENT, bonus_points=0
+    )
+    db.add(user)
+    db.commit()
+    return user
+
+
+def make_order(db, user, status=OrderStatus.PENDING):
+    order = Order(user_id=user.id, total_amount=1500, bonus_earned=75, status=status)
+    db.add(order)
+    db.commit()
+    return order
+
+
+def feed_events(run, redis):
+    entries = run(redis.xrange(settings.ORDER_FEED_STREAM))
+    return [fields["event"] for _, fields in entries]
+
+
+def test_state_machine():
+    assert can_transition(OrderStatus.PENDING, OrderStatus.PAID)
+    assert can_transition(OrderStatus.PAID, OrderStatus.COMPLETED)
+    assert can_transition(OrderStatus.PAID, OrderStatus.CANCELLED)
+    assert not can_transition(OrderStatus.PENDING, OrderStatus.COMPLETED)
+    assert not can_transition(OrderStatus.COMPLETED, OrderStatus.CANCELLED)
+    assert not can_transition(OrderStatus.CANCELLED, OrderStatus.PAID)
+
+
+def test_pay_credits_bonus_and_records_sale(run, db, redis, customer):
+    order = make_order(db, customer)
+
+    assert run(transition_order(db, order, OrderStatus.PAID)) is True
+
+    assert order.status == OrderStatus.PAID
+    db.refresh(customer)
+    assert customer.bonus_points == 75
+    sales = db.query(DailySales).one()
+    assert (sales.revenue, sales.order_count) == (1500, 1)
+    assert run(order_status_store.load(order.id))["status"] == OrderStatus.PAID
+    assert feed_events(run, redis) == [ORDER_PAID]
+
+
+def test_cancelling_paid_order_reverses_sale(run, db, redis, customer):
+    order = make_order(db, customer)
+    run(transition_order(db, order, OrderStatus.PAID))
+
+    assert run(transition_order(db, order, OrderStatus.CANCELLED)) is True
+
+    db.refresh(customer)
+    assert customer.bonus_points == 0
+    sales = db.query(DailySales).one()
+    assert (sales.revenue, sales.order_count) == (0, 0)
+    assert feed_events(run, redis) == [ORDER_PAID, ORDER_CANCELLED]
+
+
+def test_invalid_transition_raises(run, db, redis, customer):
+    order = make_order(db, customer, OrderStatus.COMPLETED)
+
+    with pytest.raises(InvalidOrderTransition):
+        run(transition_order(db, order, OrderStatus.PAID))
+    db.refresh(order)
+    assert order.status == OrderStatus.COMPLETED
+
+
+def test_lost_race_changes_nothing(run, db, session_factory, redis, customer):
+    order = make_order(db, customer)
+
+    # Another worker cancels the order after this one loaded it
+    other = session_factory()
+    other.execute(update(Order).where(Order.id == order.id).values(status=OrderStatus.CANCELLED))
+    other.commit()
+    other.close()
+
+    assert run(transition_order(db, order, OrderStatus.PAID)) is False
+
+    assert order.status == OrderStatus.CANCELLED
+    db.refresh(customer)
+    assert customer.bonus_points == 0
+    assert db.query(DailySales).count() == 0
+    assert feed_events(run, redis) == []
+
+
+def test_redis_failure_after_commit_keeps_transition(run, db, redis, customer, monkeypatch):
+    async def unavailable(*args):
+        raise RedisConnectionError("Connection refused")
+
+    monkeypatch.setattr(dashboard_counters, "record_transition", unavailable)
+    order = make_order(db, customer)
+
+    assert run(transition_order(db, order, OrderStatus.PAID)) is True
+
+    db.refresh(order)
+    assert order.status == OrderStatus.PAID
+    # The other side effects still ran
+    assert run(order_status_store.load(order.id))["status"] == OrderStatus.PAID
+    assert feed_events(run, redis) == [ORDER_PAID]
@@ -0,0 +1,132 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.core.config import settings
+from app.models.models import Order, OrderStatus
+from app.services import order_sweeper
+from app.services.kaspi import kaspi_service
+from app.services.order_status import order_status_store
+from app.services.order_sweeper import pending_order_sweeper
+
+EXPIRED = datetime.now(timezone.utc) - timedelta(minutes=settings.ORDER_PENDING_EXPIRY_MINUTES + 5)
+
+
+@pytest.fixture
+def sweeper(session_factory, redis, monkeypatch):
+    monkeypatch.setattr(order_sweeper, "SessionLocal", session_factory)
+    return pending_order_sweeper
+
+
+@pytest.fixture
+def kaspi(monkeypatch):
+    """Kaspi stub: `voidable` tokens can be voided, `statuses` maps tokens to their status."""
+    state = {"voidable": set(), "statuses": {}, "voided": []}
+
+    async def cancel_invoice(token):
+        if token in state["voidable"]:
+            state["voided"].append(token)
+            return True
+        return False
+
+    async def check_payment_status(token):
+        return state["statuses"].get(token, "pending")
+
+    monkeypatch.setattr(kaspi_service, "cancel_invoice", cancel_invoice)
+    monkeypatch.setattr(kaspi_service, "check_payment_status", check_payment_status)
+    return state
+
+
+def make_order(db, token=None, created_at=EXPIRED):
+    order = Order(total_amount=1500, status=OrderStatus.PENDING, payment_token=token, created_at=created_at)
+    db.add(order)
+    db.commit()
+    return order.id
+
+
+def status_of(db, order_id):
+    db.expire_all()
+    return db.get(Order, order_id).status
+
+
+def test_uninvoiced_orders_are_cancelled_in_bulk(run, db, sweeper, kaspi):
+    expired = make_order(db)
+    fresh = make_order(db, created_at=datetime.now(timezone.utc))
+
+    counts = run(sweeper.sweep())
+
+    assert counts == {"cancelled": 1, "invoices_voided": 0, "recovered": 0}
+    assert status_of(db, expired) == OrderStatus.CANCELLED
+    assert status_of(db, fresh) == OrderStatus.PENDING
+    assert run(order_status_store.load(expired))["status"] == OrderStatus.CANCELLED
+
+
+def test_voided_invoice_cancels_order(run, db, sweeper, kaspi):
+    order_id = make_order(db, "t1")
+    kaspi["voidable"].add("t1")
+
+    counts = run(sweeper.sweep())
+
+    assert counts == {"cancelled": 1, "invoices_voided": 1, "recovered": 0}
+    assert kaspi["voided"] == ["t1"]
+    assert status_of(db, order_id) == OrderStatus.CANCELLED
+
+
+def test_invoice_paid_after_expiry_is_recovered(run, db, sweeper, kaspi):
+    order_id = make_order(db, "t1")
+    kaspi["statuses"]["t1"] = "paid"
+
+    counts = run(sweeper.sweep())
+
+    assert counts == {"cancelled": 0, "invoices_voided": 0, "recovered": 1}
+    assert status_of(db, order_id) == OrderStatus.PAID
+
+
+def test_failed_invoice_cancels_order(run, db, sweeper, kaspi):
+    order_id = make_order(db, "t1")
+    kaspi["statuses"]["t1"] = "failed"
+
+    counts = run(sweeper.sweep())
+
+    assert counts == {"cancelled": 1, "invoices_voided": 0, "recovered": 0}
+    assert status_of(db, order_id) == OrderStatus.CANCELLED
+
+
+def test_unvoidable_pending_invoice_waits_for_next_sweep(run, db, sweeper, kaspi):
+    order_id = make_order(db, "t1")
+
+    counts = run(sweeper.sweep())
+
+    assert counts == {"cancelled": 0, "invoices_voided": 0, "recovered": 0}
+    assert status_of(db, order_id) == OrderStatus.PENDING
+
+
+def test_pending_invoice_is_cancelled_when_voiding_is_disabled(run, db, sweeper, kaspi, monkeypatch):
+    monkeypatch.setattr(settings, "KASPI_VOID_EXPIRED_INVOICES", False)
+    order_id = make_order(db, "t1")
+    kaspi["voidable"].add("t1")
+
+    counts = run(sweeper.sweep())
+
+    assert counts == {"cancelled": 1, "invoices_voided": 0, "recovered": 0}
+    assert kaspi["voided"] == []
+    assert status_of(db, order_id) == OrderStatus.CANCELLED
+
+
+def test_one_worker_sweeps_per_interval(run, sweeper, monkeypatch):
+    sweeps = []
+
+    async def sweep():
+        sweeps.append(1)
+
+    async def stop(seconds):
+        raise asyncio.CancelledError
+
+    monkeypatch.setattr(sweeper, "sweep", sweep)
+    monkeypatch.setattr(order_sweeper.asyncio, "sleep", stop)
+
+    # Two workers' loops in the same interval
+    for _ in range(2):
+        with pytest.raises(asyncio.CancelledError):
+            run(sweeper._run())
+
+    assert sweeps == [1]
@@ -0,0 +1,72 @@
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+from app.models.models import Category, Order, OrderStatus, Product
+from app.services.kaspi import kaspi_service
+from app.services.order_status import order_status_store
+
+
+@pytest.fixture
+def latte(db):
+    coffee = Category(name_rus="Кофе", name_kaz="Кофе")
+    db.add(coffee)
+    db.flush()
+    product = Product(category_id=coffee.id, name_rus="Латте", name_kaz="Латте", base_price=1200)
+    db.add(product)
+    db.commit()
+    return product
+
+
+@pytest.fixture
+def kaspi(monkeypatch):
+    """Kaspi stub: invoices get token "t<order id>"; `paid` holds paid tokens."""
+    paid = set()
+
+    async def create_invoice(order_id, amount):
+        return {"token": f"t{order_id}", "payment_url": f"https://pay.test/t{order_id}"}
+
+    async def get_payment_status(token):
+        return "paid" if token in paid else "pending"
+
+    monkeypatch.setattr(kaspi_service, "create_invoice", create_invoice)
+    monkeypatch.setattr(kaspi_service, "get_payment_status", get_payment_status)
+    return paid
+
+
+@pytest.fixture
+def redis_down(monkeypatch):
+    async def unavailable(*args, **kwargs):
+        raise RedisConnectionError("Connection refused")
+
+    monkeypatch.setattr(order_status_store, "save", unavailable)
+    monkeypatch.setattr(order_status_store, "load", unavailable)
+
+
+def test_create_order_caches_status(client, db, latte, kaspi):
+    response = client.post("/api/v1/orders", json={"items": [{"product_id": latte.id, "quantity": 2}]})
+    assert response.status_code == 200
+    order_id = response.json()["order_id"]
+
+    assert db.get(Order, order_id).payment_token == f"t{order_id}"
+    assert client.portal.call(order_status_store.load, order_id)["status"] == OrderStatus.PENDING
+
+
+def test_create_order_succeeds_when_redis_is_down(client, db, latte, kaspi, redis_down):
+    response = client.post("/api/v1/orders", json={"items": [{"product_id": latte.id}]})
+    assert response.status_code == 200
+    order_id = response.json()["order_id"]
+    assert response.json()["qr_token"] == f"t{order_id}"
+    assert db.query(Order).count() == 1
+
+
+def test_status_falls_back_to_database_when_redis_is_down(client, db, latte, kaspi, redis_down):
+    order_id = client.post("/api/v1/orders", json={"items": [{"product_id": latte.id}]}).json()["order_id"]
+
+    response = client.get(f"/api/v1/orders/status/{order_id}")
+    assert response.status_code == 200
+    assert response.json()["status"] == OrderStatus.PENDING.value
+
+    kaspi.add(f"t{order_id}")
+    response = client.get(f"/api/v1/orders/status/{order_id}")
+    assert response.json()["status"] == OrderStatus.PAID.value
+    db.expire_all()
+    assert db.get(Order, order_id).status == OrderStatus.PAID
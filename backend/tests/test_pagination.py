@@ -0,0 +1,80 @@
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.models.models import Order, OrderStatus
+
+START = datetime(2026, 3, 1, 9, 30, 15, 123456)
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 3, 1, 9, 30, 15, 123456, tzinfo=timezone(timedelta(hours=5)))
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+
+def test_cursor_is_url_safe_without_padding():
+    cursor = encode_cursor(START, 7)
+    assert "=" not in cursor
+    assert set(cursor) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_")
+
+
+@pytest.mark.parametrize("cursor", [None, ""])
+def test_missing_cursor_means_first_page(cursor):
+    assert decode_cursor(cursor) is None
+
+
+def _raw_cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    _raw_cursor({"created_at": "2026-03-01", "id": 1}),
+    _raw_cursor(["2026-03-01T09:30:00"]),
+    _raw_cursor(["yesterday", 1]),
+    _raw_cursor(["2026-03-01T09:30:00", "seven"]),
+])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+def test_closed_order_pages_cover_every_order_once(db, admin_client):
+    # Pairs share a created_at, so the id tie-breaker decides page boundaries
+    for minutes in (0, 0, 5, 5, 10):
+        db.add(Order(total_amount=100, status=OrderStatus.COMPLETED, created_at=START + timedelta(minutes=minutes)))
+    db.add(Order(total_amount=100, status=OrderStatus.PAID, created_at=START))
+    db.commit()
+    expected = [
+        order.id for order in db.query(Order)
+        .filter(Order.status == OrderStatus.COMPLETED)
+        .order_by(Order.created_at.desc(), Order.id.desc())
+    ]
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = admin_client.get("/api/v1/admin/orders/closed", params=params)
+        assert response.status_code == 200
+        seen += [order["id"] for order in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert seen == expected
+
+
+def test_last_full_page_has_no_cursor(db, admin_client):
+    for minutes in (0, 5):
+        db.add(Order(total_amount=100, status=OrderStatus.CANCELLED, created_at=START + timedelta(minutes=minutes)))
+    db.commit()
+
+    response = admin_client.get("/api/v1/admin/orders/closed", params={"limit": 2})
+    assert len(response.json()) == 2
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_invalid_cursor_is_a_bad_request(admin_client):
+    response = admin_client.get("/api/v1/admin/orders/closed", params={"cursor": "not a cursor!"})
+    assert response.status_code == 400
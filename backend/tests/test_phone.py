@@ -0,0 +1,48 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+from app.core.phone import normalize_phone
+from app.models.models import User, UserRole
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("77001234567", "77001234567"),
+    ("+7 (700) 123-45-67", "77001234567"),
+    ("87001234567", "77001234567"),
+    ("8 700 123 45 67", "77001234567"),
+    ("7001234567", "77001234567"),
+    ("+7-700-123-4567", "77001234567"),
+    # Not Kazakh mobile formats: digits are kept as they are
+    ("+44 20 7946 0958", "442079460958"),
+    ("12345", "12345"),
+])
+def test_normalize_phone(raw, expected):
+    assert normalize_phone(raw) == expected
+
+
+@pytest.mark.parametrize("raw", [None, "", "phone", "+() -"])
+def test_no_digits_normalizes_to_empty(raw):
+    assert normalize_phone(raw) == ""
+
+
+def make_user(phone_number):
+    return User(
+        first_name="Aida", last_name="Nurlanova", phone_number=phone_number,
+        password_hash="x", role=UserRole.CLIENT
+    )
+
+
+def test_model_keeps_canonical_column_in_sync(db):
+    user = make_user("+7 (700) 123-45-67")
+    assert user.phone_normalized == "77001234567"
+
+    user.phone_number = "8 701 765 43 21"
+    assert user.phone_normalized == "77017654321"
+
+
+def test_one_number_in_two_formats_is_rejected(db):
+    db.add(make_user("+7 700 123 45 67"))
+    db.commit()
+
+    db.add(make_user("87001234567"))
+    with pytest.raises(IntegrityError):
+        db.commit()
@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+from app.core import rate_limit
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.models.models import User, UserRole
+from app.core.rate_limit import RateLimit, rate_limiter
+
+WINDOW = 60
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controls the time the limiter sees (seconds)."""
+    now = SimpleNamespace(value=1_700_000_000.0)
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+def attempts(run, rules, count):
+    return [run(rate_limiter.acquire("login", rules)) for _ in range(count)]
+
+
+def test_allows_up_to_the_limit(run, redis, clock):
+    rules = [("phone:77001234567", RateLimit(3, WINDOW))]
+
+    assert attempts(run, rules, 3) == [0, 0, 0]
+    assert run(rate_limiter.acquire("login", rules)) == WINDOW
+
+
+def test_window_slides(run, redis, clock):
+    rules = [("phone:77001234567", RateLimit(2, WINDOW))]
+    run(rate_limiter.acquire("login", rules))
+    clock.value += 20
+    run(rate_limiter.acquire("login", rules))
+
+    clock.value += 30
+    # The first attempt leaves the window 10 s from now
+    assert run(rate_limiter.acquire("login", rules)) == 10
+    clock.value += 10.001
+    assert run(rate_limiter.acquire("login", rules)) == 0
+
+
+def test_rejected_attempts_are_not_recorded(run, redis, clock):
+    rules = [("phone:77001234567", RateLimit(1, WINDOW))]
+    run(rate_limiter.acquire("login", rules))
+    attempts(run, rules, 5)
+
+    clock.value += WINDOW + 1
+    assert run(rate_limiter.acquire("login", rules)) == 0
+
+
+def test_one_exhausted_key_blocks_without_counting_the_others(run, redis, clock):
+    phone = ("phone:77001234567", RateLimit(1, WINDOW))
+    ip = ("ip:10.0.0.1", RateLimit(10, WINDOW))
+    run(rate_limiter.acquire("login", [phone]))
+
+    assert run(rate_limiter.acquire("login", [phone, ip])) > 0
+    assert run(redis.zcard("ratelimit:login:ip:10.0.0.1")) == 0
+
+
+def test_release_refunds_the_attempt(run, redis, clock):
+    rules = [("phone:77001234567", RateLimit(1, WINDOW))]
+
+    run(rate_limiter.acquire("login", rules, "attempt-1"))
+    run(rate_limiter.release("login", rules, "attempt-1"))
+
+    assert run(rate_limiter.acquire("login", rules)) == 0
+
+
+def test_disabled_rules_skip_redis(run, monkeypatch):
+    monkeypatch.setattr(cache, "redis_client", None)
+    rules = [(None, RateLimit(5, WINDOW)), ("ip:10.0.0.1", RateLimit(0, WINDOW))]
+
+    assert run(rate_limiter.acquire("login", rules)) == 0
+
+
+def test_fails_open_when_redis_is_down(run, redis, monkeypatch):
+    async def unavailable():
+        raise RedisConnectionError("Connection refused")
+
+    monkeypatch.setattr(cache, "get_client", unavailable)
+
+    assert run(rate_limiter.acquire("login", [("phone:77001234567", RateLimit(1, WINDOW))])) == 0
+
+
+def test_only_failed_logins_count(db, client, monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_PER_PHONE", 2)
+    db.add(User(
+        first_name="Aida", last_name="Nurlanova", phone_number="77001234567",
+        password_hash=get_password_hash("correct horse"), role=UserRole.CLIENT
+    ))
+    db.commit()
+
+    def login(password):
+        return client.post(
+            "/api/v1/auth/login", json={"phone_number": "8 700 123 45 67", "password": password}
+        ).status_code
+
+    assert [login("correct horse") for _ in range(3)] == [200, 200, 200]
+    assert [login("wrong") for _ in range(3)] == [401, 401, 429]
+    assert login("correct horse") == 429
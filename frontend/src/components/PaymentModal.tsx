@@ -72,6 +72,15 @@ const PaymentModal: React.FC<PaymentModalProps> = ({ onClose }) => {
     const interval = setInterval(async () => {
       try {
         const statusResponse = await api.getOrderStatus(orderId);
+
+        // Queued orders get their payment URL once the invoice is created
+        if (statusResponse.payment_url) {
+          setPaymentData((current) =>
+            current && !current.payment_url
+              ? { ...current, payment_url: statusResponse.payment_url }
+              : current
+          );
+        }
         
         if (statusResponse.status === 'paid' || statusResponse.status === 'completed') {
           setPaymentStatus('paid');
@@ -132,12 +141,16 @@ const PaymentModal: React.FC<PaymentModalProps> = ({ onClose }) => {
               {paymentStatus === 'pending' && (
                 <div className="payment-pending">
                   <div className="qr-container">
-                    <QRCodeSVG 
-                      value={paymentData.payment_url} 
-                      size={280}
-                      level="H"
-                      includeMargin={true}
-                    />
+                    {paymentData.payment_url ? (
+                      <QRCodeSVG 
+                        value={paymentData.payment_url} 
+                        size={280}
+                        level="H"
+                        includeMargin={true}
+                      />
+                    ) : (
+                      <div className="spinner"></div>
+                    )}
                   </div>
                   <h3 className="payment-title">{getText('scanAndPay')}</h3>
                   <div className="payment-amount">{paymentData.total_amount.toFixed(0)} ₸</div>
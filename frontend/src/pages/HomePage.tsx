@@ -36,6 +36,8 @@ const HomePage: React.FC = () => {
   const [showAuth, setShowAuth] = useState(false);
   const [activeCategoryId, setActiveCategoryId] = useState<number | null>(null);
   const [isLanguageMenuOpen, setIsLanguageMenuOpen] = useState(false);
+  const [searchQuery, setSearchQuery] = useState('');
+  const [searchResults, setSearchResults] = useState<Product[] | null>(null);
 
   const navigate = useNavigate();
   const language = useAppStore((state) => state.language);
@@ -52,6 +54,32 @@ const HomePage: React.FC = () => {
     loadMenu();
   }, []);
 
+  // Search after a short pause in typing; stale responses are ignored
+  useEffect(() => {
+    const query = searchQuery.trim();
+    if (!query) {
+      setSearchResults(null);
+      return;
+    }
+
+    let cancelled = false;
+    const timer = window.setTimeout(async () => {
+      try {
+        const results = await api.searchMenu(query);
+        if (!cancelled) {
+          setSearchResults(results);
+        }
+      } catch (error) {
+        console.error('Menu search failed:', error);
+      }
+    }, 250);
+
+    return () => {
+      cancelled = true;
+      window.clearTimeout(timer);
+    };
+  }, [searchQuery]);
+
   useEffect(() => {
     const handleClickOutside = (event: MouseEvent) => {
       if (languageDropdownRef.current && !languageDropdownRef.current.contains(event.target as Node)) {
@@ -103,6 +131,23 @@ const HomePage: React.FC = () => {
     setIsLanguageMenuOpen(false);
   };
 
+  const renderProductCard = (product: Product) => (
+    <div
+      key={product.id}
+      className={`product-card ${product.status === 'out_of_stock' ? 'out-of-stock' : ''}`}
+      onClick={() => product.status === 'active' && setSelectedProduct(product)}
+    >
+      {product.image_url && (
+        <img src={product.image_url} alt={getLocalizedName(product)} className="product-image" />
+      )}
+      <div className="product-name">{getLocalizedName(product)}</div>
+      <div className="product-price">{product.base_price} ₸</div>
+      {product.status === 'out_of_stock' && (
+        <div className="out-of-stock-label">Товара нет в наличии</div>
+      )}
+    </div>
+  );
+
   if (loading) {
     return <div className="container" style={{padding: '100px 0', textAlign: 'center'}}>
       <h2>Загрузка меню...</h2>
@@ -178,8 +223,18 @@ const HomePage: React.FC = () => {
           </div>
         </div>
 
+        {/* Search */}
+        <div className="menu-search">
+          <input
+            type="search"
+            placeholder={language === 'kaz' ? 'Мәзірден іздеу' : 'Поиск по меню'}
+            value={searchQuery}
+            onChange={(e) => setSearchQuery(e.target.value)}
+          />
+        </div>
+
         {/* Categories */}
-        {menu?.categories.length ? (
+        {searchResults !== null ? null : menu?.categories.length ? (
           <div className="categories">
             <div className="categories-scroll">
               {menu.categories.map((category) => (
@@ -201,26 +256,20 @@ const HomePage: React.FC = () => {
 
         {/* Products */}
         <div className="products-section">
-          {activeCategory ? (
+          {searchResults !== null ? (
+            <div className="products-grid">
+              {searchResults.map(renderProductCard)}
+              {searchResults.length === 0 && (
+                <div className="admin-empty" style={{ gridColumn: '1 / -1' }}>
+                  {language === 'kaz' ? 'Ештеңе табылмады' : 'Ничего не найдено'}
+                </div>
+              )}
+            </div>
+          ) : activeCategory ? (
             <div>
               <h2 className="category-title">{getLocalizedName(activeCategory)}</h2>
               <div className="products-grid">
-                {activeCategory.products.map((product) => (
-                  <div
-                    key={product.id}
-                    className={`product-card ${product.status === 'out_of_stock' ? 'out-of-stock' : ''}`}
-                    onClick={() => product.status === 'active' && setSelectedProduct(product)}
-                  >
-                    {product.image_url && (
-                      <img src={product.image_url} alt={getLocalizedName(product)} className="product-image" />
-                    )}
-                    <div className="product-name">{getLocalizedName(product)}</div>
-                    <div className="product-price">{product.base_price} ₸</div>
-                    {product.status === 'out_of_stock' && (
-                      <div className="out-of-stock-label">Товара нет в наличии</div>
-                    )}
-                  </div>
-                ))}
+                {activeCategory.products.map(renderProductCard)}
                 {activeCategory.products.length === 0 && (
                   <div className="admin-empty" style={{ gridColumn: '1 / -1' }}>
                     В этой категории пока нет товаров
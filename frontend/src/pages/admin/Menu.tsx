@@ -120,12 +120,12 @@ const Menu: React.FC = () => {
         const [categoryData, optionGroupData, productData] = await Promise.all([
           api.getCategories(),
           api.getOptionGroups(),
-          api.getProducts(),
+          api.getProducts({ limit: 200 }),
         ]);
 
         setCategories(categoryData);
         setOptionGroups(optionGroupData);
-        setProducts(productData);
+        setProducts(productData.items);
         setProductFilterCategoryId('all');
 
         if (categoryData.length > 0) {
@@ -190,8 +190,8 @@ const Menu: React.FC = () => {
 
   const loadProducts = async (categoryId?: number | null) => {
     try {
-      const data = await api.getProducts(categoryId ?? undefined);
-      setProducts(data);
+      const data = await api.getProducts({ categoryId: categoryId ?? undefined, limit: 200 });
+      setProducts(data.items);
     } catch (err: any) {
       console.error('Failed to load products', err);
       setError(err.response?.data?.detail || 'Не удалось загрузить товары');
@@ -18,19 +18,39 @@ const Orders: React.FC = () => {
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
-    loadOrders();
+    if (tab === 'active') {
+      // Live feed: snapshot first, then only changes. EventSource reconnects
+      // by itself and resumes from the last received event.
+      setLoading(true);
+      const feed = api.openActiveOrdersFeed();
+
+      feed.addEventListener('snapshot', (event) => {
+        setActiveOrders(JSON.parse((event as MessageEvent).data));
+        setLoading(false);
+      });
+      feed.addEventListener('order_paid', (event) => {
+        const order = JSON.parse((event as MessageEvent).data);
+        setActiveOrders((orders) => [order, ...orders.filter((o) => o.id !== order.id)]);
+      });
+      const removeOrder = (event: Event) => {
+        const { id } = JSON.parse((event as MessageEvent).data);
+        setActiveOrders((orders) => orders.filter((o) => o.id !== id));
+      };
+      feed.addEventListener('order_completed', removeOrder);
+      feed.addEventListener('order_cancelled', removeOrder);
+      feed.onerror = () => console.error('Ошибка потока заказов, переподключение...');
+
+      return () => feed.close();
+    }
+
+    loadClosedOrders();
   }, [tab]);
 
-  const loadOrders = async () => {
+  const loadClosedOrders = async () => {
     try {
       setLoading(true);
-      if (tab === 'active') {
-        const data = await api.getActiveOrders();
-        setActiveOrders(data);
-      } else {
-        const data = await api.getClosedOrders();
-        setClosedOrders(data);
-      }
+      const data = await api.getClosedOrders();
+      setClosedOrders(data);
     } catch (error) {
       console.error('Ошибка загрузки заказов:', error);
     } finally {
@@ -60,8 +60,7 @@ const ProductForm: React.FC = () => {
         setOptionGroups(optionGroupData);
 
         if (isEditing && id) {
-          const products = await api.getProducts();
-          const product = products.find((p) => p.id === parseInt(id));
+          const product = await api.getProduct(parseInt(id));
           if (product) {
             setFormData({
               name_rus: product.name_rus,
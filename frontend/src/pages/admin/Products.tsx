@@ -1,12 +1,21 @@
-import React, { useEffect, useMemo, useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useAuthStore } from '../../store';
 import api from '../../services/api';
-import { Category, Product } from '../../types';
+import { Category, Product, ProductStatus } from '../../types';
 import AdminSidebar from '../../components/admin/AdminSidebar';
 
 type ProductFilterKey = 'all' | number;
 
+const PAGE_SIZE = 24;
+
+const statusOptions: { value: ProductStatus | ''; label: string }[] = [
+  { value: '', label: 'Все статусы' },
+  { value: 'active', label: 'Активные' },
+  { value: 'out_of_stock', label: 'Нет в наличии' },
+  { value: 'inactive', label: 'Скрытые' },
+];
+
 const Products: React.FC = () => {
   const navigate = useNavigate();
   const { isAdmin } = useAuthStore();
@@ -14,7 +23,12 @@ const Products: React.FC = () => {
 
   const [categories, setCategories] = useState<Category[]>([]);
   const [products, setProducts] = useState<Product[]>([]);
+  const [totalProducts, setTotalProducts] = useState(0);
   const [productFilterCategoryId, setProductFilterCategoryId] = useState<number | 'all'>('all');
+  const [statusFilter, setStatusFilter] = useState<ProductStatus | ''>('');
+  const [searchInput, setSearchInput] = useState('');
+  const [search, setSearch] = useState('');
+  const [page, setPage] = useState(0);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [success, setSuccess] = useState<string | null>(null);
@@ -26,59 +40,61 @@ const Products: React.FC = () => {
     }
 
     const loadData = async () => {
-      setLoading(true);
       try {
-        const [categoryData, productData] = await Promise.all([
-          api.getCategories(),
-          api.getProducts(),
-        ]);
-
-        setCategories(categoryData);
-        setProducts(productData);
-        setProductFilterCategoryId('all');
+        setCategories(await api.getCategories());
       } catch (err: any) {
         console.error('Failed to load data', err);
         setError(err.response?.data?.detail || 'Не удалось загрузить данные');
-      } finally {
-        setLoading(false);
       }
     };
 
     loadData();
   }, [isAdminUser, navigate]);
 
+  // Wait for a pause in typing before searching
   useEffect(() => {
-    const fetchProducts = async () => {
-      const filterId = productFilterCategoryId === 'all' ? undefined : productFilterCategoryId;
-      await loadProducts(filterId as number | undefined);
-    };
+    const timer = window.setTimeout(() => {
+      setSearch(searchInput.trim());
+      setPage(0);
+    }, 300);
+    return () => window.clearTimeout(timer);
+  }, [searchInput]);
 
-    fetchProducts();
+  useEffect(() => {
+    if (!isAdminUser) {
+      return;
+    }
+    loadProducts();
     // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [productFilterCategoryId]);
+  }, [isAdminUser, productFilterCategoryId, statusFilter, search, page]);
 
   const resetMessages = () => {
     setError(null);
     setSuccess(null);
   };
 
-  const filteredProducts = useMemo(() => {
-    if (productFilterCategoryId === 'all') {
-      return products;
-    }
-    return products.filter((product) => product.category_id === productFilterCategoryId);
-  }, [productFilterCategoryId, products]);
-
-  const loadProducts = async (categoryId?: number | null) => {
+  const loadProducts = async () => {
+    setLoading(true);
     try {
-      const data = await api.getProducts(categoryId ?? undefined);
-      setProducts(data);
+      const data = await api.getProducts({
+        categoryId: productFilterCategoryId === 'all' ? undefined : productFilterCategoryId,
+        status: statusFilter || undefined,
+        search,
+        limit: PAGE_SIZE,
+        offset: page * PAGE_SIZE,
+      });
+      setProducts(data.items);
+      setTotalProducts(data.total);
     } catch (err: any) {
       console.error('Failed to load products', err);
       setError(err.response?.data?.detail || 'Не удалось загрузить товары');
+    } finally {
+      setLoading(false);
     }
   };
 
+  const pageCount = Math.max(1, Math.ceil(totalProducts / PAGE_SIZE));
+
   const handleEditProduct = (product: Product) => {
     navigate(`/admin/products/edit/${product.id}`);
   };
@@ -97,8 +113,7 @@ const Products: React.FC = () => {
     try {
       await api.deleteProduct(productId);
       setSuccess('Товар удален');
-      const filterId = productFilterCategoryId === 'all' ? undefined : productFilterCategoryId;
-      await loadProducts(filterId as number | undefined);
+      await loadProducts();
     } catch (err: any) {
       console.error('Failed to delete product', err);
       setError(err.response?.data?.detail || 'Не удалось удалить товар');
@@ -142,15 +157,40 @@ const Products: React.FC = () => {
               <button
                 key={chip.key}
                 className={`admin-chip ${productFilterCategoryId === chip.key ? 'active' : ''}`}
-                onClick={() => setProductFilterCategoryId(chip.key === 'all' ? 'all' : chip.key)}
+                onClick={() => {
+                  setProductFilterCategoryId(chip.key === 'all' ? 'all' : chip.key);
+                  setPage(0);
+                }}
               >
                 {chip.label}
               </button>
             ))}
           </div>
 
+          <div className="admin-form admin-product-filters">
+            <input
+              type="search"
+              placeholder="Поиск по названию или описанию"
+              value={searchInput}
+              onChange={(e) => setSearchInput(e.target.value)}
+            />
+            <select
+              value={statusFilter}
+              onChange={(e) => {
+                setStatusFilter(e.target.value as ProductStatus | '');
+                setPage(0);
+              }}
+            >
+              {statusOptions.map((option) => (
+                <option key={option.value} value={option.value}>
+                  {option.label}
+                </option>
+              ))}
+            </select>
+          </div>
+
           <div className="admin-product-grid">
-            {filteredProducts.map((product) => (
+            {products.map((product) => (
               <div key={product.id} className="admin-product-card">
                 <div className="admin-product-card__image">
                   {product.image_url ? (
@@ -173,8 +213,27 @@ const Products: React.FC = () => {
                 </div>
               </div>
             ))}
-            {filteredProducts.length === 0 && <div className="admin-empty">Товары не найдены</div>}
+            {products.length === 0 && !loading && <div className="admin-empty">Товары не найдены</div>}
           </div>
+
+          {totalProducts > PAGE_SIZE && (
+            <div className="admin-pagination">
+              <button className="btn btn-light" type="button" disabled={page === 0} onClick={() => setPage(page - 1)}>
+                Назад
+              </button>
+              <span>
+                Страница {page + 1} из {pageCount} · {totalProducts} товаров
+              </span>
+              <button
+                className="btn btn-light"
+                type="button"
+                disabled={page + 1 >= pageCount}
+                onClick={() => setPage(page + 1)}
+              >
+                Вперед
+              </button>
+            </div>
+          )}
         </section>
       </div>
     </div>
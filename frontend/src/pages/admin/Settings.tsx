@@ -111,36 +111,25 @@ const Settings: React.FC = () => {
       const updatedUser = await api.updateAdminProfile(profileData);
 
       if (avatarFile) {
-        const reader = new FileReader();
-        reader.onloadend = async () => {
-          try {
-            const base64 = (reader.result as string).split(',')[1];
-            const avatarData = { avatar_base64: base64 };
-            const avatarResult = await api.updateAdminAvatar(avatarData);
-            updatedUser.avatar_url = avatarResult.avatar_url;
-            setAvatarUrl(avatarResult.avatar_url);
-            setAvatarPreview(resolveAvatarUrl(avatarResult.avatar_url));
-            setAvatarFile(null);
-
-            if (token) {
-              setAuth(updatedUser, token);
-            }
-            setSuccess('Профиль успешно обновлен');
-          } catch (err: any) {
-            console.error('Failed to update avatar', err);
-            setError(err.response?.data?.detail || 'Не удалось обновить аватар');
-          } finally {
-            setLoading(false);
-          }
-        };
-        reader.readAsDataURL(avatarFile);
-      } else {
-        if (token) {
-          setAuth(updatedUser, token);
+        try {
+          const avatarResult = await api.updateAdminAvatar(avatarFile);
+          updatedUser.avatar_url = avatarResult.avatar_url;
+          setAvatarUrl(avatarResult.avatar_url);
+          setAvatarPreview(resolveAvatarUrl(avatarResult.avatar_url));
+          setAvatarFile(null);
+        } catch (err: any) {
+          console.error('Failed to update avatar', err);
+          setError(err.response?.data?.detail || 'Не удалось обновить аватар');
+          setLoading(false);
+          return;
         }
-        setSuccess('Профиль успешно обновлен');
-        setLoading(false);
       }
+
+      if (token) {
+        setAuth(updatedUser, token);
+      }
+      setSuccess('Профиль успешно обновлен');
+      setLoading(false);
     } catch (err: any) {
       console.error('Failed to update profile', err);
       setError(err.response?.data?.detail || 'Не удалось обновить профиль');
@@ -224,11 +213,11 @@ const Settings: React.FC = () => {
                     >
                       Загрузить фото
                     </button>
-                    <p className="settings-avatar-hint">Макс. 5 МБ (JPG, PNG)</p>
+                    <p className="settings-avatar-hint">Макс. 5 МБ (JPG, PNG, WebP)</p>
                     <input
                       ref={fileInputRef}
                       type="file"
-                      accept="image/*"
+                      accept="image/jpeg,image/png,image/webp"
                       style={{ display: 'none' }}
                       onChange={handleAvatarChange}
                     />
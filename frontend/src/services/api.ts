@@ -56,6 +56,11 @@ class ApiService {
     return response.data;
   }
 
+  async searchMenu(query: string, limit = 20) {
+    const response = await this.api.get('/menu/search', { params: { q: query, limit } });
+    return response.data;
+  }
+
   // Orders endpoints
   async createOrder(data: any) {
     const response = await this.api.post('/orders', data);
@@ -83,6 +88,15 @@ class ApiService {
     return response.data;
   }
 
+  // Server-sent events with the active orders snapshot and live changes.
+  // EventSource cannot send headers, so the token goes in the query string.
+  openActiveOrdersFeed() {
+    const token = localStorage.getItem('access_token') || '';
+    return new EventSource(
+      `${API_URL}${API_BASE_PATH}/admin/orders/feed?token=${encodeURIComponent(token)}`
+    );
+  }
+
   async getClosedOrders() {
     const response = await this.api.get('/admin/orders/closed');
     return response.data;
@@ -113,9 +127,36 @@ class ApiService {
     return response.data;
   }
 
-  async getProducts(categoryId?: number) {
-    const params = categoryId ? { category_id: categoryId } : {};
-    const response = await this.api.get('/admin/products', { params });
+  async getProducts(params: {
+    categoryId?: number;
+    status?: string;
+    search?: string;
+    sort?: 'id' | 'name' | 'price' | 'created_at';
+    order?: 'asc' | 'desc';
+    limit?: number;
+    offset?: number;
+    includeImages?: boolean;
+  } = {}) {
+    const response = await this.api.get('/admin/products', {
+      params: {
+        category_id: params.categoryId,
+        status: params.status,
+        search: params.search || undefined,
+        sort: params.sort,
+        order: params.order,
+        limit: params.limit,
+        offset: params.offset,
+        include_images: params.includeImages,
+      },
+    });
+    return {
+      items: response.data,
+      total: Number(response.headers['x-total-count'] ?? response.data.length),
+    };
+  }
+
+  async getProduct(id: number) {
+    const response = await this.api.get(`/admin/products/${id}`);
     return response.data;
   }
 
@@ -207,9 +248,8 @@ class ApiService {
     return response.data;
   }
 
-  async updateAdminAvatar(data: { avatar_base64: string }) {
-    const response = await this.api.put('/admin/profile/avatar', data);
-    return response.data;
+  async updateAdminAvatar(file: File) {
+    return this.uploadAvatar('/admin/profile/avatar', file);
   }
 
   async updateAdminPassword(data: { current_password: string; new_password: string }) {
@@ -217,6 +257,15 @@ class ApiService {
     return response.data;
   }
 
+  private async uploadAvatar(url: string, file: File) {
+    const formData = new FormData();
+    formData.append('file', file);
+    const response = await this.api.put(url, formData, {
+      headers: { 'Content-Type': 'multipart/form-data' },
+    });
+    return response.data;
+  }
+
   // User profile endpoints
   async getUserProfile() {
     const response = await this.api.get('/profile');
@@ -228,9 +277,8 @@ class ApiService {
     return response.data;
   }
 
-  async updateUserAvatar(data: { avatar_base64: string }) {
-    const response = await this.api.put('/profile/avatar', data);
-    return response.data;
+  async updateUserAvatar(file: File) {
+    return this.uploadAvatar('/profile/avatar', file);
   }
 
   async updateUserPassword(data: { current_password: string; new_password: string }) {